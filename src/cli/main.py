@@ -14,6 +14,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.core.capsule import Capsule
 from src.core.acceleration_stage import AccelerationStage
 from src.services.simulation_service import SimulationService
+from src.services.data_service import DataService
+from src.services.disk_history import DiskHistoryBuffer
+from src.services.recording import parse_recording_policy
 from src.visualization.plotting import PlottingService
 from src.matlab.bridge import MatlabBridge
 
@@ -50,6 +53,9 @@ def print_results(result):
     print(f"Final Position:    {result.final_position:.3f} m") 
     print(f"Total Time:        {result.total_time*1000:.2f} ms")
     print(f"Max Force:         {result.max_force:.1f} N")
+    print(f"Peak Acceleration: {result.peak_acceleration:.1f} m/s²")
+    if result.exit_time is not None:
+        print(f"Exit Time:         {result.exit_time*1000:.2f} ms")
     print(f"Initial Energy:    {result.initial_energy:.1f} J")
     print(f"Final KE:          {result.final_kinetic_energy:.2f} J")
     print(f"Energy Efficiency: {result.energy_efficiency:.1%}")
@@ -67,15 +73,35 @@ def run_simulation(args):
     # Override with command line parameters if provided
     if args.tube_length:
         service.tube_length = args.tube_length
-    if args.time_step:
+    if args.time_step == 'auto':
+        service.auto_dt = True
+        service.dt, service.dt_reason = service.select_time_step()
+    elif args.time_step:
         service.dt = args.time_step
     if args.capsule_mass:
         service.capsule.mass = args.capsule_mass
+    service.integrator = args.integrator
+    if args.rtol:
+        service.rtol = args.rtol
+    if args.atol:
+        service.atol = args.atol
+    if args.record or args.history_dir:
+        buffer = DiskHistoryBuffer(args.history_dir) if args.history_dir else None
+        service.data = DataService(args.record, buffer)
     
     print(f"Capsule mass: {service.capsule.mass}kg")
     print(f"Tube length: {service.tube_length}m")
     print(f"Stages: {len(service.stages)}")
-    print(f"Time step: {service.dt*1000}ms")
+    if service.auto_dt:
+        print(f"Time step: {service.dt*1000:.4g}ms (auto, limited by {service.dt_reason})")
+    else:
+        print(f"Time step: {service.dt*1000}ms")
+    if service.integrator == 'rk45':
+        print(f"Integrator: adaptive RK45 (rtol={service.rtol:g})")
+    if args.record:
+        print(f"Recording: {args.record}")
+    if args.history_dir:
+        print(f"History streamed to: {service.data.buffer.run_directory}")
     
     # Run simulation
     print("\nRunning simulation...")
@@ -141,6 +167,9 @@ def main():
 Examples:
   python -m src.cli.main                    # Run with defaults
   python -m src.cli.main --max-time 0.02    # Run for 20ms
+  python -m src.cli.main --integrator rk45  # Adaptive time steps
+  python -m src.cli.main --time-step auto   # Time step from circuit time scales
+  python -m src.cli.main --record every:100 # Store every 100th step
   python -m src.cli.main --output results.json  # Save results
         """
     )
@@ -150,10 +179,23 @@ Examples:
                         help='Maximum simulation time in seconds (default: 5.0)')
     parser.add_argument('--tube-length', type=float, 
                         help='Tube length in meters (default: 0.5)')
-    parser.add_argument('--time-step', type=float,
-                        help='Time step in seconds (default: 1e-5)')
+    parser.add_argument('--time-step', type=SimulationService.parse_time_step,
+                        help="Time step in seconds, or 'auto' to derive it from the "
+                             "circuits and geometry (default: 1e-5)")
     parser.add_argument('--capsule-mass', type=float,
                         help='Capsule mass in kg (default: 1.0)')
+    parser.add_argument('--integrator', choices=SimulationService.INTEGRATORS, default='fixed',
+                        help='Time integrator: fixed dt or adaptive rk45 (default: fixed)')
+    parser.add_argument('--rtol', type=float,
+                        help='Relative tolerance for --integrator rk45 (default: 1e-6)')
+    parser.add_argument('--atol', type=float,
+                        help='Absolute tolerance for --integrator rk45')
+    parser.add_argument('--record', type=parse_recording_policy,
+                        help='Recorded steps: all, every:K, interval:SECONDS or '
+                             'adaptive[:RTOL] (default: all)')
+    parser.add_argument('--history-dir', type=str,
+                        help='Stream the history to column files in this directory '
+                             'instead of keeping it in memory')
     
     # Output options
     parser.add_argument('--output', '-o', type=str,
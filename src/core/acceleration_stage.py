@@ -3,11 +3,324 @@ AccelerationStage class - Inherits from Coil (Open/Closed Principle)
 Represents electromagnetic coils that accelerate the capsule
 """
 
+import math
 import numpy as np
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Tuple
 from .coil import Coil, CoilProperties
 
 
+@dataclass(frozen=True)
+class CircuitCoefficients:
+    """
+    Precompiled RLC discharge characteristics of one stage
+    Immutable value object - rebuilt whenever voltage, capacitance or
+    coil properties change, never during a shot
+    """
+    regime: str        # 'underdamped', 'critical', 'overdamped' or 'none'
+    alpha: float       # Damping coefficient R/2L (1/s)
+    frequency: float   # ωₐ (underdamped) or β = √(α² - ω₀²) (overdamped), rad/s
+    scale: float       # V₀/L (A/s) - also dI/dt at the moment of firing
+    amplitude: float   # Current prefactor: V₀/(ωₐL), V₀/L or V₀/(L(α₂-α₁))
+    
+    UNDERDAMPED = 'underdamped'
+    CRITICAL = 'critical'
+    OVERDAMPED = 'overdamped'
+    NONE = 'none'
+    
+    @classmethod
+    def from_circuit(cls, voltage: float, inductance: float,
+                     capacitance: float, resistance: float) -> 'CircuitCoefficients':
+        """
+        Compute coefficients from circuit parameters
+        
+        Args:
+            voltage: Initial capacitor voltage in Volts
+            inductance: Coil inductance in Henries
+            capacitance: Capacitance in Farads
+            resistance: Circuit resistance in ohms
+            
+        Returns:
+            CircuitCoefficients for the discharge
+        """
+        if inductance <= 0 or capacitance <= 0:
+            scale = voltage / inductance if inductance > 0 else 0.0
+            return cls(cls.NONE, 0.0, 0.0, scale, 0.0)
+        
+        omega_0 = 1 / math.sqrt(inductance * capacitance)  # Natural frequency
+        alpha = resistance / (2 * inductance)  # Damping coefficient
+        scale = voltage / inductance
+        
+        if alpha < omega_0:
+            omega_d = math.sqrt(omega_0**2 - alpha**2)  # Damped frequency
+            return cls(cls.UNDERDAMPED, alpha, omega_d, scale, scale / omega_d)
+        if abs(alpha - omega_0) < 1e-6:  # Numerical tolerance
+            return cls(cls.CRITICAL, alpha, 0.0, scale, scale)
+        
+        beta = math.sqrt(alpha**2 - omega_0**2)
+        # α₂ - α₁ = 2β; treat a vanishing split like the critical limit of zero
+        amplitude = scale / (2 * beta) if 2 * beta > 1e-12 else 0.0
+        return cls(cls.OVERDAMPED, alpha, beta, scale, amplitude)
+    
+    @property
+    def underdamped(self) -> bool:
+        return self.regime == self.UNDERDAMPED
+    
+    @property
+    def critical(self) -> bool:
+        return self.regime == self.CRITICAL
+    
+    @property
+    def pulse_end(self) -> float:
+        """
+        Time after firing at which the first current pulse ends
+        
+        Returns:
+            π/ωₐ for an underdamped discharge (the first zero crossing),
+            inf otherwise (the current never changes sign)
+        """
+        if self.regime == self.UNDERDAMPED:
+            return math.pi / self.frequency
+        return math.inf
+    
+    def quiet_time(self, threshold: float) -> float:
+        """
+        Time after firing beyond which the current never exceeds a threshold
+        
+        Uses an exponential envelope that bounds |I(t)| in every regime:
+        - Underdamped: (V₀/ωₐL) * e^(-αt)
+        - Critical:    (V₀/L) * t * e^(-αt) <= (2V₀/(αeL)) * e^(-αt/2)
+        - Overdamped:  amplitude * e^(-(α-β)t)
+        Later positive lobes of an underdamped discharge are covered too.
+        
+        Args:
+            threshold: Current threshold in Amperes
+            
+        Returns:
+            Elapsed time in seconds (0 if the current never exceeds the
+            threshold, inf for an undamped circuit)
+        """
+        if self.regime == self.UNDERDAMPED:
+            peak, rate = self.amplitude, self.alpha
+        elif self.regime == self.CRITICAL:
+            peak, rate = 2 * self.scale / (self.alpha * math.e), self.alpha / 2
+        elif self.regime == self.OVERDAMPED:
+            peak, rate = self.amplitude, self.alpha - self.frequency
+        else:
+            return 0.0
+        
+        if peak <= threshold:
+            return 0.0
+        if rate <= 0:
+            return math.inf
+        return math.log(peak / threshold) / rate
+    
+    def current(self, elapsed: float) -> float:
+        """
+        Discharge current a given time after firing, clamped at zero
+        
+        Correct initial conditions: I(0) = 0, V(0) = V₀.
+        
+        Args:
+            elapsed: Time since activation in seconds
+            
+        Returns:
+            Current in Amperes
+        """
+        if elapsed <= 0:
+            return 0.0
+        
+        if self.regime == self.UNDERDAMPED:
+            # I(t) = (V₀/ωₐL) * e^(-αt) * sin(ωₐt)
+            current = (self.amplitude * math.exp(-self.alpha * elapsed)
+                       * math.sin(self.frequency * elapsed))
+        elif self.regime == self.CRITICAL:
+            # I(t) = (V₀/L) * t * e^(-αt)
+            current = self.amplitude * elapsed * math.exp(-self.alpha * elapsed)
+        elif self.regime == self.OVERDAMPED:
+            # I(t) = (V₀/L) * (1/(α₂-α₁)) * (e^(-α₁t) - e^(-α₂t)), α₁,₂ = α ∓ β
+            current = self.amplitude * (
+                math.exp(-(self.alpha - self.frequency) * elapsed)
+                - math.exp(-(self.alpha + self.frequency) * elapsed)
+            )
+        else:
+            return 0.0
+        
+        # Current should naturally be non-negative for first half-cycle
+        # After that, it can go negative but we limit for physical realism
+        return max(0.0, current)
+    
+    def derivative(self, elapsed: float) -> float:
+        """
+        Time derivative of the (unclamped) discharge current
+        
+        Args:
+            elapsed: Time since activation in seconds
+            
+        Returns:
+            dI/dt in Amperes per second (V₀/L at the moment of firing)
+        """
+        return self.state(elapsed)[1]
+    
+    def state(self, elapsed: float) -> Tuple[float, float]:
+        """
+        Current and dI/dt from one shared set of exp/sin/cos evaluations
+        
+        Args:
+            elapsed: Time since activation in seconds
+            
+        Returns:
+            Tuple of (current clamped at zero, dI/dt)
+        """
+        if elapsed <= 0:
+            return 0.0, self.scale  # I(0) = 0, dI/dt(0) = V₀/L
+        
+        if self.regime == self.UNDERDAMPED:
+            # I(t) = (V₀/ωₐL) * e^(-αt) * sin(ωₐt)
+            # dI/dt = (V₀/ωₐL) * e^(-αt) * [ωₐ*cos(ωₐt) - α*sin(ωₐt)]
+            phase = self.frequency * elapsed
+            envelope = self.amplitude * math.exp(-self.alpha * elapsed)
+            sin_term = math.sin(phase)
+            current = envelope * sin_term
+            derivative = envelope * (self.frequency * math.cos(phase) - self.alpha * sin_term)
+        elif self.regime == self.CRITICAL:
+            # I(t) = (V₀/L) * t * e^(-αt), dI/dt = (V₀/L) * e^(-αt) * (1 - αt)
+            envelope = self.amplitude * math.exp(-self.alpha * elapsed)
+            current = envelope * elapsed
+            derivative = envelope * (1 - self.alpha * elapsed)
+        elif self.regime == self.OVERDAMPED:
+            # I(t) = (V₀/L) * (1/(α₂-α₁)) * (e^(-α₁t) - e^(-α₂t))
+            # dI/dt = (V₀/L) * (1/(α₂-α₁)) * (-α₁*e^(-α₁t) + α₂*e^(-α₂t))
+            alpha1 = self.alpha - self.frequency
+            alpha2 = self.alpha + self.frequency
+            exp1 = math.exp(-alpha1 * elapsed)
+            exp2 = math.exp(-alpha2 * elapsed)
+            current = self.amplitude * (exp1 - exp2)
+            derivative = self.amplitude * (-alpha1 * exp1 + alpha2 * exp2)
+        else:
+            return 0.0, 0.0
+        
+        return max(0.0, current), derivative
+
+
+def discharge_coefficients(voltage, inductance, capacitance, resistance) -> Tuple[np.ndarray, ...]:
+    """
+    Time-independent characteristics of series RLC discharges (array form)
+    
+    Args:
+        voltage: Initial capacitor voltage(s) in Volts
+        inductance: Circuit inductance(s) in Henries
+        capacitance: Capacitance(s) in Farads
+        resistance: Circuit resistance(s) in ohms
+        
+    Returns:
+        Tuple of (alpha, frequency, scale, underdamped, critical) arrays where
+        frequency is ωₐ for underdamped circuits and β = √(α² - ω₀²) otherwise,
+        and scale = V₀/L
+    """
+    voltage, inductance, capacitance, resistance = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float)
+          for value in (voltage, inductance, capacitance, resistance))
+    )
+    omega_0 = 1 / np.sqrt(inductance * capacitance)  # Natural frequency
+    alpha = resistance / (2 * inductance)  # Damping coefficient
+    
+    underdamped = alpha < omega_0
+    critical = ~underdamped & (np.abs(alpha - omega_0) < 1e-6)  # Numerical tolerance
+    frequency = np.sqrt(np.abs(omega_0**2 - alpha**2))
+    scale = voltage / inductance
+    
+    return alpha, frequency, scale, underdamped, critical
+
+
+def evaluate_discharge(elapsed, alpha, frequency, scale, underdamped,
+                       critical) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized RLC discharge current and dI/dt
+    
+    All three damping regimes share one form,
+    I(t) = (V₀/L) * e^(-αt) * S(t), with S(t) = sin(ωₐt)/ωₐ (underdamped),
+    t (critically damped) or sinh(βt)/β (overdamped), and the regime is
+    selected per element with masks. Coefficients come from
+    discharge_coefficients and broadcast against elapsed, so a bank of
+    stages (shape (n, 1)) can be evaluated over a time axis (shape (T,))
+    in one call.
+    
+    Args:
+        elapsed: Time(s) since activation in seconds; negative or NaN = not fired
+        alpha, frequency, scale, underdamped, critical: Circuit coefficients
+        
+    Returns:
+        Tuple of (current, current_derivative); current is clamped at zero
+        like AccelerationStage.get_current
+    """
+    elapsed = np.asarray(elapsed, dtype=float)
+    exp_term = np.exp(-alpha * elapsed)
+    
+    if np.all(underdamped):
+        # Common case - every circuit oscillates
+        phase = frequency * elapsed
+        sin_term = np.sin(phase)
+        current = scale / frequency * exp_term * sin_term
+        derivative = scale * exp_term * (np.cos(phase) - alpha / frequency * sin_term)
+    else:
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            # Underdamped: I(t) = (V₀/ωₐL) * e^(-αt) * sin(ωₐt)
+            omega_d = np.where(underdamped, frequency, 1.0)
+            sin_term = np.sin(omega_d * elapsed)
+            under_current = scale / omega_d * exp_term * sin_term
+            under_derivative = scale * exp_term * (np.cos(omega_d * elapsed)
+                                                   - alpha / omega_d * sin_term)
+            
+            # Critically damped: I(t) = (V₀/L) * t * e^(-αt)
+            critical_current = scale * elapsed * exp_term
+            critical_derivative = scale * exp_term * (1 - alpha * elapsed)
+            
+            # Overdamped: written with the two decay rates α₁,₂ = α ∓ β to
+            # avoid overflow of sinh(βt) at late times
+            beta = np.where(underdamped | critical, 1.0, frequency)
+            alpha1 = alpha - beta
+            alpha2 = alpha + beta
+            exp1 = np.exp(-alpha1 * elapsed)
+            exp2 = np.exp(-alpha2 * elapsed)
+            factor = scale / (alpha2 - alpha1)
+            over_current = factor * (exp1 - exp2)
+            over_derivative = factor * (-alpha1 * exp1 + alpha2 * exp2)
+            
+        current = np.where(underdamped, under_current,
+                           np.where(critical, critical_current, over_current))
+        derivative = np.where(underdamped, under_derivative,
+                              np.where(critical, critical_derivative, over_derivative))
+    
+    # Not yet fired contributes nothing
+    waiting = ~(elapsed >= 0)
+    if np.any(waiting):
+        current = np.where(waiting, 0.0, current)
+        derivative = np.where(waiting, 0.0, derivative)
+    
+    return np.maximum(current, 0.0), derivative
+
+
+def rlc_discharge(elapsed, voltage, inductance, capacitance,
+                  resistance) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized RLC discharge current and dI/dt from raw circuit parameters
+    
+    Args:
+        elapsed: Time(s) since activation in seconds
+        voltage: Initial capacitor voltage(s) in Volts
+        inductance: Circuit inductance(s) in Henries
+        capacitance: Capacitance(s) in Farads
+        resistance: Circuit resistance(s) in ohms
+        
+    Returns:
+        Tuple of (current, current_derivative) arrays
+    """
+    return evaluate_discharge(
+        elapsed, *discharge_coefficients(voltage, inductance, capacitance, resistance)
+    )
+
+
 class AccelerationStage(Coil):
     """
     AccelerationStage class representing electromagnetic acceleration coils
@@ -44,16 +357,73 @@ class AccelerationStage(Coil):
             position=position
         )
         
+        # StageBank this stage writes its state through to (set by the bank)
+        # and cached circuit coefficients - both needed by the setters below
+        self._bank = None
+        self._bank_index: Optional[int] = None
+        self._circuit: Optional[CircuitCoefficients] = None
+        self._capacitance = capacitance
+        self._voltage = voltage
+        
         # Initialize parent Coil
         super().__init__(props)
         
         # AccelerationStage-specific properties
         self.stage_id = stage_id
-        self.capacitance = capacitance
-        self.voltage = voltage
         self.activation_time: Optional[float] = None
+        self.retirement_time: Optional[float] = None
         self.is_active = False
     
+    @property
+    def properties(self) -> CoilProperties:
+        """Coil properties (geometry, resistance, position)"""
+        return self._properties
+    
+    @properties.setter
+    def properties(self, value: CoilProperties):
+        self._properties = value
+        self._inductance = None
+        self._invalidate_circuit()
+    
+    @property
+    def capacitance(self) -> float:
+        """Capacitor capacitance in Farads"""
+        return self._capacitance
+    
+    @capacitance.setter
+    def capacitance(self, value: float):
+        self._capacitance = value
+        self._invalidate_circuit()
+    
+    @property
+    def voltage(self) -> float:
+        """Initial capacitor voltage in Volts"""
+        return self._voltage
+    
+    @voltage.setter
+    def voltage(self, value: float):
+        self._voltage = value
+        self._invalidate_circuit()
+    
+    @property
+    def circuit(self) -> CircuitCoefficients:
+        """
+        Precompiled RLC coefficients, rebuilt only after a parameter change
+        
+        Returns:
+            CircuitCoefficients for this stage's discharge
+        """
+        if self._circuit is None:
+            self._circuit = CircuitCoefficients.from_circuit(
+                self._voltage, self.inductance, self._capacitance, self._properties.resistance
+            )
+        return self._circuit
+    
+    def _invalidate_circuit(self):
+        """Drop cached coefficients after a circuit parameter changed"""
+        self._circuit = None
+        self._sync_bank()
+    
     def _calculate_copper_resistance(self, turns: int, diameter: float, length: float) -> float:
         """
         Calculate resistance of copper wire in the coil
@@ -98,6 +468,38 @@ class AccelerationStage(Coil):
         """
         self.activation_time = time
         self.is_active = True
+        self.circuit  # Make sure coefficients are compiled before the shot
+        self._sync_bank()
+    
+    def retire(self, time: float):
+        """
+        Mark the discharge as finished at the specified time
+        
+        A retired stage carries no current from then on and drops out of
+        its StageBank's active set. It stays fired (is_active remains True)
+        and keeps its activation and retirement times for accounting.
+        
+        Args:
+            time: Retirement time in seconds
+        """
+        self.retirement_time = time
+        self._sync_bank()
+    
+    @property
+    def is_retired(self) -> bool:
+        """True once the stage has been retired"""
+        return self.retirement_time is not None
+    
+    def _is_live(self, time: float) -> bool:
+        """True if the stage is discharging at the given time"""
+        if not self.is_active or self.activation_time is None or time < self.activation_time:
+            return False
+        return self.retirement_time is None or time < self.retirement_time
+    
+    def _sync_bank(self):
+        """Propagate state changes to the owning StageBank, if any"""
+        if self._bank is not None:
+            self._bank.sync_stage(self._bank_index)
     
     def get_current(self, time: float) -> float:
         """
@@ -108,67 +510,19 @@ class AccelerationStage(Coil):
         - V(0) = V₀ (initial capacitor voltage)
         - Proper damping behavior based on circuit parameters
         
+        Circuit characteristics come precompiled from ``circuit``, so each
+        call costs one exp and one sin.
+        
         Args:
             time: Current time in seconds
             
         Returns:
             Current in Amperes
         """
-        if not self.is_active or self.activation_time is None or time < self.activation_time:
-            return 0.0
-        
-        # Time since activation
-        dt = time - self.activation_time
-        
-        # RLC circuit parameters
-        L = self.inductance
-        C = self.capacitance
-        R = self.properties.resistance
-        
-        # Calculate circuit characteristics
-        omega_0 = 1 / np.sqrt(L * C)  # Natural frequency
-        alpha = R / (2 * L)  # Damping coefficient
-        
-        # Handle edge cases
-        if dt <= 0:
-            return 0.0
-        if L <= 0 or C <= 0:
+        if not self._is_live(time):
             return 0.0
-            
-        # Determine circuit type and calculate current with correct physics
-        if alpha < omega_0:
-            # Underdamped oscillation
-            omega_d = np.sqrt(omega_0**2 - alpha**2)  # Damped frequency
-            
-            # Correct RLC current with proper initial conditions I(0) = 0
-            # I(t) = (V₀/ωₐL) * e^(-αt) * sin(ωₐt)
-            current = (self.voltage / (omega_d * L)) * np.exp(-alpha * dt) * np.sin(omega_d * dt)
-            
-        elif abs(alpha - omega_0) < 1e-6:  # Critically damped (with numerical tolerance)
-            # Critically damped: I(t) = (V₀/L) * t * e^(-αt)
-            current = (self.voltage / L) * dt * np.exp(-alpha * dt)
-            
-        else:
-            # Overdamped: I(t) = (V₀/L) * (1/(α₂-α₁)) * (e^(-α₁t) - e^(-α₂t))
-            # where α₁,₂ = α ± √(α² - ω₀²)
-            discriminant = alpha**2 - omega_0**2
-            if discriminant > 0:
-                sqrt_disc = np.sqrt(discriminant)
-                alpha1 = alpha - sqrt_disc
-                alpha2 = alpha + sqrt_disc
-                
-                if abs(alpha2 - alpha1) > 1e-12:  # Avoid division by zero
-                    current = (self.voltage / L) * (1 / (alpha2 - alpha1)) * (
-                        np.exp(-alpha1 * dt) - np.exp(-alpha2 * dt)
-                    )
-                else:
-                    current = 0.0
-            else:
-                current = 0.0
         
-        # Current should naturally be non-negative for first half-cycle
-        # After that, it can go negative but we'll limit for physical realism
-        return max(0.0, current)
+        return self.circuit.current(time - self.activation_time)
     
     def get_current_derivative(self, time: float) -> float:
         """
@@ -182,66 +536,56 @@ class AccelerationStage(Coil):
         Returns:
             Current derivative in Amperes per second
         """
-        if not self.is_active or self.activation_time is None or time < self.activation_time:
+        if not self._is_live(time):
             return 0.0
         
-        # Time since activation
-        dt = time - self.activation_time
-        
-        # RLC circuit parameters
-        L = self.inductance
-        C = self.capacitance
-        R = self.properties.resistance
+        return self.circuit.derivative(time - self.activation_time)
+    
+    def get_current_state(self, time: float) -> Tuple[float, float]:
+        """
+        Calculate current and its time derivative together
         
-        # Calculate circuit characteristics
-        omega_0 = 1 / np.sqrt(L * C)  # Natural frequency
-        alpha = R / (2 * L)  # Damping coefficient
+        Shares the exp/sin/cos evaluations between I and dI/dt, so callers
+        that need both pay for the transcendental functions once.
         
-        # Handle edge cases
-        if dt <= 0:
-            return self.voltage / L  # Initial derivative at t=0
-        if L <= 0 or C <= 0:
-            return 0.0
-            
-        # Calculate derivative based on circuit type
-        if alpha < omega_0:
-            # Underdamped oscillation
-            omega_d = np.sqrt(omega_0**2 - alpha**2)  # Damped frequency
-            
-            # dI/dt for underdamped RLC
-            # I(t) = (V₀/ωₐL) * e^(-αt) * sin(ωₐt)
-            # dI/dt = (V₀/ωₐL) * e^(-αt) * [ωₐ*cos(ωₐt) - α*sin(ωₐt)]
-            amplitude = self.voltage / (omega_d * L)
-            exp_term = np.exp(-alpha * dt)
-            cos_term = omega_d * np.cos(omega_d * dt)
-            sin_term = alpha * np.sin(omega_d * dt)
-            
-            derivative = amplitude * exp_term * (cos_term - sin_term)
+        Args:
+            time: Current time in seconds
             
-        elif abs(alpha - omega_0) < 1e-6:  # Critically damped
-            # Critically damped: I(t) = (V₀/L) * t * e^(-αt)
-            # dI/dt = (V₀/L) * e^(-αt) * (1 - αt)
-            derivative = (self.voltage / L) * np.exp(-alpha * dt) * (1 - alpha * dt)
+        Returns:
+            Tuple of (current in A, current derivative in A/s)
+        """
+        if not self._is_live(time):
+            return 0.0, 0.0
+        
+        return self.circuit.state(time - self.activation_time)
+    
+    def get_current_waveform(self, times) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate current and dI/dt over an array of times in one call
+        
+        Vectorized counterpart of get_current / get_current_derivative,
+        intended for post-processing and plotting of long runs.
+        
+        Args:
+            times: Array of simulation times in seconds
             
-        else:
-            # Overdamped: I(t) = (V₀/L) * (1/(α₂-α₁)) * (e^(-α₁t) - e^(-α₂t))
-            # dI/dt = (V₀/L) * (1/(α₂-α₁)) * (-α₁*e^(-α₁t) + α₂*e^(-α₂t))
-            discriminant = alpha**2 - omega_0**2
-            if discriminant > 0:
-                sqrt_disc = np.sqrt(discriminant)
-                alpha1 = alpha - sqrt_disc
-                alpha2 = alpha + sqrt_disc
-                
-                if abs(alpha2 - alpha1) > 1e-12:  # Avoid division by zero
-                    derivative = (self.voltage / L) * (1 / (alpha2 - alpha1)) * (
-                        -alpha1 * np.exp(-alpha1 * dt) + alpha2 * np.exp(-alpha2 * dt)
-                    )
-                else:
-                    derivative = 0.0
-            else:
-                derivative = 0.0
-        
-        return derivative
+        Returns:
+            Tuple of (current, current_derivative) arrays, same shape as times
+        """
+        times = np.asarray(times, dtype=float)
+        if not self.is_active or self.activation_time is None:
+            return np.zeros(times.shape), np.zeros(times.shape)
+        
+        circuit = self.circuit
+        current, derivative = evaluate_discharge(
+            times - self.activation_time, circuit.alpha, circuit.frequency,
+            circuit.scale, circuit.underdamped, circuit.critical
+        )
+        if self.retirement_time is not None:
+            finished = times >= self.retirement_time
+            current = np.where(finished, 0.0, current)
+            derivative = np.where(finished, 0.0, derivative)
+        return current, derivative
     
     @property
     def stored_energy(self) -> float:
@@ -275,6 +619,10 @@ class AccelerationStage(Coil):
         if not self.is_active or self.activation_time is None or time < self.activation_time:
             return 0.0
         
+        # A retired stage's account is closed at its retirement time
+        if self.retirement_time is not None:
+            time = min(time, self.retirement_time)
+        
         # Simplified calculation - in real system would integrate I²R losses
         # For now, assume exponential decay based on RC time constant
         dt = time - self.activation_time
@@ -289,11 +637,15 @@ class AccelerationStage(Coil):
         """Reset stage to initial state"""
         self.is_active = False
         self.activation_time = None
+        self.retirement_time = None
         self.current = 0.0
+        self._sync_bank()
     
     def __str__(self) -> str:
         """String representation for debugging"""
         status = "Active" if self.is_active else "Inactive"
+        if self.is_retired:
+            status = "Retired"
         return (f"AccelerationStage(id={self.stage_id}, "
                 f"position={self.properties.position:.3f}m, "
                 f"turns={self.properties.turns}, "
@@ -130,6 +130,9 @@ class Capsule(Coil):
         """
         Apply force for given time step using basic kinematics
         
+        Same constant-force update as PhysicsEngine.update_kinematics with
+        kinematics='euler' (exact for a force constant over the step).
+        
         Args:
             force: Applied force in Newtons
             time_step: Time step in seconds
@@ -137,12 +140,12 @@ class Capsule(Coil):
         # F = ma, so a = F/m
         acceleration = force / self.mass
         
+        # Update position: x = x₀ + v₀t + 0.5at² (with the velocity before the step)
+        self.position += self.velocity * time_step + 0.5 * acceleration * time_step**2
+        
         # Update velocity: v = v₀ + at
         self.velocity += acceleration * time_step
         
-        # Update position: x = x₀ + v₀t + 0.5at²
-        self.position += self.velocity * time_step + 0.5 * acceleration * time_step**2
-        
         # Update properties position
         self.update_position(self.position)
     
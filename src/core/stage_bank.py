@@ -0,0 +1,407 @@
+"""
+StageBank class - Structure-of-arrays view over acceleration stages
+Lets the simulation evaluate every stage with one NumPy expression per step
+"""
+
+import numpy as np
+from typing import List, Optional, TYPE_CHECKING
+
+from .acceleration_stage import evaluate_discharge
+
+if TYPE_CHECKING:
+    from .acceleration_stage import AccelerationStage
+
+
+class StageBank:
+    """
+    Contiguous NumPy storage for the parameters and state of a set of stages
+    
+    Follows SOLID principles:
+    - Single Responsibility: Holds stage data in array form, no physics decisions
+    - Open/Closed: AccelerationStage objects stay the public domain model;
+      the bank is an additional, vectorized view over them
+      
+    Stages bound to a bank write their activation state through to it, so
+    calling ``stage.activate()`` or ``stage.reset()`` directly keeps the
+    arrays consistent without any per-step synchronisation loop.
+    """
+    
+    def __init__(self, stages: List['AccelerationStage']):
+        """
+        Build the bank from a list of acceleration stages
+        
+        Args:
+            stages: Acceleration stages to pack into arrays
+        """
+        self.stages = list(stages)
+        count = len(self.stages)
+        
+        # Geometry
+        self.positions = np.zeros(count)
+        self.turns = np.zeros(count)
+        self.radii = np.zeros(count)
+        self.lengths = np.zeros(count)
+        
+        # Circuit parameters
+        self.inductances = np.zeros(count)
+        self.resistances = np.zeros(count)
+        self.capacitances = np.zeros(count)
+        self.voltages = np.zeros(count)
+        
+        # Derived circuit characteristics (constant during a shot)
+        self.alphas = np.zeros(count)         # Damping coefficient R/2L
+        self.frequencies = np.zeros(count)    # omega_d (underdamped) or sqrt(alpha² - omega_0²)
+        self.scales = np.zeros(count)         # V0/L
+        self.underdamped = np.zeros(count, dtype=bool)
+        self.critically_damped = np.zeros(count, dtype=bool)
+        
+        # Activation state (NaN activation time = not fired, NaN
+        # retirement time = still discharging or not fired)
+        self.activation_times = np.full(count, np.nan)
+        self.retirement_times = np.full(count, np.nan)
+        self.active = np.zeros(count, dtype=bool)     # Fired
+        self.retired = np.zeros(count, dtype=bool)    # Fired and finished
+        self._active_indices = np.zeros(0, dtype=int)
+        self._active_view = None
+        self._quiet = None       # Cached (threshold, quiet time) for the active set
+        self._retirements = None  # Cached (policy, retirement times) for the active set
+        
+        for index, stage in enumerate(self.stages):
+            stage._bank = self
+            stage._bank_index = index
+            self._load_stage(index)
+        self._refresh_active_indices()
+        
+        # Trigger points sorted along the tube, with a pointer to the next one
+        self._next_trigger = 0
+        self._refresh_triggers()
+    
+    def __len__(self) -> int:
+        return len(self.stages)
+    
+    @property
+    def activation_distances(self) -> np.ndarray:
+        """Capsule distance at which each stage fires (at least 1cm)"""
+        return np.maximum(self.lengths, 0.01)
+    
+    @property
+    def active_indices(self) -> np.ndarray:
+        """Indices of stages that have been activated and not yet retired"""
+        return self._active_indices
+    
+    @property
+    def active_count(self) -> int:
+        """Number of stages that have been activated and not yet retired"""
+        return int(self._active_indices.size)
+    
+    @property
+    def fired_count(self) -> int:
+        """Number of stages that have been activated, retired or not"""
+        return int(np.count_nonzero(self.active))
+    
+    def _load_stage(self, index: int):
+        """Copy parameters and activation state of one stage into the arrays"""
+        stage = self.stages[index]
+        props = stage.properties
+        
+        self.positions[index] = props.position
+        self.turns[index] = props.turns
+        self.radii[index] = props.diameter / 2
+        self.lengths[index] = props.length
+        self.inductances[index] = stage.inductance
+        self.resistances[index] = props.resistance
+        self.capacitances[index] = stage.capacitance
+        self.voltages[index] = stage.voltage
+        
+        # Precompiled coefficients from the stage (rebuilt only on parameter change)
+        circuit = stage.circuit
+        self.alphas[index] = circuit.alpha
+        self.frequencies[index] = circuit.frequency
+        self.scales[index] = circuit.scale
+        self.underdamped[index] = circuit.underdamped
+        self.critically_damped[index] = circuit.critical
+        
+        fired = stage.is_active and stage.activation_time is not None
+        self.active[index] = fired
+        self.activation_times[index] = stage.activation_time if fired else np.nan
+        self.retired[index] = fired and stage.retirement_time is not None
+        self.retirement_times[index] = stage.retirement_time if self.retired[index] else np.nan
+    
+    @property
+    def next_trigger_position(self) -> float:
+        """Trigger point of the next stage ahead of the trigger pointer (inf if none)"""
+        if self._next_trigger < self._sorted_triggers.size:
+            return float(self._sorted_triggers[self._next_trigger])
+        return np.inf
+    
+    def _refresh_triggers(self):
+        """Rebuild the sorted trigger points (stage fires when the capsule reaches them)"""
+        # Spatial index - stages sorted by position
+        self._position_order = np.argsort(self.positions, kind='stable')
+        self._sorted_positions = self.positions[self._position_order]
+        self._max_activation_distance = float(self.activation_distances.max()) if len(self) else 0.0
+        
+        self.trigger_positions = self.positions - self.activation_distances
+        self._trigger_order = np.argsort(self.trigger_positions, kind='stable')
+        self._sorted_triggers = self.trigger_positions[self._trigger_order]
+        self._next_trigger = min(self._next_trigger, self._sorted_triggers.size)
+    
+    def _refresh_active_indices(self):
+        self._active_indices = np.flatnonzero(self.active & ~self.retired)
+        self._active_view = self._gather(self._active_indices)
+        self._quiet = None
+        self._retirements = None
+    
+    def _gather(self, indices: np.ndarray) -> tuple:
+        """Collect activation times and discharge coefficients for a subset of stages"""
+        return (
+            self.activation_times[indices],
+            self.alphas[indices],
+            self.frequencies[indices],
+            self.scales[indices],
+            self.underdamped[indices],
+            self.critically_damped[indices],
+        )
+    
+    def sync_stage(self, index: int):
+        """
+        Re-read one stage after its state changed
+        
+        Called by AccelerationStage whenever it is activated or reset, or
+        when its voltage, capacitance or properties change.
+        
+        Args:
+            index: Position of the stage in the bank
+        """
+        geometry = (self.positions[index], self.lengths[index])
+        self._load_stage(index)
+        self._refresh_active_indices()
+        if geometry != (self.positions[index], self.lengths[index]):
+            self._refresh_triggers()
+    
+    def check_activations(self, position: float, time: float) -> np.ndarray:
+        """
+        Activate every idle stage the capsule is within firing distance of
+        
+        Args:
+            position: Capsule position in meters
+            time: Current simulation time in seconds
+            
+        Returns:
+            Indices of the stages activated by this call
+        """
+        nearby = self.stages_within(position, self._max_activation_distance)
+        in_range = np.abs(position - self.positions[nearby]) <= self.activation_distances[nearby]
+        fired = np.sort(nearby[in_range & ~self.active[nearby]])
+        for index in fired:
+            self.stages[index].activate(time)
+        return fired
+    
+    def stages_within(self, position: float, radius: float) -> np.ndarray:
+        """
+        Indices of the stages within a distance of a position
+        
+        Bisects the position-sorted stage index, so the cost depends on the
+        number of stages returned, not on the length of the tube.
+        
+        Args:
+            position: Capsule position in meters
+            radius: Search radius in meters
+            
+        Returns:
+            Stage indices ordered by stage position
+        """
+        low = np.searchsorted(self._sorted_positions, position - radius, side='left')
+        high = np.searchsorted(self._sorted_positions, position + radius, side='right')
+        return self._position_order[low:high]
+    
+    def active_within(self, position: float, radius: float) -> Optional[np.ndarray]:
+        """
+        Active (fired, not retired) stages within a distance of a position
+        
+        Args:
+            position: Capsule position in meters
+            radius: Interaction radius in meters
+            
+        Returns:
+            Stage indices ordered by stage position, or None if the radius
+            covers every stage (use active_indices and the cached view)
+        """
+        nearby = self.stages_within(position, radius)
+        if nearby.size == len(self):
+            return None
+        return nearby[self.active[nearby] & ~self.retired[nearby]]
+    
+    def seek_trigger(self, position: float):
+        """
+        Move the trigger pointer to the first trigger point beyond a position
+        
+        Stages whose trigger point lies behind the position are not fired;
+        use check_activations for the stages whose window the capsule is in.
+        
+        Args:
+            position: Capsule position in meters
+        """
+        self._next_trigger = int(np.searchsorted(self._sorted_triggers, position, side='right'))
+    
+    def take_crossed(self, position: float) -> np.ndarray:
+        """
+        Advance the trigger pointer past every trigger point up to a position
+        
+        A capsule moving forward costs one comparison against
+        next_trigger_position per step; only when it is passed does the
+        pointer move.
+        
+        Args:
+            position: Capsule position in meters
+            
+        Returns:
+            Indices of the idle stages whose trigger points were passed, in
+            the order they were reached
+        """
+        start = self._next_trigger
+        end = start
+        while end < self._sorted_triggers.size and self._sorted_triggers[end] <= position:
+            end += 1
+        self._next_trigger = end
+        crossed = self._trigger_order[start:end]
+        return crossed[~self.active[crossed]]
+    
+    def discharge_state(self, time: float, indices: np.ndarray = None):
+        """
+        Evaluate RLC discharge current and dI/dt for a set of stages at once
+        
+        Mirrors AccelerationStage.get_current (clamped at zero) and
+        AccelerationStage.get_current_derivative for every selected stage.
+        
+        Args:
+            time: Current simulation time in seconds
+            indices: Stage indices to evaluate (default: active stages)
+            
+        Returns:
+            Tuple of (current, current_derivative) arrays
+        """
+        view = self._active_view if indices is None else self._gather(indices)
+        activation_times, *coefficients = view
+        return evaluate_discharge(time - activation_times, *coefficients)
+    
+    def discharge_waveforms(self, times, indices: np.ndarray = None):
+        """
+        Evaluate current and dI/dt of many stages over a whole time axis
+        
+        Args:
+            times: Array of simulation times in seconds
+            indices: Stage indices to evaluate (default: all stages)
+            
+        Returns:
+            Tuple of (current, current_derivative) arrays of shape
+            (n_stages, n_times); stages that never fired are all zero
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        activation_times, *coefficients = self._gather(indices)
+        times = np.asarray(times, dtype=float)
+        elapsed = times[np.newaxis, :] - activation_times[:, np.newaxis]
+        current, derivative = evaluate_discharge(
+            elapsed, *(value[:, np.newaxis] for value in coefficients))
+        
+        # Retired stages carry no current from their retirement time on
+        finished = times[np.newaxis, :] >= self.retirement_times[indices][:, np.newaxis]
+        if finished.any():
+            current = np.where(finished, 0.0, current)
+            derivative = np.where(finished, 0.0, derivative)
+        return current, derivative
+    
+    def quiet_time(self, threshold: float) -> float:
+        """
+        Time after which no active stage's current can exceed a threshold
+        
+        Based on each stage's discharge envelope (see
+        CircuitCoefficients.quiet_time); cached until the active set or a
+        stage's parameters change.
+        
+        Args:
+            threshold: Current threshold in Amperes
+            
+        Returns:
+            Simulation time in seconds (-inf if no stage is active)
+        """
+        if self._quiet is None or self._quiet[0] != threshold:
+            quiet = -np.inf
+            for index in self._active_indices:
+                delay = self.stages[index].circuit.quiet_time(threshold)
+                quiet = max(quiet, self.activation_times[index] + delay)
+            self._quiet = (threshold, quiet)
+        return self._quiet[1]
+    
+    def retire_finished(self, time: float, threshold: float,
+                        single_pulse: bool = False) -> np.ndarray:
+        """
+        Retire active stages whose discharge is over
+        
+        A stage is over once its envelope can no longer exceed the current
+        threshold (see CircuitCoefficients.quiet_time) or, with
+        single_pulse, after its first half-cycle as with a thyristor
+        switch. Retired stages drop out of the active set and stop costing
+        anything per step. Retirement times are scheduled when the active
+        set changes, so a call with nothing due is one comparison.
+        
+        Args:
+            time: Current simulation time in seconds
+            threshold: Current threshold in Amperes
+            single_pulse: Also end each discharge at its first zero crossing
+            
+        Returns:
+            Indices of the stages retired by this call
+        """
+        policy = (threshold, single_pulse)
+        if self._retirements is None or self._retirements[0] != policy:
+            due = np.empty(self._active_indices.size)
+            for position, index in enumerate(self._active_indices):
+                circuit = self.stages[index].circuit
+                delay = circuit.quiet_time(threshold)
+                if single_pulse:
+                    delay = min(delay, circuit.pulse_end)
+                due[position] = self.activation_times[index] + delay
+            self._retirements = (policy, due, due.min() if due.size else np.inf)
+        
+        _, due, earliest = self._retirements
+        if time < earliest:
+            return np.zeros(0, dtype=int)
+        
+        finished = [(index, retire_time) for index, retire_time in zip(self._active_indices, due)
+                    if retire_time <= time]
+        for index, retire_time in finished:
+            self.stages[index].retire(float(retire_time))
+        return np.array([index for index, _ in finished], dtype=int)
+    
+    def total_current(self, time: float) -> float:
+        """
+        Sum of the discharge currents of all active stages
+        
+        Args:
+            time: Current simulation time in seconds
+            
+        Returns:
+            Total stage current in Amperes
+        """
+        if self._active_indices.size == 0:
+            return 0.0
+        current, _ = self.discharge_state(time)
+        return float(current.sum())
+    
+    def reset(self):
+        """Reset every stage (and therefore the bank) to the idle state"""
+        for stage in self.stages:
+            stage.reset()
+        self._next_trigger = 0
+    
+    def __str__(self) -> str:
+        """String representation for debugging"""
+        return (f"StageBank(stages={len(self)}, active={self.active_count}, "
+                f"retired={int(np.count_nonzero(self.retired))})")
+    
+    def __repr__(self) -> str:
+        """Detailed representation for debugging"""
+        return (f"StageBank(stages={len(self)}, "
+                f"active_indices={self._active_indices.tolist()})")
@@ -64,6 +64,11 @@ class MatlabBridge:
                 'initial_energy': result.initial_energy,
                 'final_kinetic_energy': result.final_kinetic_energy,
                 'max_force': result.max_force,
+                'min_force': result.min_force,
+                'peak_acceleration': result.peak_acceleration,
+                'peak_capsule_current': result.peak_capsule_current,
+                'exit_time': np.nan if result.exit_time is None else result.exit_time,
+                'stage_firing_times': result.stage_firing_times,
                 'energy_efficiency': result.energy_efficiency,
                 
                 # Time series data
@@ -7,7 +7,7 @@ import sys
 import os
 import json
 import argparse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.core.capsule import Capsule
 from src.core.acceleration_stage import AccelerationStage
 from src.services.simulation_service import SimulationService
+from src.services.recording import parse_recording_policy
 from src.matlab.bridge import MatlabBridge
 
 
@@ -30,8 +31,11 @@ def run_simulation_from_params(
     stage_diameter: float = 0.09,
     stage_length: float = 0.05,
     max_time: float = 5.0,
-    time_step: float = 1e-5,
-    output_file: Optional[str] = None
+    time_step: Union[float, str] = 1e-5,
+    output_file: Optional[str] = None,
+    integrator: str = 'fixed',
+    rtol: float = 1e-6,
+    record: str = 'all'
 ) -> Dict[str, Any]:
     """
     Run electromagnetic gun simulation with specified parameters.
@@ -50,8 +54,12 @@ def run_simulation_from_params(
         stage_diameter: Stage coil diameter in m
         stage_length: Stage coil length in m
         max_time: Maximum simulation time in s
-        time_step: Time step for simulation in s
+        time_step: Time step for simulation in s, or 'auto'
         output_file: Optional output file base name
+        integrator: 'fixed' or adaptive 'rk45'
+        rtol: Relative tolerance for the adaptive integrator
+        record: Recording policy - 'all', 'every:K', 'interval:SECONDS' or
+            'adaptive[:RTOL]'; shrinks the exported time series
         
     Returns:
         Dictionary with simulation results
@@ -76,8 +84,9 @@ def run_simulation_from_params(
         stages.append(stage)
     
     # Create and run simulation
-    service = SimulationService(capsule, stages, tube_length=tube_length)
-    service.dt = time_step
+    service = SimulationService(capsule, stages, tube_length=tube_length, dt=time_step,
+                                integrator=integrator, rtol=rtol,
+                                recording=parse_recording_policy(record))
     
     result = service.run(max_time=max_time)
     
@@ -89,6 +98,8 @@ def run_simulation_from_params(
         'initial_energy': result.initial_energy,
         'final_kinetic_energy': result.final_kinetic_energy,
         'max_force': result.max_force,
+        'peak_acceleration': result.peak_acceleration,
+        'exit_time': result.exit_time,
         'energy_efficiency': result.energy_efficiency,
         'data_points': len(result.history),
         
@@ -107,7 +118,10 @@ def run_simulation_from_params(
             'num_stages': num_stages,
             'stage_voltage': stage_voltage,
             'max_time': max_time,
-            'time_step': time_step
+            'time_step': service.dt,
+            'time_step_reason': service.dt_reason,
+            'integrator': integrator,
+            'record': record
         }
     }
     
@@ -163,8 +177,15 @@ Examples:
     # Simulation parameters
     parser.add_argument('--max-time', type=float, default=5.0,
                         help='Max simulation time in s (default: 5.0)')
-    parser.add_argument('--time-step', type=float, default=1e-5,
-                        help='Time step in s (default: 1e-5)')
+    parser.add_argument('--time-step', type=SimulationService.parse_time_step, default=1e-5,
+                        help="Time step in s, or 'auto' (default: 1e-5)")
+    parser.add_argument('--integrator', choices=SimulationService.INTEGRATORS, default='fixed',
+                        help='Time integrator: fixed or adaptive rk45 (default: fixed)')
+    parser.add_argument('--rtol', type=float, default=1e-6,
+                        help='Relative tolerance for rk45 (default: 1e-6)')
+    parser.add_argument('--record', default='all',
+                        help="Recorded steps: all, every:K, interval:SECONDS or "
+                             "adaptive[:RTOL] (default: all)")
     
     # Output
     parser.add_argument('--output', '-o', type=str,
@@ -185,7 +206,10 @@ Examples:
             stage_capacitance=args.capacitance,
             max_time=args.max_time,
             time_step=args.time_step,
-            output_file=args.output
+            output_file=args.output,
+            integrator=args.integrator,
+            rtol=args.rtol,
+            record=args.record
         )
         
         if args.json_only:
@@ -0,0 +1,131 @@
+"""
+Coaxial filament model - High-fidelity mutual inductance between coaxial coils
+Sums exact loop-loop mutual inductance (complete elliptic integrals) over turns
+"""
+
+import numpy as np
+from functools import lru_cache
+from scipy.special import ellipe, ellipk
+from typing import Tuple
+
+from .inductance_table import MutualInductanceTable
+
+MU_0 = 4 * np.pi * 1e-7  # Permeability of free space (H/m)
+
+
+def filament_mutual_inductance(radius1, radius2, separation,
+                               mu_0: float = MU_0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact mutual inductance of two coaxial circular filaments and its gradient
+    
+    Maxwell's formula with k² = 4ab / ((a + b)² + z²):
+        M = μ₀ √(ab) [(2/k - k) K(k) - (2/k) E(k)]
+        dM/dz = -μ₀ z k / (4√(ab)) [(2 - k²) / (1 - k²) E(k) - 2 K(k)]
+        
+    Coincident loops of equal radius (k = 1) are singular; k² is capped just
+    below one so the result stays finite.
+    
+    Args:
+        radius1: Radius of the first loop(s) in meters
+        radius2: Radius of the second loop(s) in meters
+        separation: Signed axial separation z in meters
+        mu_0: Permeability in H/m
+        
+    Returns:
+        Tuple of (mutual inductance in H, dM/dz in H/m) arrays
+    """
+    z = np.asarray(separation, dtype=float)
+    ab = radius1 * radius2
+    m = np.minimum(4 * ab / ((radius1 + radius2)**2 + z**2), 1 - 1e-12)  # m = k²
+    k = np.sqrt(m)
+    K = ellipk(m)
+    E = ellipe(m)
+    root = np.sqrt(ab)
+    
+    mutual_inductance = mu_0 * root * ((2 / k - k) * K - (2 / k) * E)
+    gradient = -mu_0 * z * k / (4 * root) * ((2 - m) / (1 - m) * E - 2 * K)
+    return mutual_inductance, gradient
+
+
+def _filament_offsets(turns: float, length: float, min_filaments: int,
+                      max_filaments: int) -> Tuple[np.ndarray, float]:
+    """Axial filament positions (relative to the coil center) and turns per filament"""
+    count = int(np.clip(round(turns), min_filaments, max_filaments))
+    if count == 1:
+        return np.zeros(1), float(turns)
+    pitch = length / count
+    offsets = (np.arange(count) - (count - 1) / 2) * pitch
+    return offsets, turns / count
+
+
+def coaxial_coil_mutual_inductance(radius1: float, turns1: float, length1: float,
+                                   radius2: float, turns2: float, length2: float,
+                                   distances, min_filaments: int = 8,
+                                   max_filaments: int = 200,
+                                   mu_0: float = MU_0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mutual inductance of two coaxial single-layer coils and its distance gradient
+    
+    Each coil is discretised into equally spaced filaments along its length
+    (one per turn, at least min_filaments so one-turn sleeves such as the
+    capsule are treated as a current sheet, at most max_filaments). The
+    filament-filament terms are evaluated in one vectorized call over every
+    (distance, filament pair) combination; pairs with the same axial offset
+    are evaluated once and weighted by their multiplicity.
+    
+    Args:
+        radius1, turns1, length1: Geometry of the first coil
+        radius2, turns2, length2: Geometry of the second coil
+        distances: Center-to-center distances in meters (array or scalar)
+        min_filaments: Minimum filaments per coil
+        max_filaments: Maximum filaments per coil
+        mu_0: Permeability in H/m
+        
+    Returns:
+        Tuple of (mutual inductance in H, dM/dx in H/m) with the shape of distances
+    """
+    distances = np.asarray(distances, dtype=float)
+    offsets1, weight1 = _filament_offsets(turns1, length1, min_filaments, max_filaments)
+    offsets2, weight2 = _filament_offsets(turns2, length2, min_filaments, max_filaments)
+    
+    # Relative axial offsets of every filament pair, deduplicated
+    pair_offsets = (offsets2[np.newaxis, :] - offsets1[:, np.newaxis]).ravel()
+    pair_offsets, multiplicity = np.unique(np.round(pair_offsets, 12), return_counts=True)
+    weights = weight1 * weight2 * multiplicity
+    
+    separation = distances.reshape(-1, 1) + pair_offsets[np.newaxis, :]
+    mutual_inductance, gradient = filament_mutual_inductance(radius1, radius2, separation, mu_0)
+    
+    return ((mutual_inductance @ weights).reshape(distances.shape),
+            (gradient @ weights).reshape(distances.shape))
+
+
+@lru_cache(maxsize=64)
+def coaxial_coil_table(radius1: float, turns1: float, length1: float,
+                       radius2: float, turns2: float, length2: float,
+                       points: int = 2048, interpolation: str = 'cubic',
+                       mu_0: float = MU_0) -> MutualInductanceTable:
+    """
+    Memoized M(x) table of the filament model for one coil-pair geometry
+    
+    Building a table costs a few thousand filament sums; the cache shares
+    it between engines and runs (ensembles, parameter sweeps) so a shot
+    afterwards pays only for interpolation.
+    
+    Args:
+        radius1, turns1, length1: Geometry of the first coil
+        radius2, turns2, length2: Geometry of the second coil
+        points: Grid nodes in the table
+        interpolation: 'cubic' or 'linear'
+        mu_0: Permeability in H/m
+        
+    Returns:
+        MutualInductanceTable covering 0 to 20 times the largest coil dimension
+    """
+    return MutualInductanceTable(
+        lambda d: coaxial_coil_mutual_inductance(radius1, turns1, length1,
+                                                 radius2, turns2, length2, d, mu_0=mu_0),
+        max_distance=20 * max(length1, length2, radius1, radius2),
+        points=points,
+        interpolation=interpolation,
+    )
@@ -0,0 +1,145 @@
+"""
+MutualInductanceTable class - Precomputed M(x) and dM/dx for one coil pair
+Lets the physics engine replace model evaluations by table interpolation
+"""
+
+import numpy as np
+from typing import Callable, Sequence, Tuple
+
+
+class MutualInductanceTable:
+    """
+    Tabulated mutual inductance and gradient over coil separation
+    
+    Follows SOLID principles:
+    - Single Responsibility: Stores and interpolates one M(x) curve, no physics
+    - Open/Closed: Any inductance model can be tabulated through a callback
+    
+    The distance range is split into segments at the model's breakpoints
+    (e.g. the overlap/far-field switch of the approximate model). Each
+    segment has its own uniform grid whose end nodes hold the one-sided
+    limits, so a discontinuous model is never interpolated across its jump.
+    Beyond the last node the curve is continued with the dipole law
+    M ∝ 1/d³, which every coaxial model follows in the far field.
+    """
+    
+    INTERPOLATIONS = ('cubic', 'linear')
+    
+    def __init__(self, evaluate: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+                 max_distance: float, points: int = 2048,
+                 breakpoints: Sequence[float] = (), interpolation: str = 'cubic'):
+        """
+        Sample the model and build the table
+        
+        Args:
+            evaluate: Function returning (M, dM/dx) arrays for a distance array
+            max_distance: Largest tabulated distance in meters
+            points: Approximate total number of grid nodes
+            breakpoints: Distances where the model may be discontinuous
+            interpolation: 'cubic' (Hermite, uses dM/dx) or 'linear'
+            
+        Raises:
+            ValueError: If the range, point count or interpolation is invalid
+        """
+        if max_distance <= 0:
+            raise ValueError("Table range must be positive")
+        if points < 4:
+            raise ValueError("Table needs at least 4 points")
+        if interpolation not in self.INTERPOLATIONS:
+            raise ValueError(f"Unknown interpolation '{interpolation}', "
+                             f"expected one of {self.INTERPOLATIONS}")
+                             
+        self.max_distance = float(max_distance)
+        self.interpolation = interpolation
+        
+        edges = [0.0] + sorted(b for b in breakpoints if 0 < b < max_distance) + [self.max_distance]
+        
+        # Per-segment grids - each gets a share of the points proportional to its width
+        starts, spacings, offsets, sizes = [], [], [], []
+        values, gradients = [], []
+        offset = 0
+        for left, right in zip(edges[:-1], edges[1:]):
+            size = max(4, int(round(points * (right - left) / self.max_distance)))
+            nodes = np.linspace(left, right, size)
+            
+            # One-sided limits at segment ends (model switches branch exactly at a breakpoint)
+            sample = nodes.copy()
+            sample[-1] = np.nextafter(right, left)
+            if left > 0:
+                sample[0] = np.nextafter(left, right)
+            m, g = evaluate(sample)
+            
+            starts.append(left)
+            spacings.append(nodes[1] - nodes[0])
+            offsets.append(offset)
+            sizes.append(size)
+            values.append(np.broadcast_to(m, nodes.shape))
+            gradients.append(np.broadcast_to(g, nodes.shape))
+            offset += size
+            
+        self._bounds = np.array(edges[1:-1])
+        self._starts = np.array(starts)
+        self._spacings = np.array(spacings)
+        self._offsets = np.array(offsets)
+        self._sizes = np.array(sizes)
+        self.values = np.concatenate(values)
+        self.gradients = np.concatenate(gradients)
+        
+        # Dipole tail anchored at the last node
+        self._tail_value = float(self.values[-1])
+    
+    def __len__(self) -> int:
+        return int(self.values.size)
+    
+    def evaluate(self, distances) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate mutual inductance and gradient
+        
+        Args:
+            distances: Non-negative distances in meters (array or scalar)
+            
+        Returns:
+            Tuple of (mutual inductance in H, dM/dx in H/m) arrays
+        """
+        distances = np.asarray(distances, dtype=float)
+        
+        segment = np.searchsorted(self._bounds, distances, side='right')
+        spacing = self._spacings[segment]
+        local = (np.minimum(distances, self.max_distance) - self._starts[segment]) / spacing
+        cell = np.clip(local.astype(int), 0, self._sizes[segment] - 2)
+        t = local - cell
+        index = self._offsets[segment] + cell
+        
+        m0, m1 = self.values[index], self.values[index + 1]
+        g0, g1 = self.gradients[index], self.gradients[index + 1]
+        
+        if self.interpolation == 'linear':
+            mutual_inductance = m0 + t * (m1 - m0)
+            gradient = g0 + t * (g1 - g0)
+        else:
+            # Cubic Hermite on (M, dM/dx) - continuous value and slope inside a segment
+            t2 = t * t
+            t3 = t2 * t
+            mutual_inductance = ((2 * t3 - 3 * t2 + 1) * m0 + (t3 - 2 * t2 + t) * spacing * g0 +
+                                 (3 * t2 - 2 * t3) * m1 + (t3 - t2) * spacing * g1)
+            gradient = ((6 * t2 - 6 * t) * (m0 - m1) / spacing +
+                        (3 * t2 - 4 * t + 1) * g0 + (3 * t2 - 2 * t) * g1)
+                        
+        beyond = distances > self.max_distance
+        if np.any(beyond):
+            with np.errstate(divide='ignore'):
+                tail = self._tail_value * (self.max_distance / distances) ** 3
+                mutual_inductance = np.where(beyond, tail, mutual_inductance)
+                gradient = np.where(beyond, -3 * tail / distances, gradient)
+                
+        return mutual_inductance, gradient
+    
+    def __str__(self) -> str:
+        """String representation for debugging"""
+        return (f"MutualInductanceTable(points={len(self)}, "
+                f"range={self.max_distance * 1000:.1f}mm, {self.interpolation})")
+    
+    def __repr__(self) -> str:
+        """Detailed representation for debugging"""
+        return (f"MutualInductanceTable(points={len(self)}, max_distance={self.max_distance}, "
+                f"segments={self._sizes.size}, interpolation='{self.interpolation}')")
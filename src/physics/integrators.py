@@ -0,0 +1,150 @@
+"""
+Time integrators - Explicit Runge-Kutta schemes with embedded error control
+Used by SimulationService for adaptive stepping of the capsule state
+"""
+
+import numpy as np
+from typing import Callable, Tuple
+
+
+class DormandPrince45:
+    """
+    Dormand-Prince 5(4) embedded Runge-Kutta pair (the scheme behind RK45)
+    
+    Follows SOLID principles:
+    - Single Responsibility: Advances an ODE state and estimates the local
+      error; knows nothing about coils or capsules
+    - Open/Closed: Any right-hand side f(t, y) -> dy/dt can be integrated
+    
+    The 5th-order solution is propagated and the difference to the embedded
+    4th-order solution serves as error estimate. The last stage is evaluated
+    at the new point (FSAL), so an accepted step costs six evaluations.
+    """
+    
+    C = np.array([0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0])
+    A = [
+        np.array([]),
+        np.array([1 / 5]),
+        np.array([3 / 40, 9 / 40]),
+        np.array([44 / 45, -56 / 15, 32 / 9]),
+        np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+        np.array([9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]),
+    ]
+    B = np.array([35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+    # Difference between 5th- and 4th-order weights (7 stages, last is FSAL)
+    E = np.array([71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+    ORDER = 4  # Order of the error estimate, used for step-size control
+    
+    def __init__(self, rtol: float = 1e-6, atol=1e-9, safety: float = 0.9,
+                 min_factor: float = 0.2, max_factor: float = 5.0):
+        """
+        Configure error control
+        
+        Args:
+            rtol: Relative tolerance
+            atol: Absolute tolerance (scalar or one value per state component)
+            safety: Safety factor applied to the optimal step-size estimate
+            min_factor: Largest allowed step shrink per attempt
+            max_factor: Largest allowed step growth per attempt
+            
+        Raises:
+            ValueError: If a tolerance is not positive
+        """
+        if rtol <= 0 or np.any(np.asarray(atol) <= 0):
+            raise ValueError("Tolerances must be positive")
+            
+        self.rtol = rtol
+        self.atol = np.asarray(atol, dtype=float)
+        self.safety = safety
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+    
+    def step(self, f: Callable[[float, np.ndarray], np.ndarray], t: float,
+             y: np.ndarray, h: float, k1: np.ndarray = None
+             ) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Attempt one step of size h
+        
+        Args:
+            f: Right-hand side f(t, y) returning dy/dt
+            t: Current time
+            y: Current state
+            h: Step size
+            k1: f(t, y) if already known (FSAL reuse)
+            
+        Returns:
+            Tuple of (new state, f at the new state, scaled error norm);
+            the step is acceptable when the error norm is at most 1
+        """
+        stages = [f(t, y) if k1 is None else k1]
+        for c, a in zip(self.C[1:], self.A[1:]):
+            stages.append(f(t + c * h, y + h * np.dot(a, stages)))
+            
+        y_new = y + h * np.dot(self.B, stages)
+        k_new = f(t + h, y_new)
+        stages.append(k_new)
+        
+        error = h * np.dot(self.E, stages)
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error_norm = float(np.sqrt(np.mean((error / scale) ** 2)))
+        return y_new, k_new, error_norm
+    
+    def next_step_size(self, h: float, error_norm: float) -> float:
+        """
+        Step size for the next attempt from the current error norm
+        
+        Args:
+            h: Step size just attempted
+            error_norm: Scaled error norm of that attempt
+            
+        Returns:
+            Proposed step size
+        """
+        if error_norm == 0:
+            factor = self.max_factor
+        else:
+            factor = self.safety * error_norm ** (-1 / (self.ORDER + 1))
+        return h * min(self.max_factor, max(self.min_factor, factor))
+    
+    def __str__(self) -> str:
+        """String representation for debugging"""
+        return f"DormandPrince45(rtol={self.rtol:g})"
+    
+    def __repr__(self) -> str:
+        """Detailed representation for debugging"""
+        return f"DormandPrince45(rtol={self.rtol}, atol={self.atol.tolist()})"
+
+
+def hermite_crossing_time(y0: float, rate0: float, y1: float, rate1: float,
+                          h: float, target: float, iterations: int = 60) -> float:
+    """
+    Time within a step at which a state component crosses a target value
+    
+    Interpolates the component with the cubic Hermite polynomial through
+    both step ends and their derivatives, then bisects for the crossing.
+    Used to locate events (e.g. stage triggers) inside an accepted step.
+    
+    Args:
+        y0: Value at the start of the step
+        rate0: Derivative at the start of the step
+        y1: Value at the end of the step
+        rate1: Derivative at the end of the step
+        h: Step size
+        target: Value to locate, with y0 < target <= y1
+        
+    Returns:
+        Crossing time in [0, h]
+    """
+    def value(t):
+        s = t / h
+        return ((2 * s**3 - 3 * s**2 + 1) * y0 + (s**3 - 2 * s**2 + s) * h * rate0 +
+                (3 * s**2 - 2 * s**3) * y1 + (s**3 - s**2) * h * rate1)
+                
+    low, high = 0.0, h
+    for _ in range(iterations):
+        middle = 0.5 * (low + high)
+        if value(middle) < target:
+            low = middle
+        else:
+            high = middle
+    return high
@@ -0,0 +1,298 @@
+"""
+CoupledSimulationService for electromagnetic gun simulation.
+
+Alternative engine that integrates the stage circuits, the capsule circuit
+and the capsule motion as one ODE system with scipy's stiff solvers.
+"""
+
+from typing import List, Optional
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from src.core.capsule import Capsule
+from src.core.acceleration_stage import AccelerationStage
+from src.core.stage_bank import StageBank
+from src.physics.physics_engine import PhysicsEngine
+from src.services.data_service import DataService
+from src.services.recording import RecordingPolicy
+from src.services.simulation_service import SimulationResult, StepContext
+
+
+class CoupledSimulationService:
+    """
+    Fully coupled circuit-mechanics simulation.
+    
+    Follows SOLID principles:
+    - Single Responsibility: Builds and solves the coupled ODE system;
+      physics comes from PhysicsEngine, recording from DataService
+    - Open/Closed: Any solve_ivp method can be used
+    - Liskov Substitution: run() returns the same SimulationResult as
+      SimulationService
+      
+    State vector: (x, v, I_capsule, V_1..V_n, I_1..I_n) - capsule position,
+    velocity and current, then every stage's capacitor voltage and current.
+    With the flux-linkage matrix
+    
+        Λ(x) = [[diag(L_stage), -M(x)], [-M(x)ᵀ, L_capsule]]
+        
+    the circuits obey d(Λ I)/dt + R I = (V, 0) and dV/dt = -I/C, and the
+    force is F = -I_capsule Σ I_stage dM/dx. This is the coupling
+    convention of SimulationService (gradients with respect to the
+    stage-capsule distance, capsule current positive along the induced
+    EMF), but the stage currents now feel the capsule's back-EMF instead
+    of following their closed-form discharge. Λ has arrow shape, so
+    dI/dt comes from an O(n) Schur-complement solve.
+    
+    Stages are open circuits until they fire; firing happens at the exact
+    trigger crossing (a terminal solver event), which splits the run into
+    segments with a constant set of conducting stages.
+    """
+    
+    METHODS = ('LSODA', 'Radau', 'BDF', 'RK45', 'DOP853')
+    
+    # Absolute tolerances for (position m, velocity m/s, capsule current A,
+    # capacitor voltage V, stage current A)
+    DEFAULT_ATOL = (1e-9, 1e-9, 1e-3, 1e-6, 1e-6)
+    
+    def __init__(self, capsule: Capsule, stages: List[AccelerationStage],
+                 tube_length: float, physics: Optional[PhysicsEngine] = None,
+                 method: str = 'LSODA', rtol: float = 1e-6, atol=None,
+                 max_step: float = np.inf, recording: Optional[RecordingPolicy] = None):
+        """
+        Initialize coupled simulation service.
+        
+        Args:
+            capsule: Projectile capsule to simulate
+            stages: List of acceleration stages
+            tube_length: Total tube length (m)
+            physics: Physics engine providing M(x) and dM/dx
+            method: solve_ivp method; LSODA switches to a stiff solver
+                automatically, Radau/BDF are always implicit
+            rtol: Relative tolerance
+            atol: Absolute tolerance, scalar or per kind of state component
+                (position, velocity, capsule current, voltage, stage current)
+                (default: DEFAULT_ATOL)
+            max_step: Upper bound on solver steps (s)
+            recording: Policy deciding which solver points are stored
+                (default: all)
+            
+        Raises:
+            ValueError: If the method is unknown
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {self.METHODS}")
+            
+        self.capsule = capsule
+        self.stages = stages
+        self.tube_length = tube_length
+        
+        # Array view over all stages - geometry and circuit parameters
+        self.bank = StageBank(stages)
+        
+        self.physics = physics or PhysicsEngine()
+        self.data = DataService(recording)
+        
+        # Solver settings
+        self.method = method
+        self.rtol = rtol
+        self.atol = self.DEFAULT_ATOL if atol is None else atol
+        self.max_step = max_step
+        
+        # Simulation state
+        self.time = 0.0
+        self.evaluations = 0  # Right-hand side evaluations of the last run
+        
+        # Stages conducting in the current segment (constant between triggers)
+        self._conducting = np.zeros(0, dtype=int)
+        
+        # Store initial conditions for reset
+        self._initial_capsule_state = {
+            'position': capsule.position,
+            'velocity': capsule.velocity,
+            'current': capsule.current
+        }
+    
+    def run(self, max_time: float = 0.01) -> SimulationResult:
+        """
+        Run the complete simulation.
+        
+        Every accepted solver step is offered to the recorder.
+        
+        Args:
+            max_time: Maximum simulation time (s)
+            
+        Returns:
+            SimulationResult with complete simulation data
+        """
+        initial_energy = sum(stage.stored_energy for stage in self.stages)
+        self.data.set_initial_energy(initial_energy)
+        self.data.set_tube_length(self.tube_length)
+        
+        count = len(self.bank)
+        state = np.concatenate((
+            [self.capsule.position, self.capsule.velocity, self.capsule.current],
+            self.bank.voltages, np.zeros(count)
+        ))
+        atol = self._atol_vector(count)
+        
+        # Stages whose window the capsule starts in fire immediately
+        self.bank.check_activations(self.capsule.position, self.time)
+        self.bank.seek_trigger(self.capsule.position)
+        self.evaluations = 0
+        self._conducting = np.flatnonzero(self.bank.active)
+        
+        self._record(self.time, state)
+        while self.time < max_time and state[0] < self.tube_length:
+            self._conducting = np.flatnonzero(self.bank.active)
+            trigger = self.bank.next_trigger_position
+            
+            def reaches_trigger(t, y):
+                return y[0] - trigger
+            reaches_trigger.terminal = True
+            reaches_trigger.direction = 1
+            
+            def reaches_exit(t, y):
+                return y[0] - self.tube_length
+            reaches_exit.terminal = True
+            reaches_exit.direction = 1
+            
+            solution = solve_ivp(self._derivatives, (self.time, max_time), state,
+                                 method=self.method, rtol=self.rtol, atol=atol,
+                                 max_step=self.max_step,
+                                 events=(reaches_trigger, reaches_exit))
+            if solution.status == -1:
+                raise RuntimeError(f"Coupled solver failed: {solution.message}")
+            self.evaluations += solution.nfev
+            
+            exited = solution.t_events[1].size > 0
+            if exited:
+                # Exact exit despite rounding
+                solution.y[0, -1] = max(solution.y[0, -1], self.tube_length)
+                
+            for time, point in zip(solution.t[1:], solution.y.T[1:]):
+                self._record(time, point)
+            self.time = float(solution.t[-1])
+            state = solution.y[:, -1].copy()
+            
+            if exited:
+                break
+            if solution.t_events[0].size:
+                # Fire every stage triggered at this point; they start conducting
+                # from the capacitor state stored in the state vector
+                for index in self.bank.take_crossed(max(state[0], trigger)):
+                    self.stages[index].activate(self.time)
+                    
+        self._store_state(state)
+        return self.data.get_results()
+    
+    def _derivatives(self, time: float, state: np.ndarray) -> np.ndarray:
+        """
+        Right-hand side of the coupled system.
+        
+        Args:
+            time: Time (s)
+            state: (x, v, I_capsule, V_1..V_n, I_1..I_n)
+            
+        Returns:
+            d(state)/dt
+        """
+        count = len(self.bank)
+        position, velocity, capsule_current = state[:3]
+        indices = self._conducting
+        voltage = state[3 + indices]
+        current = state[3 + count + indices]
+        
+        mutual_inductance, gradient = self._stage_mutual_inductance(position, indices)
+        inductance = self.bank.inductances[indices]
+        
+        # Λ dI/dt = b, solved through the Schur complement of the stage block
+        stage_rhs = (voltage - self.bank.resistances[indices] * current +
+                     gradient * velocity * capsule_current)
+        capsule_rhs = (-self.capsule.properties.resistance * capsule_current +
+                       velocity * np.dot(gradient, current))
+        capsule_rate = ((capsule_rhs + np.dot(mutual_inductance / inductance, stage_rhs)) /
+                        (self.capsule.inductance - np.dot(mutual_inductance**2, 1 / inductance)))
+        stage_rate = (stage_rhs + mutual_inductance * capsule_rate) / inductance
+        
+        force = -capsule_current * np.dot(current, gradient)
+        
+        derivative = np.zeros_like(state)
+        derivative[0] = velocity
+        derivative[1] = force / self.capsule.mass
+        derivative[2] = capsule_rate
+        derivative[3 + indices] = -current / self.bank.capacitances[indices]
+        derivative[3 + count + indices] = stage_rate
+        return derivative
+    
+    def _stage_mutual_inductance(self, position: float, indices: np.ndarray):
+        """
+        Mutual inductance and dM/dx between the capsule and a set of stages.
+        
+        Args:
+            position: Capsule position (m)
+            indices: Stage indices in the bank
+            
+        Returns:
+            Tuple of (mutual inductance in H, dM/dx in H/m) arrays
+        """
+        distance = np.maximum(0.001, np.abs(position - self.bank.positions[indices]))  # Minimum 1mm
+        props = self.capsule.properties
+        return self.physics.calculate_mutual_inductance_and_gradient_batch(
+            self.bank.radii[indices], self.bank.turns[indices], self.bank.lengths[indices],
+            props.diameter / 2, props.turns, props.length, distance
+        )
+    
+    def _atol_vector(self, count: int) -> np.ndarray:
+        """Absolute tolerance for every state component"""
+        atol = np.broadcast_to(np.asarray(self.atol, dtype=float), (5,))
+        return np.concatenate((atol[:3], np.full(count, atol[3]), np.full(count, atol[4])))
+    
+    def _store_state(self, state: np.ndarray) -> None:
+        """Write capsule position, velocity and current back to the capsule"""
+        self.capsule.update_position(float(state[0]))
+        self.capsule.update_velocity(float(state[1]))
+        self.capsule.current = float(state[2])
+    
+    def _record(self, time: float, state: np.ndarray) -> None:
+        """
+        Record one solution point.
+        
+        Args:
+            time: Time (s)
+            state: State vector at that time
+        """
+        self._store_state(state)
+        count = len(self.bank)
+        indices = self._conducting
+        current = state[3 + count + indices]
+        mutual_inductance, gradient = self._stage_mutual_inductance(state[0], indices)
+        force = float(-state[2] * np.dot(current, gradient))
+        
+        context = StepContext(
+            time=time,
+            indices=indices,
+            stage_current=current,
+            stage_current_rate=np.zeros_like(current),
+            distance=np.abs(state[0] - self.bank.positions[indices]),
+            mutual_inductance=mutual_inductance,
+            inductance_gradient=gradient,
+        )
+        self.data.record(float(time), self.capsule, self.bank, force, context)
+    
+    def reset(self) -> None:
+        """
+        Reset simulation to initial state.
+        
+        Restores capsule position, velocity and current, idles all stages
+        and clears all collected data.
+        """
+        self.time = 0.0
+        self.evaluations = 0
+        self._conducting = np.zeros(0, dtype=int)
+        
+        self.capsule.position = self._initial_capsule_state['position']
+        self.capsule.velocity = self._initial_capsule_state['velocity']
+        self.capsule.current = self._initial_capsule_state['current']
+        
+        self.bank.reset()
+        self.data.reset()
@@ -5,58 +5,388 @@ Handles data collection, storage, and analysis during simulation runs.
 Provides real-time data tracking and export capabilities.
 """
 
-from typing import List, Dict, Any, Optional
+from collections import abc
+from typing import List, Dict, Any, Optional, Sequence
 import numpy as np
 
+from src.core.stage_bank import StageBank
+from src.services.recording import RecordingPolicy
+
+
+class HistoryBuffer:
+    """
+    Columnar storage for per-step simulation records.
+    
+    Follows SOLID principles:
+    - Single Responsibility: Owns the record storage; knows nothing about
+      capsules or stages
+    - Open/Closed: Columns are addressed by name through FIELDS
+    
+    Each field is one row of a preallocated float64 block, so a column is
+    a contiguous array. When the block is full its capacity doubles, which
+    keeps appending amortized O(1) without a Python object per value.
+    """
+    
+    FIELDS = ('time', 'position', 'velocity', 'acceleration', 'force', 'kinetic_energy',
+              'capsule_current', 'active_stages', 'total_stage_current')
+    INTEGER_FIELDS = ('active_stages',)
+    INITIAL_CAPACITY = 1024
+    
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        """
+        Initialize empty buffer.
+        
+        Args:
+            capacity: Number of records allocated up front
+        """
+        self._data = np.empty((len(self.FIELDS), max(1, capacity)))
+        self._index = {field: row for row, field in enumerate(self.FIELDS)}
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    @property
+    def capacity(self) -> int:
+        """Number of records that fit without reallocation."""
+        return self._data.shape[1]
+    
+    def append(self, values: Sequence[float]) -> None:
+        """
+        Append one record.
+        
+        Args:
+            values: One value per field, in FIELDS order
+        """
+        if self.size == self.capacity:
+            grown = np.empty((len(self.FIELDS), 2 * self.capacity))
+            grown[:, :self.size] = self._data[:, :self.size]
+            self._data = grown
+        self._data[:, self.size] = values
+        self.size += 1
+    
+    def column(self, field: str, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Recorded values of one field.
+        
+        Args:
+            field: Field name from FIELDS
+            stop: Number of leading records to include (default: all)
+            
+        Returns:
+            Read-only view into the buffer (no copy)
+        """
+        view = self._data[self._index[field], :self.size if stop is None else stop]
+        view.flags.writeable = False
+        return view
+    
+    def record(self, index: int) -> Dict[str, float]:
+        """
+        One record as a dictionary of Python numbers.
+        
+        Args:
+            index: Record index (non-negative, below size)
+            
+        Returns:
+            Dictionary keyed by FIELDS
+        """
+        record = dict(zip(self.FIELDS, self._values(index)))
+        for field in self.INTEGER_FIELDS:
+            record[field] = int(record[field])
+        return record
+    
+    def _values(self, index: int) -> List[float]:
+        """Values of one record in FIELDS order"""
+        return self._data[:, index].tolist()
+    
+    def flush(self) -> None:
+        """Persist buffered records (nothing to do in memory)."""
+    
+    def empty_like(self) -> 'HistoryBuffer':
+        """New empty buffer with the same storage configuration."""
+        return HistoryBuffer()
+    
+    def close(self) -> None:
+        """Release storage resources (nothing to do in memory)."""
+
+
+class HistoryView(abc.Sequence):
+    """
+    List-of-dicts view over the first records of a HistoryBuffer.
+    
+    Records are materialized as dictionaries only when accessed. The length
+    is fixed when the view is created; the buffer only ever appends, so a
+    view keeps showing the same records while recording continues.
+    """
+    
+    def __init__(self, buffer: HistoryBuffer, length: Optional[int] = None):
+        """
+        Initialize view.
+        
+        Args:
+            buffer: Buffer holding the records
+            length: Number of records visible (default: current buffer size)
+        """
+        self._buffer = buffer
+        self._length = len(buffer) if length is None else length
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._buffer.record(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("history index out of range")
+        return self._buffer.record(index)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (HistoryView, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+    
+    def column(self, field: str) -> np.ndarray:
+        """Values of one field as a read-only array view."""
+        return self._buffer.column(field, self._length)
+    
+    def copy(self) -> 'HistoryView':
+        """Views are immutable, so a copy shares the buffer."""
+        return HistoryView(self._buffer, self._length)
+    
+    def __repr__(self) -> str:
+        """Detailed representation for debugging"""
+        return f"HistoryView(records={self._length})"
+
+
+class RunStatistics:
+    """
+    Running aggregates of one simulation run.
+    
+    Updated with every simulated step (stored or not), so summaries are
+    exact under any recording policy and cost O(1) to read, however long
+    the history is.
+    """
+    
+    def __init__(self, tube_length: float = np.inf):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            tube_length: Position at which the capsule has left the tube (m)
+        """
+        self.tube_length = tube_length
+        self.steps = 0
+        self.max_force = -np.inf
+        self.max_force_time = np.nan
+        self.min_force = np.inf
+        self.min_force_time = np.nan
+        self.peak_acceleration = 0.0          # Largest |acceleration| (m/s²)
+        self.peak_acceleration_time = np.nan
+        self.peak_capsule_current = 0.0       # Largest |capsule current| (A)
+        self.peak_capsule_current_time = np.nan
+        self.stage_firing_times = np.zeros(0)  # Per stage, NaN if it never fired
+        self.exit_time: Optional[float] = None
+        self.initial_kinetic_energy = 0.0
+        self.capsule_resistive_loss = 0.0     # ∫ R I² dt in the capsule (J)
+        self._last_time = None
+        self._last_power = 0.0
+    
+    def update(self, values: Sequence[float], resistance: float) -> None:
+        """
+        Fold one step into the aggregates.
+        
+        Args:
+            values: Step values in HistoryBuffer.FIELDS order
+            resistance: Capsule resistance (Ω)
+        """
+        time, position, _, acceleration, force, kinetic_energy, current = values[:7]
+        if self._last_time is None:
+            self.initial_kinetic_energy = kinetic_energy
+        
+        if force > self.max_force:
+            self.max_force, self.max_force_time = force, time
+        if force < self.min_force:
+            self.min_force, self.min_force_time = force, time
+        if abs(acceleration) > self.peak_acceleration:
+            self.peak_acceleration, self.peak_acceleration_time = abs(acceleration), time
+        if abs(current) > self.peak_capsule_current:
+            self.peak_capsule_current, self.peak_capsule_current_time = abs(current), time
+        if self.exit_time is None and position >= self.tube_length:
+            self.exit_time = time
+            
+        # Trapezoidal ohmic loss between consecutive steps
+        power = resistance * current * current
+        if self._last_time is not None:
+            interval = time - self._last_time
+            self.capsule_resistive_loss += 0.5 * (power + self._last_power) * interval
+        self._last_time, self._last_power = time, power
+        self.steps += 1
+    
+    @classmethod
+    def from_history(cls, history: Sequence[dict]) -> 'RunStatistics':
+        """
+        Aggregates of a list of record dictionaries.
+        
+        For results built without a DataService; records need time and
+        force, other fields are used when present. Stage firings and
+        resistive losses are not part of such records.
+        """
+        statistics = cls()
+        for record in history:
+            statistics.update((
+                record['time'], record.get('position', 0.0), record.get('velocity', 0.0),
+                record.get('acceleration', 0.0), record['force'],
+                record.get('kinetic_energy', 0.0), record.get('capsule_current', 0.0)
+            ), 0.0)
+        return statistics
+
 
 class DataService:
     """
     Service for collecting and managing simulation data.
     
     Follows Single Responsibility Principle - focused only on data operations.
+    
+    Records are stored column-wise in a HistoryBuffer; history exposes
+    them as the familiar list of dictionaries.
+    
+    A RecordingPolicy decides which steps are stored. Whatever it decides,
+    the first step, every step in which a stage fired and every step that
+    set a new force maximum are stored (a maximum as soon as the force
+    falls again, so a rising flank costs one record), and the last step
+    is stored by get_results, so final state and max_force are exact.
     """
     
-    def __init__(self):
-        """Initialize empty data service."""
-        self.history: List[Dict[str, float]] = []
+    def __init__(self, policy: Optional[RecordingPolicy] = None,
+                 buffer: Optional[HistoryBuffer] = None):
+        """
+        Initialize empty data service.
+        
+        Args:
+            policy: Recording policy (default: store every step)
+            buffer: Empty record storage, e.g. a DiskHistoryBuffer to stream
+                the history to disk (default: in-memory HistoryBuffer)
+        """
+        self.buffer = buffer if buffer is not None else HistoryBuffer()
         self.metadata: Dict[str, Any] = {}
+        self.policy = policy or RecordingPolicy()
+        self.statistics = RunStatistics()
+        self.latest: Optional[tuple] = None  # Values of the last offered step
+        self._reset_sampling()
+    
+    def _reset_sampling(self) -> None:
+        """Clear the per-run state of the recording policy"""
+        self.policy.reset()
+        self._records_all = type(self.policy) is RecordingPolicy
+        self._last = None            # Last stored record
+        self._pending = None         # Last offered record if it was not stored
+        self._peak = None            # Unstored record holding the force maximum
+        self._fired = 0              # Stages fired as of the last offered step
+    
+    @property
+    def history(self) -> HistoryView:
+        """Recorded steps as a lazy list of dictionaries."""
+        return HistoryView(self.buffer)
     
-    def record(self, time: float, capsule, stages: List, force: float) -> None:
+    def record(self, time: float, capsule, stages: List, force: float,
+               context=None) -> None:
         """
         Record simulation state at current time step.
         
         Args:
             time: Current simulation time
             capsule: Capsule object with current state
-            stages: List of acceleration stages
+            stages: List of acceleration stages, or a StageBank
             force: Total electromagnetic force
+            context: Optional per-step stage evaluation (StepContext) whose
+                total_stage_current is reused when it covers every live stage
+                
+        The record's active_stages is the number of fired stages and
+        total_stage_current the summed current of every live stage, however
+        few stages the step itself evaluated.
         """
         # Calculate derived quantities
         kinetic_energy = 0.5 * capsule.mass * capsule.velocity ** 2
         acceleration = force / capsule.mass
         
-        # Active stages count
-        active_stages = sum(1 for stage in stages if stage.is_active)
+        if isinstance(stages, StageBank):
+            # Every fired stage counts, retired or outside the interaction window
+            active_stages = stages.fired_count
+            if context is not None and context.active_stages == stages.active_count:
+                # The step already evaluated every live stage
+                total_stage_current = context.total_stage_current
+            else:
+                total_stage_current = stages.total_current(time)
+        else:
+            # Active stages count
+            active_stages = sum(1 for stage in stages if stage.is_active)
+            
+            # Total current in active stages
+            total_stage_current = sum(
+                stage.get_current(time) for stage in stages if stage.is_active
+            )
         
-        # Total current in active stages
-        total_stage_current = sum(
-            stage.get_current(time) for stage in stages if stage.is_active
+        # Record complete state, in HistoryBuffer.FIELDS order
+        values = (
+            time,
+            capsule.position,
+            capsule.velocity,
+            acceleration,
+            force,
+            kinetic_energy,
+            capsule.current,
+            active_stages,
+            total_stage_current
         )
+        self.latest = values
         
-        # Record complete state
-        record = {
-            'time': time,
-            'position': capsule.position,
-            'velocity': capsule.velocity,
-            'acceleration': acceleration,
-            'force': force,
-            'kinetic_energy': kinetic_energy,
-            'capsule_current': capsule.current,
-            'active_stages': active_stages,
-            'total_stage_current': total_stage_current
-        }
-        
-        self.history.append(record)
+        fired = active_stages
+        activation = fired > self._fired
+        if activation:
+            self.statistics.stage_firing_times = self._firing_times(stages)
+        self._fired = fired
+        
+        new_peak = force > self.statistics.max_force
+        self.statistics.update(values, capsule.properties.resistance)
+        if self._records_all:
+            self.buffer.append(values)
+            return
+            
+        # A maximum is confirmed once the force stops rising
+        if not new_peak and self._peak is not None:
+            self._store(self._peak)
+            
+        if self._last is None or activation or self.policy.wants(values, self._last):
+            self._store(values)
+        else:
+            self._pending = values
+            if new_peak:
+                self._peak = values
+    
+    @staticmethod
+    def _firing_times(stages) -> np.ndarray:
+        """Activation time of every stage, NaN for stages that never fired"""
+        if isinstance(stages, StageBank):
+            return stages.activation_times.copy()
+        return np.array([np.nan if stage.activation_time is None else stage.activation_time
+                         for stage in stages], dtype=float)
+    
+    def _store(self, values: tuple) -> None:
+        """Append a record chosen for storage"""
+        self.buffer.append(values)
+        self._last = values
+        self._pending = None
+        self._peak = None
+    
+    def flush(self) -> None:
+        """Store held-back records (pending force maximum and the last step)."""
+        if self._peak is not None:
+            self._store(self._peak)
+        if self._pending is not None:
+            self._store(self._pending)
+        self.buffer.flush()
     
     def get_results(self) -> 'SimulationResult':
         """
@@ -65,11 +395,13 @@ class DataService:
         Returns:
             SimulationResult with complete simulation data and analysis
         """
-        if not self.history:
+        self.flush()
+        if not len(self.buffer):
             raise ValueError("No data collected - cannot generate results")
         
         # Extract final state
-        final_record = self.history[-1]
+        history = self.history
+        final_record = history[-1]
         final_velocity = final_record['velocity']
         final_position = final_record['position']
         total_time = final_record['time']
@@ -85,34 +417,47 @@ class DataService:
             final_position=final_position,
             total_time=total_time,
             initial_energy=initial_energy,
-            history=self.history.copy()
+            history=history,
+            statistics=self.statistics
         )
     
     def reset(self) -> None:
-        """Reset data service to initial state."""
-        self.history.clear()
+        """
+        Reset data service to initial state.
+        
+        A fresh buffer is allocated, so histories handed out earlier stay valid.
+        """
+        self.buffer = self.buffer.empty_like()
         self.metadata.clear()
+        self.statistics = RunStatistics()
+        self.latest = None
+        self._reset_sampling()
     
     def set_initial_energy(self, energy: float) -> None:
         """Set initial energy for energy efficiency calculations."""
         self.metadata['initial_energy'] = energy
     
+    def set_tube_length(self, length: float) -> None:
+        """Set the tube length for detecting the exit time."""
+        self.metadata['tube_length'] = length
+        self.statistics.tube_length = length
+    
     def get_time_array(self) -> np.ndarray:
         """Get time values as numpy array for plotting."""
-        return np.array([record['time'] for record in self.history])
+        return self.buffer.column('time')
     
     def get_position_array(self) -> np.ndarray:
         """Get position values as numpy array for plotting."""
-        return np.array([record['position'] for record in self.history])
+        return self.buffer.column('position')
     
     def get_velocity_array(self) -> np.ndarray:
         """Get velocity values as numpy array for plotting."""
-        return np.array([record['velocity'] for record in self.history])
+        return self.buffer.column('velocity')
     
     def get_force_array(self) -> np.ndarray:
         """Get force values as numpy array for plotting."""
-        return np.array([record['force'] for record in self.history])
+        return self.buffer.column('force')
     
     def get_energy_array(self) -> np.ndarray:
         """Get kinetic energy values as numpy array for plotting."""
-        return np.array([record['kinetic_energy'] for record in self.history])
\ No newline at end of file
+        return self.buffer.column('kinetic_energy')
\ No newline at end of file
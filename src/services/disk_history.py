@@ -0,0 +1,275 @@
+"""
+Disk-backed history storage for electromagnetic gun simulation.
+
+Streams recorded steps to per-column files so long runs keep a constant
+memory footprint; the history is read back through memory maps.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+from typing import List, Optional
+import numpy as np
+
+from src.services.data_service import HistoryBuffer
+
+
+logger = logging.getLogger(__name__)
+
+
+class DiskHistoryBuffer(HistoryBuffer):
+    """
+    HistoryBuffer that spills fixed-size chunks to disk.
+    
+    Follows SOLID principles:
+    - Single Responsibility: Moves records between a chunk in memory and
+      the column files
+    - Liskov Substitution: Drop-in storage for DataService; columns come
+      back as read-only np.memmap arrays instead of in-memory views
+      
+    Directory layout: every buffer claims its own run directory,
+    <directory>/run-<n>, holding one raw little-endian float64 file per
+    field (<field>.f64) and header.json with the field names, dtype, run
+    number and record count. Records are collected in a chunk of
+    chunk_size records that is appended to the column files when full, so
+    memory stays at one chunk however long the run is. Reading a column
+    first flushes a partly filled chunk.
+    
+    Run directories are claimed with an atomic mkdir, so any number of
+    buffers (or processes) can record into the same directory at once
+    without touching each other's files. A buffer only ever deletes the
+    run it replaces in empty_like(), after closing it; if that fails
+    (Windows refuses while the files are still mapped) the run is left on
+    disk and a warning is logged.
+    """
+    
+    HEADER = 'header.json'
+    DTYPE = '<f8'
+    DEFAULT_CHUNK_SIZE = 65536
+    RUN_DIRECTORY = re.compile(r'^run-(\d+)$')
+    
+    def __init__(self, directory: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 _readonly: bool = False, _run: Optional[int] = None):
+        """
+        Create an empty history in a new run directory.
+        
+        Args:
+            directory: Directory for the run directories (created if missing)
+            chunk_size: Records kept in memory before they are written
+            
+        Raises:
+            ValueError: If chunk_size is not positive
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        super().__init__(chunk_size)
+        self.directory = directory
+        self.chunk_size = int(chunk_size)
+        self.readonly = _readonly
+        self.run = _run
+        self._written = 0     # Records in the column files
+        self._maps = None     # Cached memory maps of the column files
+        self._files = []      # Open column files while recording
+        
+        if not _readonly:
+            os.makedirs(directory, exist_ok=True)
+            self.run = self._claim_run()
+            self._files = [open(self._path(field), 'xb') for field in self.FIELDS]
+            self._write_header()
+    
+    @property
+    def run_directory(self) -> str:
+        """Directory holding this run's header and column files."""
+        return os.path.join(self.directory, f"run-{self.run}")
+    
+    @classmethod
+    def runs(cls, directory: str) -> List[int]:
+        """
+        Run numbers recorded in a directory.
+        
+        Args:
+            directory: Directory given to the buffers
+            
+        Returns:
+            Sorted run numbers
+        """
+        matches = map(cls.RUN_DIRECTORY.match, os.listdir(directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+    
+    @classmethod
+    def open(cls, directory: str, run: Optional[int] = None) -> 'DiskHistoryBuffer':
+        """
+        Open a history written earlier for reading.
+        
+        Args:
+            directory: Directory given to the buffer that wrote the history
+            run: Run number (default: the latest run)
+            
+        Returns:
+            Read-only buffer
+            
+        Raises:
+            ValueError: If there is no run or the header does not match
+                this storage format
+        """
+        if run is None:
+            runs = cls.runs(directory)
+            if not runs:
+                raise ValueError(f"No recorded history in '{directory}'")
+            run = runs[-1]
+        buffer = cls(directory, _readonly=True, _run=run)
+        
+        with open(os.path.join(buffer.run_directory, cls.HEADER)) as handle:
+            header = json.load(handle)
+        if header.get('fields') != list(cls.FIELDS) or header.get('dtype') != cls.DTYPE:
+            raise ValueError(f"Unsupported history format in '{buffer.run_directory}'")
+            
+        buffer.chunk_size = int(header.get('chunk_size', cls.DEFAULT_CHUNK_SIZE))
+        buffer._written = buffer.size = int(header['length'])
+        return buffer
+    
+    @property
+    def capacity(self) -> int:
+        """Records that fit in the in-memory chunk."""
+        return self.chunk_size
+    
+    def append(self, values) -> None:
+        """
+        Append one record, writing the chunk out when it is full.
+        
+        Args:
+            values: One value per field, in FIELDS order
+            
+        Raises:
+            ValueError: If the buffer was opened read-only
+        """
+        if self.readonly:
+            raise ValueError(f"History in '{self.directory}' is read-only")
+        if not self._files:
+            raise ValueError(f"History in '{self.directory}' is closed")
+        pending = self.size - self._written
+        if pending == self.chunk_size:
+            self.flush()
+            pending = 0
+        self._data[:, pending] = values
+        self.size += 1
+    
+    def flush(self) -> None:
+        """Write buffered records to the column files and update the header."""
+        pending = self.size - self._written
+        if not self._files or not pending:
+            return
+        for handle, values in zip(self._files, self._data[:, :pending]):
+            values.astype(self.DTYPE, copy=False).tofile(handle)
+            handle.flush()
+        self._written = self.size
+        self._maps = None
+        self._write_header()
+    
+    def column(self, field: str, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Recorded values of one field.
+        
+        Args:
+            field: Field name from FIELDS
+            stop: Number of leading records to include (default: all)
+            
+        Returns:
+            Read-only memory map of the column file
+        """
+        stop = self.size if stop is None else stop
+        if stop > self._written:
+            self.flush()
+        if not stop:
+            return np.zeros(0)
+        return self._column_maps()[self._index[field]][:stop]
+    
+    def _values(self, index: int) -> List[float]:
+        """Values of one record in FIELDS order"""
+        if index >= self._written:
+            return self._data[:, index - self._written].tolist()
+        return [float(column[index]) for column in self._column_maps()]
+    
+    def _column_maps(self) -> List[np.memmap]:
+        """Memory maps over the written part of every column file"""
+        if self._maps is None:
+            self._maps = [np.memmap(self._path(field), dtype=self.DTYPE, mode='r',
+                                    shape=(self._written,))
+                          for field in self.FIELDS]
+        return self._maps
+    
+    def _path(self, field: str) -> str:
+        """Column file of a field"""
+        return os.path.join(self.run_directory, f"{field}.f64")
+    
+    def _claim_run(self) -> int:
+        """Create the next free run directory and return its number"""
+        run = max(self.runs(self.directory), default=-1) + 1
+        while True:
+            try:
+                os.mkdir(os.path.join(self.directory, f"run-{run}"))
+                return run
+            except FileExistsError:
+                run += 1  # Claimed concurrently by another buffer
+    
+    def remove(self) -> bool:
+        """
+        Close this buffer and delete its run directory.
+        
+        Returns:
+            True if the files were deleted; False (with a logged warning)
+            if the platform refused, e.g. on Windows while a history still
+            maps them
+        """
+        self.close()
+        try:
+            shutil.rmtree(self.run_directory)
+        except OSError as error:
+            logger.warning("Could not delete history run '%s': %s", self.run_directory, error)
+            return False
+        return True
+    
+    def _write_header(self) -> None:
+        """Write header.json describing the column files"""
+        header = {
+            'fields': list(self.FIELDS),
+            'dtype': self.DTYPE,
+            'run': self.run,
+            'length': self._written,
+            'chunk_size': self.chunk_size,
+        }
+        with open(os.path.join(self.run_directory, self.HEADER), 'w') as handle:
+            json.dump(header, handle)
+    
+    def empty_like(self) -> 'DiskHistoryBuffer':
+        """
+        New empty history in the same directory, written as a new run.
+        
+        This buffer's run is closed and deleted (see remove()); histories
+        handed out earlier keep reading it through their memory maps.
+        """
+        successor = DiskHistoryBuffer(self.directory, self.chunk_size)
+        self.remove()
+        return successor
+    
+    def close(self) -> None:
+        """
+        Flush and close the column files; the buffer becomes read-only.
+        
+        The written columns are memory-mapped before the files are closed,
+        so histories over this buffer stay readable even once the files
+        are deleted (where the platform allows it).
+        """
+        self.flush()
+        for handle in self._files:
+            handle.close()
+        self._files = []
+        self.readonly = True
+        if self._written:
+            self._column_maps()
+    
+    def __repr__(self) -> str:
+        """Detailed representation for debugging"""
+        return f"DiskHistoryBuffer('{self.run_directory}', records={self.size})"
@@ -0,0 +1,582 @@
+"""
+EnsembleSimulator for electromagnetic gun design sweeps.
+
+Advances many design variants in lock-step with array state instead of one
+SimulationService object graph per variant.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+
+from src.core.capsule import Capsule
+from src.core.acceleration_stage import AccelerationStage, discharge_coefficients
+from src.physics.physics_engine import PhysicsEngine
+from src.services.simulation_service import SimulationService
+
+
+class EnsembleResult:
+    """
+    Per-variant outcome of an ensemble run.
+    
+    Summary metrics are arrays of shape (n_variants,) with the meaning of
+    the SimulationResult properties of the same name. The optional history
+    holds arrays of shape (n_records, n_variants); entries after a
+    variant finished are NaN.
+    """
+    
+    SUMMARY_FIELDS = ('final_velocity', 'final_position', 'total_time', 'max_force',
+                      'initial_energy', 'final_kinetic_energy', 'energy_efficiency', 'exited')
+    
+    def __init__(self, final_velocity: np.ndarray, final_position: np.ndarray,
+                 total_time: np.ndarray, max_force: np.ndarray, initial_energy: np.ndarray,
+                 mass: np.ndarray, exited: np.ndarray,
+                 history: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Initialize ensemble result.
+        
+        Args:
+            final_velocity: Final capsule velocities (m/s)
+            final_position: Final capsule positions (m)
+            total_time: Simulated time per variant (s)
+            max_force: Largest recorded force per variant (N)
+            initial_energy: Stored stage energy per variant (J)
+            mass: Capsule mass per variant (kg)
+            exited: Whether each capsule left the tube before max_time
+            history: Optional per-variant time series
+        """
+        self.final_velocity = final_velocity
+        self.final_position = final_position
+        self.total_time = total_time
+        self.max_force = max_force
+        self.initial_energy = initial_energy
+        self.exited = exited
+        self.history = history
+        self._mass = mass
+    
+    def __len__(self) -> int:
+        return int(self.final_velocity.size)
+    
+    @property
+    def final_kinetic_energy(self) -> np.ndarray:
+        """Final kinetic energy per variant (J)."""
+        return 0.5 * self._mass * self.final_velocity**2
+    
+    @property
+    def energy_efficiency(self) -> np.ndarray:
+        """Kinetic/initial energy per variant."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.initial_energy > 0,
+                            self.final_kinetic_energy / self.initial_energy, 0.0)
+    
+    def best(self, metric: str = 'final_velocity') -> int:
+        """Index of the variant with the largest value of a summary metric."""
+        return int(np.argmax(getattr(self, metric)))
+    
+    def to_dict(self) -> dict:
+        """Export summary metrics as lists for serialization."""
+        return {field: getattr(self, field).tolist() for field in self.SUMMARY_FIELDS}
+    
+    def __str__(self) -> str:
+        """String representation for debugging"""
+        return (f"EnsembleResult(variants={len(self)}, "
+                f"best_velocity={self.final_velocity.max():.3f}m/s)")
+
+
+class EnsembleSimulator:
+    """
+    Lock-step simulation of many gun design variants.
+    
+    Follows SOLID principles:
+    - Single Responsibility: Vectorizes the fixed-step SimulationService
+      model over variants; physics comes from PhysicsEngine and the
+      vectorized discharge functions
+    - Open/Closed: Any tube layout of run_simulation_from_params can be
+      swept by passing arrays for its parameters
+      
+    Every variant follows the fixed-step model of SimulationService with
+    its default options (exact RLC stage discharges, exponential capsule
+    L-R update, exact trigger-crossing firing, retirement of quiet stages,
+    interaction-radius window and closed-form coast). State is held as
+    arrays of shape (n_variants,) for the capsule and (n_variants, n_stages)
+    for the stages. Variants that exit the tube or start coasting are
+    finished and masked out, so the per-step cost follows the variants
+    still being accelerated.
+    
+    Swept parameters broadcast against each other to n_variants; geometry
+    shared by all variants (diameters, lengths, tube) is scalar.
+    """
+    
+    HISTORY_FIELDS = ('time', 'position', 'velocity', 'force', 'capsule_current')
+    
+    def __init__(self, stage_voltage=400.0, stage_capacitance=1000e-6, stage_turns=100,
+                 capsule_mass=1.0, stage_spacing=0.08, num_stages: int = 6,
+                 capsule_diameter: float = 0.083, capsule_length: float = 0.02,
+                 stage_diameter: float = 0.09, stage_length: float = 0.05,
+                 tube_length: float = 0.5, first_stage_position: float = 0.05,
+                 initial_position: float = 0.02, initial_velocity: float = 0.0,
+                 dt: float = 1e-5, physics: Optional[PhysicsEngine] = None):
+        """
+        Initialize ensemble simulator.
+        
+        Args:
+            stage_voltage: Voltage per stage in V (scalar or per variant)
+            stage_capacitance: Capacitance per stage in F (scalar or per variant)
+            stage_turns: Turns per stage coil (scalar or per variant)
+            capsule_mass: Capsule mass in kg (scalar or per variant)
+            stage_spacing: Distance between stage centers in m (scalar or per variant)
+            num_stages: Number of stages
+            capsule_diameter: Capsule diameter in m
+            capsule_length: Capsule length in m
+            stage_diameter: Stage coil diameter in m
+            stage_length: Stage coil length in m
+            tube_length: Tube length in m
+            first_stage_position: Position of the first stage in m
+            initial_position: Capsule start position in m
+            initial_velocity: Capsule start velocity in m/s
+            dt: Time step in s
+            physics: Physics engine providing M(x) and dM/dx
+            
+        Raises:
+            ValueError: If a swept parameter is not positive or the arrays
+                do not broadcast
+        """
+        parameters = (stage_voltage, stage_capacitance, stage_turns, capsule_mass, stage_spacing)
+        voltage, capacitance, turns, mass, spacing = np.broadcast_arrays(*(
+            np.atleast_1d(np.asarray(value, dtype=float)) for value in parameters
+        ))
+        if any(np.any(value <= 0) for value in (capacitance, turns, mass, spacing)):
+            raise ValueError("Capacitance, turns, capsule mass and spacing must be positive")
+            
+        self.voltage = voltage.copy()
+        self.capacitance = capacitance.copy()
+        self.turns = turns.copy()
+        self.mass = mass.copy()
+        self.spacing = spacing.copy()
+        self.num_stages = num_stages
+        self.tube_length = tube_length
+        self.initial_position = initial_position
+        self.initial_velocity = initial_velocity
+        self.dt = dt
+        self.physics = physics or PhysicsEngine()
+        
+        # Stage geometry and circuits - resistance scales with N and
+        # inductance with N² in the stage model, so a one-turn reference
+        # stage gives every variant's values
+        reference = AccelerationStage(0, 0.0, 1, stage_diameter, stage_length, 1.0, 0.0)
+        self.stage_radius = stage_diameter / 2
+        self.stage_length = stage_length
+        self.positions = (first_stage_position +
+                          np.arange(num_stages) * self.spacing[:, np.newaxis])
+        self.activation_distance = max(stage_length, 0.01)  # As StageBank.activation_distances
+        self.trigger_positions = self.positions - self.activation_distance
+        self.resistances = reference.properties.resistance * self.turns
+        self.inductances = reference.inductance * self.turns**2
+        
+        self.circuits = discharge_coefficients(self.voltage, self.inductances,
+                                               self.capacitance, self.resistances)
+        alpha, frequency, _, underdamped, critical = self.circuits
+        self.step_transition = discharge_transition(dt, alpha, frequency, underdamped, critical)
+        self.quiet_delays = np.broadcast_to(
+            self._quiet_delay(SimulationService.SIGNIFICANT_STAGE_CURRENT)[:, np.newaxis],
+            self.positions.shape
+        )
+        
+        # Capsule circuit and geometry (shared)
+        capsule = Capsule(mass=1.0, diameter=capsule_diameter, length=capsule_length)
+        self.capsule_radius = capsule_diameter / 2
+        self.capsule_length = capsule_length
+        self.capsule_turns = capsule.properties.turns
+        self.capsule_inductance = capsule.inductance
+        self.capsule_resistance = capsule.properties.resistance
+        self.interaction_radius = self.physics.calculate_interaction_radius(
+            self.stage_radius, stage_length, self.capsule_radius, capsule_length
+        )
+    
+    def __len__(self) -> int:
+        return int(self.voltage.size)
+    
+    def _quiet_delay(self, threshold: float) -> np.ndarray:
+        """Vectorized CircuitCoefficients.quiet_time for every variant's stages"""
+        alpha, frequency, scale, underdamped, critical = self.circuits
+        with np.errstate(divide='ignore', invalid='ignore'):
+            peak = np.where(underdamped, scale / frequency,
+                            np.where(critical, 2 * scale / (alpha * np.e), scale / (2 * frequency)))
+            rate = np.where(underdamped, alpha,
+                            np.where(critical, alpha / 2, alpha - frequency))
+            delay = np.where(rate > 0, np.log(peak / threshold) / rate, np.inf)
+        return np.where(peak <= threshold, 0.0, delay)
+    
+    def run(self, max_time: float = 0.01, history: bool = False,
+            history_interval: int = 1) -> EnsembleResult:
+        """
+        Run every variant to tube exit or max_time.
+        
+        Discharging stages are kept as a flat list of (variant, stage)
+        pairs that changes only when a stage fires or retires, so a step
+        costs O(running variants + discharging stages), not
+        O(variants * stages). Their currents advance by the exact one-step
+        transition matrix of the RLC circuit instead of re-evaluating the
+        closed form.
+        
+        Args:
+            max_time: Maximum simulation time (s)
+            history: Also return per-variant time series
+            history_interval: Record every history_interval-th step
+            
+        Returns:
+            EnsembleResult with per-variant summary metrics
+        """
+        count, stages = self.positions.shape
+        dt = self.dt
+        
+        position = np.full(count, float(self.initial_position))
+        velocity = np.full(count, float(self.initial_velocity))
+        capsule_current = np.zeros(count)
+        max_force = np.full(count, -np.inf)
+        total_time = np.zeros(count)
+        exited = np.zeros(count, dtype=bool)
+        finished = np.zeros(count, dtype=bool)
+        
+        # Activation times (NaN = idle) and the time after which each
+        # variant's fired stages are all quiet
+        self.activation_times = np.full((count, stages), np.nan)
+        quiet_until = np.full(count, -np.inf)
+        self._pairs = _DischargePairs(self)
+        
+        # Stages in their window at the start fire immediately; the trigger
+        # pointer then sits past every trigger point behind the capsule
+        next_trigger = np.zeros(count, dtype=int)
+        self._scan_window(np.arange(count), 0.0, position, next_trigger, quiet_until)
+        rescan = np.zeros(count, dtype=bool)  # Moved backwards - window scan next step
+        
+        records = {field: [] for field in self.HISTORY_FIELDS} if history else None
+        running = np.arange(count)
+        time = 0.0
+        step = 0
+        
+        while running.size and time < max_time:
+            if rescan[running].any():
+                # As StageBank.check_activations + seek_trigger after backward motion
+                rows = running[rescan[running]]
+                self._scan_window(rows, time, position, next_trigger, quiet_until)
+                rescan[rows] = False
+                
+            # Coasting variants - every discharge quiet, no stage left to fire
+            candidates = running[time >= quiet_until[running]]
+            if candidates.size:
+                coasting = candidates[~self._stage_pending(candidates, position, velocity)]
+                if coasting.size:
+                    self._finish_coast(coasting, time, max_time, position, velocity,
+                                       total_time, max_force, exited)
+                    finished[coasting] = True
+                    running = running[~finished[running]]
+                    self._pairs.drop_finished(finished)
+                    if not running.size:
+                        break
+                        
+            x, v = position[running], velocity[running]
+            force = self._step_forces(running, time, position, velocity, capsule_current)
+            acceleration = force / self.mass[running]
+            
+            new_x = x + v * dt + 0.5 * acceleration * dt**2
+            new_v = v + acceleration * dt
+            position[running] = new_x
+            velocity[running] = new_v
+            max_force[running] = np.maximum(max_force[running], force)
+            total_time[running] = time
+            
+            # Fire stages whose trigger point was crossed during the step
+            pointer = next_trigger[running]
+            while True:
+                ahead = pointer < stages
+                trigger = self.trigger_positions[running, np.minimum(pointer, stages - 1)]
+                crossing = ahead & (new_x >= trigger)
+                if not crossing.any():
+                    break
+                rows = running[crossing]
+                columns = pointer[crossing]
+                gap = self.trigger_positions[rows, columns] - x[crossing]
+                delay = self._crossing_time(gap, v[crossing], acceleration[crossing])
+                idle = np.isnan(self.activation_times[rows, columns])
+                self._fire(rows[idle], columns[idle], time + delay[idle], quiet_until)
+                pointer[crossing] += 1
+            next_trigger[running] = pointer
+            rescan[running] = new_x < x
+            
+            if records is not None and step % history_interval == 0:
+                self._record(records, count, running, time, position, velocity,
+                             force, capsule_current)
+                             
+            # Variants that left the tube are done
+            out = new_x >= self.tube_length
+            if out.any():
+                exited[running[out]] = True
+                finished[running[out]] = True
+                running = running[~out]
+                self._pairs.drop_finished(finished)
+                
+            time += dt
+            step += 1
+            
+        initial_energy = 0.5 * self.capacitance * self.voltage**2 * stages
+        history_arrays = None
+        if records is not None:
+            history_arrays = {field: np.array(values) for field, values in records.items()}
+        max_force = np.where(np.isfinite(max_force), max_force, 0.0)
+        return EnsembleResult(velocity, position, total_time, max_force,
+                              initial_energy, self.mass, exited, history_arrays)
+    
+    def _fire(self, rows: np.ndarray, columns: np.ndarray, times: np.ndarray,
+              quiet_until: np.ndarray) -> None:
+        """Activate stages and add them to the discharging pairs"""
+        if not rows.size:
+            return
+        self.activation_times[rows, columns] = times
+        due = times + self.quiet_delays[rows, columns]
+        np.maximum.at(quiet_until, rows, due)
+        self._pairs.add(rows, columns, times, due)
+    
+    def _scan_window(self, rows: np.ndarray, time: float, position: np.ndarray,
+                     next_trigger: np.ndarray, quiet_until: np.ndarray) -> None:
+        """Fire idle stages whose window contains the capsule and reseat the trigger pointer"""
+        x = position[rows, np.newaxis]
+        window = ((np.abs(x - self.positions[rows]) <= self.activation_distance) &
+                  np.isnan(self.activation_times[rows]))
+        hit_rows, hit_columns = np.nonzero(window)
+        self._fire(rows[hit_rows], hit_columns, np.full(hit_rows.size, time), quiet_until)
+        next_trigger[rows] = np.sum(self.trigger_positions[rows] <= x, axis=1)
+    
+    def _stage_pending(self, rows: np.ndarray, position: np.ndarray,
+                       velocity: np.ndarray) -> np.ndarray:
+        """Whether an idle stage can still fire (as SimulationService._is_coasting)"""
+        idle = np.isnan(self.activation_times[rows])
+        forward = velocity[rows] > 0
+        triggers = self.trigger_positions[rows]
+        ahead = (triggers > position[rows, np.newaxis]) & (triggers < self.tube_length)
+        return (idle & (ahead | ~forward[:, np.newaxis])).any(axis=1)
+    
+    def _step_forces(self, running: np.ndarray, time: float, position: np.ndarray,
+                     velocity: np.ndarray, capsule_current: np.ndarray) -> np.ndarray:
+        """
+        Capsule current update and force for one step of the running variants.
+        
+        Mirrors SimulationService._step: discharging stages within the
+        interaction radius are evaluated once, the capsule current takes
+        one exponential L-R step (written to capsule_current) and the force
+        uses the new current.
+        
+        Returns:
+            Force array for the running variants
+        """
+        pairs = self._pairs
+        pairs.retire(time)
+        all_rows = pairs.rows
+        all_current, all_rate = pairs.discharge_state(time)
+        
+        rows, stage_current, stage_rate, turns = all_rows, all_current, all_rate, pairs.turns
+        offset = np.abs(position[rows] - pairs.positions)
+        windowed = False
+        if np.isfinite(self.interaction_radius):
+            select = offset <= self.interaction_radius
+            windowed = not select.all()
+        if windowed:
+            rows, offset, stage_current, stage_rate, turns = (
+                rows[select], offset[select], stage_current[select], stage_rate[select],
+                turns[select])
+            
+        count = position.size
+        v = velocity[rows]
+        distance = np.maximum(0.001, offset)  # Minimum 1mm
+        mutual_inductance, gradient = self.physics.calculate_mutual_inductance_and_gradient_batch(
+            self.stage_radius, turns, self.stage_length,
+            self.capsule_radius, self.capsule_turns, self.capsule_length, distance
+        )
+        emf = np.bincount(rows, mutual_inductance * stage_rate + v * stage_current * gradient,
+                          minlength=count)[running]
+                          
+        # Exponential L-R update, as PhysicsEngine.update_circuit_current
+        current = capsule_current[running]
+        if self.capsule_resistance > 0:
+            equilibrium = emf / self.capsule_resistance
+            current = current + (equilibrium - current) * -np.expm1(
+                -self.dt * self.capsule_resistance / self.capsule_inductance)
+        else:
+            current = current + emf * self.dt / self.capsule_inductance
+        capsule_current[running] = current
+        
+        pair_current = capsule_current[rows]
+        significant = ((np.abs(stage_current) > SimulationService.SIGNIFICANT_STAGE_CURRENT) &
+                       (np.abs(pair_current) > 1e-6))
+        pull = np.where(significant, -stage_current * pair_current * gradient, 0.0)
+        force = np.bincount(rows, pull, minlength=count)[running]
+        
+        # Per-stage drag term of SimulationService._electromagnetic_force,
+        # including stages beyond the interaction radius
+        conducting = significant
+        if windowed:
+            conducting = ((np.abs(all_current) > SimulationService.SIGNIFICANT_STAGE_CURRENT) &
+                          (np.abs(capsule_current[all_rows]) > 1e-6))
+        interacting = np.bincount(all_rows, conducting, minlength=count)[running]
+        v = velocity[running]
+        return force + np.where(np.abs(v) > 0.01, -0.001 * v * interacting, 0.0)
+    
+    def _crossing_time(self, gap: np.ndarray, velocity: np.ndarray,
+                       acceleration: np.ndarray) -> np.ndarray:
+        """Vectorized PhysicsEngine.calculate_crossing_time within one step"""
+        dt = self.dt
+        discriminant = velocity**2 + 2 * acceleration * np.maximum(gap, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            denominator = velocity + np.sqrt(np.maximum(discriminant, 0.0))
+            delay = np.where(denominator > 0, np.minimum(dt, 2 * gap / denominator), dt)
+        delay = np.where(discriminant < 0, dt, delay)
+        return np.where(gap <= 0, 0.0, delay)
+    
+    def _finish_coast(self, variants: np.ndarray, time: float, max_time: float,
+                      position: np.ndarray, velocity: np.ndarray, total_time: np.ndarray,
+                      max_force: np.ndarray, exited: np.ndarray) -> None:
+        """
+        Move coasting variants to tube exit or max_time in closed form.
+        
+        As SimulationService._fast_forward: without significant stage
+        currents there is no force, so the capsule moves uniformly.
+        """
+        x, v = position[variants], velocity[variants]
+        with np.errstate(divide='ignore'):
+            exit_time = np.where(v > 0, (self.tube_length - x) / v, np.inf)
+        end_time = np.minimum(max_time, time + exit_time)
+        leaves = time + exit_time <= max_time
+        
+        coasted = x + v * (end_time - time)
+        position[variants] = np.where(leaves, np.maximum(coasted, self.tube_length), coasted)
+        total_time[variants] = end_time
+        max_force[variants] = np.maximum(max_force[variants], 0.0)  # Coast records carry no force
+        exited[variants] = leaves
+    
+    def _record(self, records: Dict[str, list], count: int, running: np.ndarray, time: float,
+                position: np.ndarray, velocity: np.ndarray, force: np.ndarray,
+                capsule_current: np.ndarray) -> None:
+        """Append one history row; finished variants are NaN"""
+        row = {field: np.full(count, np.nan) for field in self.HISTORY_FIELDS}
+        row['time'][running] = time
+        row['position'][running] = position[running]
+        row['velocity'][running] = velocity[running]
+        row['force'][running] = force
+        row['capsule_current'][running] = capsule_current[running]
+        for field in self.HISTORY_FIELDS:
+            records[field].append(row[field])
+
+
+def discharge_transition(elapsed, alpha, frequency, underdamped, critical):
+    """
+    Transition matrix of series RLC discharges over a time interval
+    
+    The current obeys I'' + 2αI' + ω₀²I = 0, so (I, dI/dt) advances
+    exactly by Φ(t) = e^(-αt) [[C + αS, S], [-ω₀²S, C - αS]] with
+    S(t) = sin(ωₐt)/ωₐ, t or sinh(βt)/β and C = dS/dt per damping
+    regime (as evaluate_discharge). Φ(t) applied to (0, V₀/L) is the
+    discharge state at time t after firing.
+    
+    Args:
+        elapsed: Interval(s) in seconds
+        alpha, frequency, underdamped, critical: Circuit coefficients
+            from discharge_coefficients
+            
+    Returns:
+        Tuple of the matrix entries (phi11, phi12, phi21, phi22)
+    """
+    elapsed = np.asarray(elapsed, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        omega_d = np.where(underdamped, frequency, 1.0)
+        beta = np.where(underdamped | critical, 1.0, frequency)
+        sin_term = np.where(underdamped, np.sin(omega_d * elapsed) / omega_d,
+                            np.where(critical, elapsed, np.sinh(beta * elapsed) / beta))
+        cos_term = np.where(underdamped, np.cos(omega_d * elapsed),
+                            np.where(critical, 1.0, np.cosh(beta * elapsed)))
+    omega_0_squared = alpha**2 + np.where(underdamped, frequency**2,
+                                          np.where(critical, 0.0, -frequency**2))
+    decay = np.exp(-alpha * elapsed)
+    return (decay * (cos_term + alpha * sin_term), decay * sin_term,
+            -decay * omega_0_squared * sin_term, decay * (cos_term - alpha * sin_term))
+
+
+class _DischargePairs:
+    """Flat list of the discharging (variant, stage) pairs of an ensemble run"""
+    
+    def __init__(self, simulator: EnsembleSimulator):
+        self._simulator = simulator
+        self.rows = np.zeros(0, dtype=int)
+        self.columns = np.zeros(0, dtype=int)
+        self.activation = np.zeros(0)
+        self.due = np.zeros(0)
+        
+        # Unclamped current and dI/dt at the previous step; fresh pairs
+        # fired since then and start from the closed form
+        self.current = np.zeros(0)
+        self.rate = np.zeros(0)
+        self.fresh = np.zeros(0, dtype=bool)
+        self._refresh()
+        
+    def _refresh(self):
+        """Rebuild the per-pair parameter gathers after the pair list changed"""
+        simulator = self._simulator
+        self.positions = simulator.positions[self.rows, self.columns]
+        self.turns = simulator.turns[self.rows]
+        self.transition = [phi[self.rows] for phi in simulator.step_transition]
+        self._earliest = self.due.min() if self.due.size else np.inf
+        
+    def _keep(self, keep: np.ndarray):
+        self.rows, self.columns = self.rows[keep], self.columns[keep]
+        self.activation, self.due = self.activation[keep], self.due[keep]
+        self.current, self.rate, self.fresh = self.current[keep], self.rate[keep], self.fresh[keep]
+        self._refresh()
+        
+    def add(self, rows, columns, times, due):
+        """Start discharging stages"""
+        self.rows = np.concatenate((self.rows, rows))
+        self.columns = np.concatenate((self.columns, columns))
+        self.activation = np.concatenate((self.activation, times))
+        self.due = np.concatenate((self.due, due))
+        self.current = np.concatenate((self.current, np.zeros(rows.size)))
+        self.rate = np.concatenate((self.rate, np.zeros(rows.size)))
+        self.fresh = np.concatenate((self.fresh, np.ones(rows.size, dtype=bool)))
+        self._refresh()
+        
+    def discharge_state(self, time: float):
+        """
+        Current (clamped at zero) and dI/dt of every pair at the next step.
+        
+        Called once per step: pairs evaluated at the previous step advance
+        by the one-step transition matrix, fresh pairs are evaluated at
+        their elapsed time since firing.
+        """
+        phi11, phi12, phi21, phi22 = self.transition
+        current, rate = self.current, self.rate
+        self.current = phi11 * current + phi12 * rate
+        self.rate = phi21 * current + phi22 * rate
+        
+        fresh = np.flatnonzero(self.fresh)
+        if fresh.size:
+            rows = self.rows[fresh]
+            elapsed = time - self.activation[fresh]
+            alpha, frequency, scale, underdamped, critical = (
+                c[rows] for c in self._simulator.circuits)
+            _, phi12, _, phi22 = discharge_transition(np.maximum(elapsed, 0.0), alpha,
+                                                      frequency, underdamped, critical)
+            started = elapsed >= 0
+            scale = np.where(started, scale, 0.0)
+            self.current[fresh] = scale * phi12
+            self.rate[fresh] = scale * phi22
+            self.fresh[fresh] = ~started
+            
+        return np.maximum(self.current, 0.0), self.rate
+        
+    def retire(self, time: float):
+        """Drop pairs whose discharge is quiet (as StageBank.retire_finished)"""
+        if time >= self._earliest:
+            self._keep(self.due > time)
+            
+    def drop_finished(self, finished: np.ndarray):
+        """Drop pairs of variants that left the tube or coast"""
+        done = finished[self.rows]
+        if done.any():
+            self._keep(~done)
@@ -0,0 +1,178 @@
+"""
+Recording policies for electromagnetic gun simulation.
+
+Decide which simulated steps DataService stores. Stage activations, new
+force maxima and the final state are kept by DataService regardless of
+the policy.
+"""
+
+from typing import Optional, Sequence
+import numpy as np
+
+
+# Positions of the quantities policies look at in a record (HistoryBuffer.FIELDS order)
+TIME, VELOCITY, FORCE, CAPSULE_CURRENT = 0, 2, 4, 6
+
+
+class RecordingPolicy:
+    """
+    Base policy - records every step.
+    
+    Follows SOLID principles:
+    - Single Responsibility: Only decides whether a step is stored
+    - Open/Closed: New policies override wants() (and reset() if stateful)
+    - Liskov Substitution: DataService works with any policy
+    """
+    
+    def wants(self, record: Sequence[float], last: Optional[Sequence[float]]) -> bool:
+        """
+        Decide whether a step is stored.
+        
+        Args:
+            record: Step values in HistoryBuffer.FIELDS order
+            last: Last stored record, None if nothing was stored yet
+            
+        Returns:
+            True to store the step
+        """
+        return True
+    
+    def reset(self) -> None:
+        """Forget per-run state."""
+    
+    def __str__(self) -> str:
+        """String representation for debugging"""
+        return "every step"
+
+
+class EveryKSteps(RecordingPolicy):
+    """Records every k-th step (counted over all simulated steps)."""
+    
+    def __init__(self, k: int):
+        """
+        Args:
+            k: Decimation factor
+            
+        Raises:
+            ValueError: If k is not a positive integer
+        """
+        if int(k) != k or k < 1:
+            raise ValueError(f"k must be a positive integer, got {k}")
+        self.k = int(k)
+        self._step = 0
+    
+    def wants(self, record, last) -> bool:
+        """True on every k-th call"""
+        keep = self._step % self.k == 0
+        self._step += 1
+        return keep
+    
+    def reset(self) -> None:
+        self._step = 0
+    
+    def __str__(self) -> str:
+        return f"every {self.k} steps"
+
+
+class FixedInterval(RecordingPolicy):
+    """Records the first step at or after each multiple of a simulated-time interval."""
+    
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval: Sample interval in simulated time (s)
+            
+        Raises:
+            ValueError: If the interval is not positive
+        """
+        if not interval > 0:
+            raise ValueError(f"Sample interval must be positive, got {interval}")
+        self.interval = float(interval)
+        self._next_time = -np.inf
+    
+    def wants(self, record, last) -> bool:
+        """True once the next grid time is reached"""
+        time = record[TIME]
+        if time < self._next_time:
+            return False
+        self._next_time = (np.floor(time / self.interval) + 1) * self.interval
+        return True
+    
+    def reset(self) -> None:
+        self._next_time = -np.inf
+    
+    def __str__(self) -> str:
+        return f"every {self.interval:g}s"
+
+
+class Adaptive(RecordingPolicy):
+    """
+    Records a step once force, velocity or capsule current moved away from
+    the last stored value by more than rtol * |last| + atol.
+    
+    Flat stretches (coasting, idle stages) produce almost no samples while
+    discharge transients are resolved.
+    """
+    
+    # Absolute floors for (force N, velocity m/s, capsule current A)
+    DEFAULT_ATOL = (1e-3, 1e-4, 1e-3)
+    
+    def __init__(self, rtol: float = 0.01, atol=None):
+        """
+        Args:
+            rtol: Relative change that triggers a sample
+            atol: Absolute change floor, scalar or (force, velocity, current)
+                (default: DEFAULT_ATOL)
+                
+        Raises:
+            ValueError: If a tolerance is negative or both are zero
+        """
+        atol = np.broadcast_to(np.asarray(self.DEFAULT_ATOL if atol is None else atol,
+                                          dtype=float), (3,))
+        if rtol < 0 or np.any(atol < 0) or (rtol == 0 and not np.any(atol > 0)):
+            raise ValueError("Tolerances must be non-negative and not all zero")
+        self.rtol = float(rtol)
+        self.atol = tuple(atol.tolist())
+    
+    def wants(self, record, last) -> bool:
+        """True if any watched quantity drifted past its tolerance"""
+        if last is None:
+            return True
+        for field, atol in zip((FORCE, VELOCITY, CAPSULE_CURRENT), self.atol):
+            if abs(record[field] - last[field]) > self.rtol * abs(last[field]) + atol:
+                return True
+        return False
+    
+    def __str__(self) -> str:
+        return f"adaptive (rtol={self.rtol:g})"
+
+
+def parse_recording_policy(spec: str) -> RecordingPolicy:
+    """
+    Build a policy from a command-line specification.
+    
+    Also serves as argparse type for the --record option.
+    
+    Args:
+        spec: 'all', 'every:K', 'interval:SECONDS' or 'adaptive[:RTOL]'
+        
+    Returns:
+        The recording policy
+        
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    kind, _, value = spec.partition(':')
+    try:
+        if kind == 'all' and not value:
+            return RecordingPolicy()
+        if kind == 'every':
+            return EveryKSteps(int(value))
+        if kind == 'interval':
+            return FixedInterval(float(value))
+        if kind == 'adaptive':
+            return Adaptive(float(value)) if value else Adaptive()
+    except ValueError as error:
+        raise ValueError(f"Invalid recording policy '{spec}': {error}") from None
+    raise ValueError(f"Invalid recording policy '{spec}', expected 'all', "
+                     "'every:K', 'interval:SECONDS' or 'adaptive[:RTOL]'")
@@ -5,13 +5,82 @@ Main orchestrator that coordinates all components and manages
 the complete electromagnetic gun simulation process.
 """
 
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
 import numpy as np
 
 from src.core.capsule import Capsule
 from src.core.acceleration_stage import AccelerationStage
+from src.core.stage_bank import StageBank
 from src.physics.physics_engine import PhysicsEngine
-from src.services.data_service import DataService
+from src.physics.integrators import DormandPrince45, hermite_crossing_time
+from src.services.data_service import DataService, HistoryView, RunStatistics
+from src.services.disk_history import DiskHistoryBuffer
+from src.services.recording import RecordingPolicy
+
+
+@dataclass
+class StepContext:
+    """
+    Stage quantities evaluated once per time step.
+    
+    Shared by the capsule current update, the force sum and the recorder so
+    every active stage's current, dI/dt, distance and mutual-inductance
+    terms are computed exactly once per step. Arrays hold one entry per
+    index in ``indices``; for fewer than SimulationService.SCALAR_STAGE_LIMIT
+    stages they are plain lists of floats.
+    """
+    time: float
+    indices: np.ndarray
+    stage_current: np.ndarray
+    stage_current_rate: np.ndarray
+    distance: np.ndarray
+    mutual_inductance: np.ndarray
+    inductance_gradient: np.ndarray   # Analytic dM/dx
+    far_stages: int = 0               # Conducting stages beyond the far-field cutoff
+    
+    @property
+    def active_stages(self) -> int:
+        """Number of stages evaluated in this step."""
+        return int(self.indices.size)
+    
+    @property
+    def total_stage_current(self) -> float:
+        """Sum of the evaluated stage currents (A)."""
+        if isinstance(self.stage_current, list):
+            return float(sum(self.stage_current))
+        return float(self.stage_current.sum())
+
+
+@dataclass(frozen=True)
+class StepSnapshot:
+    """
+    Capsule state after one simulated step, as yielded by
+    SimulationService.iter_steps.
+    
+    Carries the values of the step's record (HistoryBuffer.FIELDS) plus
+    the step index, so consumers need neither the history nor the
+    service's objects.
+    """
+    step: int
+    time: float
+    position: float
+    velocity: float
+    acceleration: float
+    force: float
+    kinetic_energy: float
+    capsule_current: float
+    active_stages: int
+    total_stage_current: float
+    
+    @classmethod
+    def from_values(cls, step: int, values: Sequence[float]) -> 'StepSnapshot':
+        """Snapshot from a record tuple in HistoryBuffer.FIELDS order."""
+        (time, position, velocity, acceleration, force, kinetic_energy,
+         capsule_current, active_stages, total_stage_current) = values
+        return cls(step, float(time), float(position), float(velocity), float(acceleration),
+                   float(force), float(kinetic_energy), float(capsule_current),
+                   int(active_stages), float(total_stage_current))
 
 
 class SimulationResult:
@@ -19,11 +88,17 @@ class SimulationResult:
     Result object containing complete simulation data and analysis.
     
     Provides access to simulation outcomes and performance metrics.
+    
+    The history is either a list of record dictionaries or a HistoryView
+    from DataService; with a view the array accessors return zero-copy
+    column views. Summary metrics come from the RunStatistics the
+    recorder kept while the run progressed, so they cost O(1) however
+    long the history is.
     """
     
     def __init__(self, final_velocity: float, final_position: float, 
                  total_time: float, initial_energy: float, 
-                 history: List[dict]):
+                 history: Sequence[dict], statistics: Optional[RunStatistics] = None):
         """
         Initialize simulation result.
         
@@ -33,27 +108,87 @@ class SimulationResult:
             total_time: Total simulation time (s)
             initial_energy: Initial stored energy (J)
             history: Complete simulation history
+            statistics: Running aggregates of the run (default: computed
+                once from the history on first use)
         """
         self.final_velocity = final_velocity
         self.final_position = final_position
         self.total_time = total_time
         self.initial_energy = initial_energy
         self.history = history
+        self._statistics = statistics
+    
+    @property
+    def statistics(self) -> RunStatistics:
+        """Running aggregates of the run."""
+        if self._statistics is None:
+            self._statistics = RunStatistics.from_history(self.history)
+        return self._statistics
     
     @property
     def final_kinetic_energy(self) -> float:
         """Calculate final kinetic energy from last history record."""
-        if self.history:
+        if len(self.history):
             return self.history[-1]['kinetic_energy']
         return 0.0
     
     @property
     def max_force(self) -> float:
-        """Calculate maximum force during simulation."""
-        if self.history:
-            return max(record['force'] for record in self.history)
+        """Maximum force during simulation (N)."""
+        if self.statistics.steps:
+            return float(self.statistics.max_force)
+        return 0.0
+    
+    @property
+    def min_force(self) -> float:
+        """Minimum (most braking) force during simulation (N)."""
+        if self.statistics.steps:
+            return float(self.statistics.min_force)
         return 0.0
     
+    @property
+    def max_force_time(self) -> float:
+        """Time of the maximum force (s), NaN without data."""
+        return float(self.statistics.max_force_time)
+    
+    @property
+    def peak_acceleration(self) -> float:
+        """Largest acceleration magnitude (m/s²)."""
+        return float(self.statistics.peak_acceleration)
+    
+    @property
+    def peak_capsule_current(self) -> float:
+        """Largest capsule current magnitude (A)."""
+        return float(self.statistics.peak_capsule_current)
+    
+    @property
+    def stage_firing_times(self) -> np.ndarray:
+        """Activation time of every stage (s), NaN for stages that never fired."""
+        return self.statistics.stage_firing_times
+    
+    @property
+    def exit_time(self) -> Optional[float]:
+        """Time the capsule reached the tube end (s), None if it did not."""
+        return self.statistics.exit_time
+    
+    @property
+    def energy_ledger(self) -> dict:
+        """
+        Where the stored energy went (J).
+        
+        kinetic_energy_gain and capsule_resistive_loss are tracked; the
+        remainder covers stage resistive losses, energy still in the
+        capacitors and discretization error.
+        """
+        statistics = self.statistics
+        gain = self.final_kinetic_energy - statistics.initial_kinetic_energy
+        return {
+            'initial_energy': self.initial_energy,
+            'kinetic_energy_gain': gain,
+            'capsule_resistive_loss': statistics.capsule_resistive_loss,
+            'remainder': self.initial_energy - gain - statistics.capsule_resistive_loss,
+        }
+    
     @property
     def energy_efficiency(self) -> float:
         """Calculate energy transfer efficiency (kinetic/initial)."""
@@ -70,29 +205,42 @@ class SimulationResult:
             'initial_energy': self.initial_energy,
             'final_kinetic_energy': self.final_kinetic_energy,
             'max_force': self.max_force,
+            'min_force': self.min_force,
+            'peak_acceleration': self.peak_acceleration,
+            'peak_capsule_current': self.peak_capsule_current,
+            'exit_time': self.exit_time,
+            'stage_firing_times': [None if np.isnan(t) else float(t)
+                                   for t in self.stage_firing_times],
+            'energy_ledger': self.energy_ledger,
             'energy_efficiency': self.energy_efficiency,
-            'history': self.history
+            'history': list(self.history)
         }
     
+    def _column(self, field: str) -> np.ndarray:
+        """One history field as an array"""
+        if isinstance(self.history, HistoryView):
+            return self.history.column(field)
+        return np.array([record[field] for record in self.history])
+    
     def get_time_array(self) -> np.ndarray:
         """Get time values as numpy array for plotting."""
-        return np.array([record['time'] for record in self.history])
+        return self._column('time')
     
     def get_position_array(self) -> np.ndarray:
         """Get position values as numpy array for plotting."""
-        return np.array([record['position'] for record in self.history])
+        return self._column('position')
     
     def get_velocity_array(self) -> np.ndarray:
         """Get velocity values as numpy array for plotting."""
-        return np.array([record['velocity'] for record in self.history])
+        return self._column('velocity')
     
     def get_force_array(self) -> np.ndarray:
         """Get force values as numpy array for plotting."""
-        return np.array([record['force'] for record in self.history])
+        return self._column('force')
     
     def get_energy_array(self) -> np.ndarray:
         """Get kinetic energy values as numpy array for plotting."""
-        return np.array([record['kinetic_energy'] for record in self.history])
+        return self._column('kinetic_energy')
 
 
 class SimulationService:
@@ -103,8 +251,36 @@ class SimulationService:
     electromagnetic gun simulation process with time stepping.
     """
     
+    INTEGRATORS = ('fixed', 'rk45')
+    
+    # Adaptive absolute tolerances for (position m, velocity m/s, capsule current A)
+    DEFAULT_ATOL = (1e-9, 1e-9, 1e-3)
+    
+    # Stage current (A) below which a stage exerts no force
+    SIGNIFICANT_STAGE_CURRENT = 1e-4
+    
+    # Interacting stages below which a step is evaluated with plain floats
+    # (NumPy's per-call overhead outweighs the arithmetic for a few stages)
+    SCALAR_STAGE_LIMIT = 8
+    
+    # Steps per fastest time scale for dt='auto'. The fixed-step error is
+    # first order in dt over the stage ringing time (peak force about 0.4%
+    # off a converged run at the 1e-5 s default, 1/126 of the default
+    # stage's scale), so 125 steps per circuit scale match the default's
+    # accuracy. The transit scale assumes an upper-bound speed; 25 steps
+    # per coil transit keep light, fast capsules within the same error.
+    AUTO_DT_RESOLUTION = 125
+    AUTO_DT_TRANSIT_RESOLUTION = 25
+    
     def __init__(self, capsule: Capsule, stages: List[AccelerationStage], 
-                 tube_length: float, dt: float = 1e-5):
+                 tube_length: float, dt: Union[float, str] = 1e-5,
+                 physics: Optional[PhysicsEngine] = None,
+                 integrator: str = 'fixed', rtol: float = 1e-6, atol=None,
+                 max_step: Optional[float] = None,
+                 fast_forward: bool = True, coast_samples: int = 100,
+                 retire_stages: bool = True, single_pulse: bool = False,
+                 substeps: int = 1, recording: Optional[RecordingPolicy] = None,
+                 history_directory: Optional[str] = None):
         """
         Initialize simulation service.
         
@@ -112,20 +288,96 @@ class SimulationService:
             capsule: Projectile capsule to simulate
             stages: List of acceleration stages
             tube_length: Total tube length (m)
-            dt: Time step for integration (s)
+            dt: Time step for integration (s), or 'auto' to derive it from
+                the circuits and geometry at the start of each run (see
+                select_time_step)
+            physics: Physics engine to use (default: a new PhysicsEngine,
+                e.g. pass PhysicsEngine(lookup_tables=True) for tabulated M(x))
+            integrator: 'fixed' (one step of dt per iteration) or 'rk45'
+                (adaptive Dormand-Prince over position, velocity and
+                capsule current; dt is then only the first step size)
+            rtol: Relative tolerance for the adaptive integrator
+            atol: Absolute tolerance for the adaptive integrator, scalar or
+                (position, velocity, current) (default: DEFAULT_ATOL)
+            max_step: Upper bound on adaptive steps (s), None for no bound
+            fast_forward: Integrate the coast phase in closed form once no
+                stage can interact with the capsule any more
+            coast_samples: Synthetic history points recorded over a
+                fast-forwarded coast phase (0 records only its end)
+            retire_stages: Drop stages from the active set once their
+                current can no longer exceed SIGNIFICANT_STAGE_CURRENT
+            single_pulse: Also end every discharge after its first
+                half-cycle (thyristor-switched stages)
+            substeps: Multi-rate stepping for the fixed integrator - circuit
+                and force are evaluated every dt, position and velocity
+                advance (and a record is written) every substeps * dt
+            recording: Policy deciding which steps are stored (default:
+                every step; stage firings, force maxima and the final
+                state are always stored)
+            history_directory: Stream the history to column files in this
+                directory (DiskHistoryBuffer) instead of keeping it in memory
+            
+        Raises:
+            ValueError: If the integrator, time step or substeps is invalid
         """
+        if integrator not in self.INTEGRATORS:
+            raise ValueError(f"Unknown integrator '{integrator}', "
+                             f"expected one of {self.INTEGRATORS}")
+        dt = self.parse_time_step(dt)
+        if int(substeps) != substeps or substeps < 1:
+            raise ValueError(f"substeps must be a positive integer, got {substeps}")
+        
         self.capsule = capsule
         self.stages = stages
         self.tube_length = tube_length
-        self.dt = dt
+        
+        # Array view over all stages - lets each step evaluate them at once
+        self.bank = StageBank(stages)
         
         # Initialize physics engine and data service
-        self.physics = PhysicsEngine()
-        self.data = DataService()
+        self.physics = physics or PhysicsEngine()
+        buffer = DiskHistoryBuffer(history_directory) if history_directory else None
+        self.data = DataService(recording, buffer)
+        
+        # Time step - fixed, or chosen from the physics (auto_dt)
+        self.auto_dt = dt == 'auto'
+        self.dt_reason = 'user'
+        if self.auto_dt:
+            self.dt, self.dt_reason = self.select_time_step()
+        else:
+            self.dt = dt
+        
+        # Time integration
+        self.integrator = integrator
+        self.rtol = rtol
+        self.atol = self.DEFAULT_ATOL if atol is None else atol
+        self.max_step = max_step
+        
+        # Coast-phase fast-forward
+        self.fast_forward = fast_forward
+        self.coast_samples = coast_samples
+        
+        # Active-set retirement
+        self.retire_stages = retire_stages or single_pulse
+        self.single_pulse = single_pulse
+        
+        # Multi-rate stepping (fine circuit steps per mechanical macro step)
+        self.substeps = int(substeps)
         
         # Simulation state
         self.time = 0.0
         
+        # Capsule position the stage trigger pointer is synchronised with
+        # (None forces a full activation scan on the next step)
+        self._trigger_position: Optional[float] = None
+        
+        # Coast detection caches (see _is_coasting)
+        self._coast_check_time = -np.inf
+        self._coast_blocked = None
+        
+        # Stages farther from the capsule than this are not evaluated
+        self._interaction_radius = self._compute_interaction_radius()
+        
         # Store initial conditions for reset
         self._initial_capsule_state = {
             'position': capsule.position,
@@ -133,27 +385,105 @@ class SimulationService:
             'current': capsule.current
         }
     
-    def run(self, max_time: float = 0.01) -> SimulationResult:
+    def run(self, max_time: float = 0.01,
+            callback: Optional[Callable[[StepSnapshot], Optional[bool]]] = None,
+            every: int = 1) -> SimulationResult:
         """
         Run the complete simulation.
         
         Args:
             max_time: Maximum simulation time (s)
+            callback: Optional function receiving a StepSnapshot every
+                `every` steps and for the last step (see iter_steps);
+                returning False stops the run early
+            every: Snapshot interval in steps for the callback
             
         Returns:
-            SimulationResult with complete simulation data
+            SimulationResult with complete simulation data (up to the
+            stopping step if the callback aborted the run)
+        """
+        if callback is None:
+            for _ in self._steps(max_time):
+                pass
+        else:
+            for snapshot in self.iter_steps(max_time, every):
+                if callback(snapshot) is False:
+                    break
+                    
+        # Generate and return results
+        return self.data.get_results()
+    
+    def iter_steps(self, max_time: float = 0.01, every: int = 1) -> Iterator[StepSnapshot]:
+        """
+        Run the simulation step by step.
+        
+        Yields a StepSnapshot for every `every`-th recorded step and for
+        the last one. Stopping the iteration early leaves the service at
+        that step; data.get_results() then summarizes the run so far.
+        Combine with a recording policy or a history directory to keep the
+        stored history small while consuming every step here.
+        
+        Args:
+            max_time: Maximum simulation time (s)
+            every: Snapshot interval in steps
+            
+        Returns:
+            Generator of StepSnapshot
+            
+        Raises:
+            ValueError: If every is not a positive integer
+        """
+        if int(every) != every or every < 1:
+            raise ValueError(f"every must be a positive integer, got {every}")
+        return self._snapshots(max_time, int(every))
+    
+    def _snapshots(self, max_time: float, every: int) -> Iterator[StepSnapshot]:
+        """Snapshot every `every`-th step of _steps and the last step"""
+        step = -1
+        for step, _ in enumerate(self._steps(max_time)):
+            if step % every == 0:
+                yield StepSnapshot.from_values(step, self.data.latest)
+        if step > 0 and step % every:
+            yield StepSnapshot.from_values(step, self.data.latest)
+    
+    def _steps(self, max_time: float) -> Iterator[None]:
+        """
+        Advance the simulation, yielding once per recorded step.
+        
+        The single code path behind run() and iter_steps().
+        
+        Args:
+            max_time: Maximum simulation time (s)
         """
         # Set initial energy for efficiency calculations
         initial_energy = sum(stage.stored_energy for stage in self.stages)
         self.data.set_initial_energy(initial_energy)
+        self.data.set_tube_length(self.tube_length)
+        
+        # Physics engine or geometry may have changed since construction
+        self._interaction_radius = self._compute_interaction_radius()
+        if self.auto_dt:
+            self.dt, self.dt_reason = self.select_time_step()
         
         # Main simulation loop
+        if self.integrator == 'rk45':
+            yield from self._adaptive_steps(max_time)
+            return
+            
         while self.time < max_time and self.capsule.position < self.tube_length:
-            self._step()
-            self.time += self.dt
-        
-        # Generate and return results
-        return self.data.get_results()
+            if self._is_coasting():
+                yield from self._fast_forward(max_time)
+                break
+            if self.substeps > 1:
+                # The last macro step only covers the dt steps left before max_time
+                remaining = int(np.ceil((max_time - self.time) / self.dt - 1e-9))
+                substeps = max(1, min(self.substeps, remaining))
+                self._macro_step(substeps)
+                self.time += self.dt * substeps
+            else:
+                self._step()
+                self.time += self.dt
+            yield
     
     def _step(self) -> None:
         """
@@ -169,153 +499,712 @@ class SimulationService:
         # Check for stage activations based on capsule position
         self._check_stage_activations()
         
+        # Drop stages whose discharge is over
+        self._retire_stages()
+        
+        # Evaluate every active stage once for this step
+        context = self._evaluate_stages()
+        
         # Update induced current in capsule from moving through magnetic fields
-        self._update_capsule_current()
+        self._update_capsule_current(context)
         
         # Calculate total electromagnetic force from all active stages
-        total_force = self._calculate_total_force()
+        total_force = self._calculate_total_force(context)
         
         # Update capsule kinematics using physics engine
-        self.physics.update_kinematics(self.capsule, total_force, self.dt)
+        start_position, start_velocity = self.capsule.position, self.capsule.velocity
+        self.physics.update_kinematics(self.capsule, total_force, self.dt,
+                                       force_at=self._force_at)
+        
+        # Fire stages whose trigger point was crossed during the step
+        self._fire_crossed_stages(start_position, start_velocity, total_force / self.capsule.mass)
         
         # Record current state for analysis
-        self.data.record(self.time, self.capsule, self.stages, total_force)
+        self.data.record(self.time, self.capsule, self.bank, total_force, context)
     
-    def _check_stage_activations(self) -> None:
+    def _macro_step(self, substeps: Optional[int] = None) -> None:
+        """
+        Execute one multi-rate macro step of substeps * dt.
+        
+        Terms on the circuit time scale - stage currents, their dI/dt, the
+        capsule current and the force - are advanced every dt. Terms on the
+        mechanical time scale - position, velocity and the geometry-dependent
+        M and dM/dx (the capsule moves micrometres per dt) - are evaluated
+        once per macro step, or again when a stage fires inside it. Stage
+        triggers are checked every dt against the path predicted from the
+        macro-step start (x + v*τ). Position and velocity advance once from
+        the mean force, so the velocity change equals the summed sub-step
+        impulse; the capsule object is updated and one record written per
+        macro step, with the mean force.
+        
+        Args:
+            substeps: Circuit steps in this macro step (default:
+                self.substeps; fewer for the last one before max_time)
+        """
+        substeps = self.substeps if substeps is None else substeps
+        self._check_stage_activations()
+        self._retire_stages()
+        
+        dt = self.dt
+        start_position, start_velocity = self.capsule.position, self.capsule.velocity
+        inductance = self.capsule.inductance
+        resistance = self.capsule.properties.resistance
+        
+        first_context = context = self._evaluate_stages(self.time, start_position)
+        impulse = 0.0
+        for substep in range(substeps):
+            offset = substep * dt
+            position = start_position + start_velocity * offset
+            if context is None:
+                # Active set changed - re-evaluate geometry for the new stages
+                context = self._evaluate_stages(self.time + offset, position)
+            elif substep:
+                stage_current, stage_current_rate = self._discharge_state(
+                    self.time + offset, context.indices)
+                context = StepContext(self.time + offset, context.indices,
+                                      stage_current, stage_current_rate, context.distance,
+                                      context.mutual_inductance, context.inductance_gradient,
+                                      context.far_stages)
+                                      
+            emf = self._induced_emf(context, start_velocity)
+            self.capsule.current = self.physics.update_circuit_current(
+                self.capsule.current, emf, inductance, resistance, dt
+            )
+            impulse += self._electromagnetic_force(context, self.capsule.current,
+                                                   start_velocity) * dt
+            
+            # Fire stages whose trigger point the predicted path crosses
+            next_position = position + start_velocity * dt
+            if next_position >= self.bank.next_trigger_position:
+                for index in self.bank.take_crossed(next_position):
+                    delay = self.physics.calculate_crossing_time(
+                        position, start_velocity, 0.0, self.bank.trigger_positions[index], dt
+                    )
+                    self.stages[index].activate(self.time + offset + delay)
+                    context = None
+                    
+        mean_force = impulse / (dt * substeps)
+        self.physics.update_kinematics(self.capsule, mean_force, dt * substeps)
+        
+        # Keep the trigger pointer in sync (full scan after backward motion)
+        forward = self.capsule.position >= start_position
+        self._trigger_position = self.capsule.position if forward else None
+        
+        self.data.record(self.time, self.capsule, self.bank, mean_force, first_context)
+    
+    def _check_stage_activations(self) -> np.ndarray:
         """
         Check and activate stages when capsule approaches.
         
-        Stages activate when capsule is within one coil length distance.
+        Stages activate when capsule is within one coil length distance
+        (at least 1cm). While the capsule moves forward, trigger crossings
+        are handled as events at the end of each step, so this full scan of
+        all idle stages only runs on the first step, after backward motion,
+        or when the capsule was moved externally.
+        
+        Returns:
+            Indices of the stages activated by this call
         """
-        for stage in self.stages:
-            if not stage.is_active:
-                distance_to_stage = abs(self.capsule.position - stage.properties.position)
-                
-                # Activate when capsule is within coil length (or very close)
-                activation_distance = max(stage.properties.length, 0.01)  # At least 1cm activation distance
-                
-                if distance_to_stage <= activation_distance:
-                    stage.activate(self.time)
+        position = self.capsule.position
+        if position == self._trigger_position:
+            return np.zeros(0, dtype=int)
+        
+        fired = self.bank.check_activations(position, self.time)
+        self.bank.seek_trigger(position)
+        self._trigger_position = position
+        return fired
     
-    def _update_capsule_current(self) -> None:
+    def _retire_stages(self) -> np.ndarray:
+        """
+        Retire stages whose discharge is over from the active set.
+        
+        Retired stages keep their activation and retirement times (and
+        their energy account) but are no longer evaluated, so the per-step
+        cost depends on the stages still discharging, not on how many have
+        fired.
+        
+        Returns:
+            Indices of the stages retired by this call
+        """
+        if not self.retire_stages:
+            return np.zeros(0, dtype=int)
+        return self.bank.retire_finished(self.time, self.SIGNIFICANT_STAGE_CURRENT,
+                                         self.single_pulse)
+    
+    def _fire_crossed_stages(self, start_position: float, start_velocity: float,
+                             acceleration: float) -> None:
+        """
+        Fire stages whose trigger point the capsule crossed during a fixed step.
+        
+        Costs one comparison against the next trigger point per step. Each
+        crossed stage is activated at the exact crossing time on the step's
+        trajectory rather than at the next grid time, so firing times do not
+        depend on dt.
+        
+        Args:
+            start_position: Capsule position at the start of the step (m)
+            start_velocity: Capsule velocity at the start of the step (m/s)
+            acceleration: Acceleration used for the step (m/s²)
+        """
+        position = self.capsule.position
+        if position < start_position:
+            # Moving backwards - fall back to the window scan next step
+            self._trigger_position = None
+            return
+        
+        if position >= self.bank.next_trigger_position:
+            for index in self.bank.take_crossed(position):
+                delay = self.physics.calculate_crossing_time(
+                    start_position, start_velocity, acceleration,
+                    self.bank.trigger_positions[index], self.dt
+                )
+                self.stages[index].activate(self.time + delay)
+        self._trigger_position = position
+    
+    def _evaluate_stages(self, time: Optional[float] = None,
+                         position: Optional[float] = None) -> StepContext:
+        """
+        Evaluate all active stages at a time and capsule position.
+        
+        Args:
+            time: Evaluation time (s), default the current simulation time
+            position: Capsule position (m), default the current position
+            
+        Returns:
+            StepContext shared by the rest of the step
+        """
+        time = self.time if time is None else time
+        position = self.capsule.position if position is None else position
+        
+        # Only stages within the far-field cutoff couple to the capsule; the
+        # rest still count towards the per-stage drag term
+        indices = self.bank.active_within(position, self._interaction_radius)
+        far_stages = 0
+        if indices is None:
+            indices = self.bank.active_indices
+        else:
+            far_stages = self._count_far_stages(time, indices)
+        stage_current, stage_current_rate = self._discharge_state(time, indices)
+        
+        if indices.size < self.SCALAR_STAGE_LIMIT:
+            # A few stages - scalar inductance model, one stage at a time
+            distance, mutual_inductance, inductance_gradient = [], [], []
+            for index in indices.tolist():
+                stage = self.bank.stages[index]
+                gap = max(0.001, abs(position - stage.properties.position))  # Minimum 1mm
+                m, dm_dx = self.physics.calculate_mutual_inductance_and_gradient(
+                    stage, self.capsule, gap)
+                distance.append(gap)
+                mutual_inductance.append(m)
+                inductance_gradient.append(dm_dx)
+        else:
+            distance = np.maximum(0.001, np.abs(position - self.bank.positions[indices]))
+            
+            # Mutual inductance and its analytic gradient in one batched call
+            mutual_inductance, inductance_gradient = self._stage_mutual_inductance(
+                indices, distance)
+        
+        return StepContext(
+            time=time,
+            indices=indices,
+            stage_current=stage_current,
+            stage_current_rate=stage_current_rate,
+            distance=distance,
+            mutual_inductance=mutual_inductance,
+            inductance_gradient=inductance_gradient,
+            far_stages=far_stages,
+        )
+    
+    def _count_far_stages(self, time: float, nearby: np.ndarray) -> int:
+        """
+        Number of active stages outside the interaction radius that still
+        carry significant current.
+        
+        Their coupling is below the far-field tolerance, but the drag term
+        in _electromagnetic_force does not depend on distance.
+        
+        Args:
+            time: Evaluation time (s)
+            nearby: Active stage indices within the interaction radius
+            
+        Returns:
+            Count of far stages above SIGNIFICANT_STAGE_CURRENT
+        """
+        far = np.setdiff1d(self.bank.active_indices, nearby, assume_unique=True)
+        if not far.size:
+            return 0
+        current, _ = self.bank.discharge_state(time, far)
+        return int(np.count_nonzero(np.abs(current) > self.SIGNIFICANT_STAGE_CURRENT))
+    
+    def _discharge_state(self, time: float, indices: np.ndarray):
+        """
+        Discharge current and dI/dt of a set of active stages.
+        
+        A handful of stages is evaluated one by one from their precompiled
+        circuits; larger sets in one StageBank call.
+        
+        Args:
+            time: Evaluation time (s)
+            indices: Active stage indices in the bank
+            
+        Returns:
+            Tuple of (current, current_derivative), lists of floats below
+            SCALAR_STAGE_LIMIT stages and arrays otherwise
+        """
+        if indices.size >= self.SCALAR_STAGE_LIMIT:
+            if indices is self.bank.active_indices:
+                return self.bank.discharge_state(time)
+            return self.bank.discharge_state(time, indices)
+        
+        current, current_rate = [], []
+        for index in indices.tolist():
+            elapsed = time - self.bank.activation_times[index]
+            if elapsed < 0:
+                # Fires later in this step
+                value, rate = 0.0, 0.0
+            else:
+                value, rate = self.bank.stages[index].circuit.state(elapsed)
+            current.append(value)
+            current_rate.append(rate)
+        return current, current_rate
+    
+    def _update_capsule_current(self, context: Optional[StepContext] = None) -> None:
         """
         Update induced current in capsule due to changing magnetic flux.
         
         Current is induced by motion through magnetic fields and
-        changing currents in nearby stages.
+        changing currents in nearby stages. The capsule is an L-R circuit,
+        L dI/dt = EMF - R*I, advanced with the exponential integrator so
+        the result does not depend on dt relative to L/R.
+        
+        Args:
+            context: Stage evaluation for this step (computed if omitted)
         """
-        total_induced_emf = 0.0
+        if context is None:
+            context = self._evaluate_stages()
         
-        # Calculate EMF from all active stages
-        for stage in self.stages:
-            if stage.is_active:
-                distance = max(0.001, abs(self.capsule.position - stage.properties.position))  # Minimum 1mm
-                stage_current = stage.get_current(self.time)
-                
-                # Mutual inductance between stage and capsule
-                mutual_inductance = self.physics.calculate_mutual_inductance(
-                    stage, self.capsule, distance
-                )
-                
-                # EMF from changing stage current (dI/dt)
-                stage_current_rate = stage.get_current_derivative(self.time)
-                induced_emf = mutual_inductance * stage_current_rate
-                
-                # EMF from capsule motion (v * dM/dx)
-                dm_dx = self._calculate_mutual_inductance_gradient(stage, distance)
-                motional_emf = self.capsule.velocity * stage_current * dm_dx
-                
-                total_induced_emf += induced_emf + motional_emf
+        total_induced_emf = self._induced_emf(context, self.capsule.velocity)
+        self.capsule.current = self.physics.update_circuit_current(
+            self.capsule.current, total_induced_emf, self.capsule.inductance,
+            self.capsule.properties.resistance, self.dt
+        )
+    
+    def _induced_emf(self, context: StepContext, velocity: float) -> float:
+        """
+        Total EMF induced in the capsule by the evaluated stages.
         
-        # Update capsule current using Ohm's law
-        # I = EMF / R (with some damping for numerical stability)
-        if self.capsule.properties.resistance > 0:
-            induced_current = total_induced_emf / self.capsule.properties.resistance
+        Args:
+            context: Stage evaluation
+            velocity: Capsule velocity (m/s)
             
-            # Simple exponential approach to steady state
-            damping_factor = 0.1
-            self.capsule.current += damping_factor * (induced_current - self.capsule.current)
+        Returns:
+            EMF in Volts
+        """
+        if isinstance(context.stage_current, list):
+            return float(sum(m * rate + velocity * current * dm_dx for m, rate, current, dm_dx in
+                             zip(context.mutual_inductance, context.stage_current_rate,
+                                 context.stage_current, context.inductance_gradient)))
+        
+        # EMF from changing stage current (M * dI/dt)
+        induced_emf = context.mutual_inductance * context.stage_current_rate
+        
+        # EMF from capsule motion (v * I * dM/dx)
+        motional_emf = velocity * context.stage_current * context.inductance_gradient
+        
+        return float(np.sum(induced_emf + motional_emf))
     
-    def _calculate_total_force(self) -> float:
+    def _calculate_total_force(self, context: Optional[StepContext] = None) -> float:
         """
         Calculate total electromagnetic force on capsule.
         
         Uses proper electromagnetic force physics without arbitrary scaling.
         Force direction determined by physics calculations, not position logic.
         
+        Args:
+            context: Stage evaluation for this step (computed if omitted)
+            
         Returns:
             Total force in Newtons (positive = acceleration direction)
         """
-        total_force = 0.0
+        if context is None:
+            context = self._evaluate_stages()
         
-        for stage in self.stages:
-            if stage.is_active:
-                stage_current = stage.get_current(self.time)
-                distance = max(0.001, abs(self.capsule.position - stage.properties.position))  # Minimum 1mm
-                
-                # Calculate force if currents are significant enough
-                if abs(stage_current) > 1e-4 and abs(self.capsule.current) > 1e-6:
-                    # Calculate electromagnetic force using physics engine
-                    # Force direction is inherently determined by current directions
-                    # and mutual inductance gradient
-                    force = self.physics.calculate_force(
-                        stage, self.capsule, distance,
-                        stage_current, self.capsule.current
-                    )
-                    
-                    # Apply force direction based on physics, not arbitrary rules
-                    # The physics engine already accounts for attractive/repulsive forces
-                    # based on current directions and mutual inductance gradient
-                    
-                    # For electromagnetic gun timing, we expect:
-                    # - Attractive force when capsule approaches (proper timing)
-                    # - Reduced or opposing force when capsule passes (late timing)
-                    
-                    position_relative = self.capsule.position - stage.properties.position
-                    
-                    if position_relative < 0:
-                        # Capsule approaching stage - use full calculated force
-                        total_force += force
-                    else:
-                        # Capsule past stage - use physics-calculated force
-                        # This naturally accounts for timing and current direction
-                        # No arbitrary scaling - let physics determine the result
-                        total_force += force
-                        
-                    # Add back-EMF opposition for velocity-dependent losses
-                    # This provides realistic velocity-dependent drag
-                    if abs(self.capsule.velocity) > 0.01:  # Only for significant velocities (1 cm/s)
-                        back_emf_force = -0.001 * self.capsule.velocity  # Much smaller drag coefficient
-                        total_force += back_emf_force
+        return self._electromagnetic_force(context, self.capsule.current, self.capsule.velocity)
+    
+    def _electromagnetic_force(self, context: StepContext, capsule_current: float,
+                               velocity: float) -> float:
+        """
+        Force on the capsule for a given capsule current and velocity.
+        
+        Args:
+            context: Stage evaluation
+            capsule_current: Capsule current (A)
+            velocity: Capsule velocity (m/s)
+            
+        Returns:
+            Total force in Newtons (positive = acceleration direction)
+        """
+        if abs(capsule_current) <= 1e-6:
+            return 0.0
+        
+        # F = -I_stage * I_capsule * dM/dx, same as PhysicsEngine.calculate_force.
+        # The sign is inherently determined by current directions and the
+        # mutual inductance gradient - no position-based rules.
+        # Calculate force only where currents are significant enough
+        if isinstance(context.stage_current, list):
+            forces = [-current * capsule_current * dm_dx
+                      for current, dm_dx in zip(context.stage_current, context.inductance_gradient)
+                      if abs(current) > self.SIGNIFICANT_STAGE_CURRENT]
+            total_force = float(sum(forces))
+            interacting = len(forces)
+        else:
+            significant = np.abs(context.stage_current) > self.SIGNIFICANT_STAGE_CURRENT
+            force = -context.stage_current * capsule_current * context.inductance_gradient
+            total_force = float(np.sum(force[significant]))
+            interacting = int(np.count_nonzero(significant))
+        
+        interacting += context.far_stages
+        if not interacting:
+            return 0.0
+        
+        # Add back-EMF opposition for velocity-dependent losses
+        # This provides realistic velocity-dependent drag (one term per
+        # conducting stage, including those beyond the far-field cutoff)
+        if abs(velocity) > 0.01:  # Only for significant velocities (1 cm/s)
+            back_emf_force = -0.001 * velocity  # Much smaller drag coefficient
+            total_force += back_emf_force * interacting
         
         return total_force
     
-    def _calculate_mutual_inductance_gradient(self, stage: AccelerationStage,
-                                            distance: float) -> float:
+    def _force_at(self, offset: float, position: float, velocity: float) -> float:
+        """
+        Force inside the current step, for multi-evaluation kinematics.
+        
+        The capsule current is held at its value for this step.
+        
+        Args:
+            offset: Time since the start of the step (s)
+            position: Capsule position (m)
+            velocity: Capsule velocity (m/s)
+            
+        Returns:
+            Total force in Newtons
+        """
+        context = self._evaluate_stages(self.time + offset, position)
+        return self._electromagnetic_force(context, self.capsule.current, velocity)
+    
+    def _derivatives(self, time: float, state: np.ndarray) -> np.ndarray:
+        """
+        Right-hand side of the capsule ODE for the adaptive integrator.
+        
+        The capsule current follows its L-R circuit, L dI/dt = EMF - R*I.
+        
+        Args:
+            time: Time (s)
+            state: (position, velocity, capsule current)
+            
+        Returns:
+            d(state)/dt
+        """
+        position, velocity, capsule_current = state
+        context = self._evaluate_stages(time, position)
+        force = self._electromagnetic_force(context, capsule_current, velocity)
+        
+        emf = self._induced_emf(context, velocity)
+        current_rate = ((emf - self.capsule.properties.resistance * capsule_current) /
+                        self.capsule.inductance)
+        
+        return np.array([velocity, force / self.capsule.mass, current_rate])
+    
+    def _adaptive_steps(self, max_time: float) -> Iterator[None]:
         """
-        Calculate gradient of mutual inductance for motional EMF.
+        Integrate to max_time or tube exit with adaptive Dormand-Prince steps.
+        
+        Steps shrink automatically during coil discharge and grow while
+        coasting. Stage triggers and the tube exit are integrator events: a
+        step that crosses the next trigger point or the tube end is cut back
+        to the crossing time, located on the step's Hermite interpolant, so
+        the stage fires exactly there and the run ends at tube_length.
+        Every accepted step is recorded at its end time; yields once per
+        recorded step.
         
         Args:
-            stage: Acceleration stage
-            distance: Distance between stage and capsule
+            max_time: Maximum simulation time (s)
+        """
+        solver = DormandPrince45(rtol=self.rtol, atol=self.atol)
+        min_step = 1e-12
+        
+        state = np.array([self.capsule.position, self.capsule.velocity, self.capsule.current])
+        rate = None
+        h = self.dt
+        
+        while self.time < max_time and self.capsule.position < self.tube_length:
+            # A newly fired stage changes the right-hand side - drop the FSAL value
+            if self._check_stage_activations().size:
+                rate = None
+            if self._retire_stages().size:
+                rate = None
+            
+            if self._is_coasting():
+                yield from self._fast_forward(max_time)
+                break
             
+            h = min(h, max_time - self.time)
+            if self.max_step is not None:
+                h = min(h, self.max_step)
+            h = max(h, min_step)
+            
+            if rate is None:
+                rate = self._derivatives(self.time, state)
+            trigger = self.bank.next_trigger_position
+            event = min(trigger, self.tube_length)
+            to_event = False
+            while True:
+                new_state, new_rate, error_norm = solver.step(self._derivatives, self.time,
+                                                              state, h, rate)
+                if error_norm > 1 and h > min_step:
+                    h = max(solver.next_step_size(h, error_norm), min_step)
+                    to_event = False
+                    continue
+                if to_event or not (state[1] >= 0 and new_state[0] >= event):
+                    break
+                
+                # Trigger or exit event inside the step - retry the step up
+                # to the crossing (error-checked like any other attempt)
+                event_time = hermite_crossing_time(state[0], rate[0], new_state[0], new_rate[0],
+                                                   h, event)
+                if event_time >= h:
+                    break
+                h = max(event_time, min_step)
+                to_event = True
+            crossed = state[1] >= 0 and (new_state[0] >= trigger or
+                                         (to_event and event == trigger))
+            
+            self.time += h
+            state, rate = new_state, new_rate
+            self.capsule.update_position(state[0])
+            self.capsule.update_velocity(state[1])
+            self.capsule.current = state[2]
+            
+            if crossed:
+                for index in self.bank.take_crossed(max(state[0], trigger)):
+                    self.stages[index].activate(self.time)
+                rate = None
+            self._trigger_position = self.capsule.position if state[1] >= 0 else None
+            
+            context = self._evaluate_stages()
+            force = self._calculate_total_force(context)
+            self.data.record(self.time, self.capsule, self.bank, force, context)
+            yield
+            
+            h = solver.next_step_size(h, error_norm)
+    
+    def _is_coasting(self) -> bool:
+        """
+        Check whether electromagnetic interaction has ended for good.
+        
+        True once no idle stage can fire before the capsule leaves the tube
+        and every active stage's discharge envelope has fallen below
+        SIGNIFICANT_STAGE_CURRENT for the rest of the run. Both answers
+        are cached until the active set (or the direction of travel)
+        changes, so the per-step cost is a couple of comparisons.
+        
         Returns:
-            dM/dx in H/m
+            True if the remaining motion can be fast-forwarded
         """
-        dx = 0.001  # 1mm numerical differentiation step
+        if not self.fast_forward or self.time < self._coast_check_time:
+            return False
         
-        # Ensure distances are always positive
-        dist_plus = max(0.001, distance + dx/2)  # Minimum 1mm distance
-        dist_minus = max(0.001, distance - dx/2)  # Minimum 1mm distance
+        quiet_time = self.bank.quiet_time(self.SIGNIFICANT_STAGE_CURRENT)
+        if self.time < quiet_time:
+            self._coast_check_time = quiet_time
+            return False
         
-        m_plus = self.physics.calculate_mutual_inductance(
-            stage, self.capsule, dist_plus
+        if self._check_stage_activations().size:
+            return False
+        
+        forward = self.capsule.velocity > 0
+        key = (self.bank.active_count, forward)
+        if key == self._coast_blocked:
+            return False
+        
+        idle = ~self.bank.active
+        if forward:
+            # Idle stages ahead will fire when their trigger point is reached
+            triggers = self.bank.trigger_positions
+            idle &= (triggers > self.capsule.position) & (triggers < self.tube_length)
+        if idle.any():
+            self._coast_blocked = key
+            return False
+        return True
+    
+    def _fast_forward(self, max_time: float) -> Iterator[None]:
+        """
+        Integrate the coast phase in closed form to tube exit or max_time.
+        
+        Without significant stage currents the force model applies neither
+        electromagnetic force nor its per-stage drag term, so the drag
+        coefficient is zero and the capsule moves uniformly; the closed form
+        in PhysicsEngine.calculate_coast handles any linear drag. The
+        capsule current decays freely with its L/R time constant. Yields
+        once per recorded sample.
+        
+        Args:
+            max_time: Maximum simulation time (s)
+        """
+        mass = self.capsule.mass
+        drag_coefficient = 0.0  # Drag is applied per interacting stage only
+        start_time = self.time
+        position, velocity = self.capsule.position, self.capsule.velocity
+        start_current = self.capsule.current
+        
+        exit_time = self.physics.calculate_coast_time(position, velocity, mass,
+                                                      drag_coefficient, self.tube_length)
+        end_time = min(max_time, start_time + exit_time)
+        
+        times = np.linspace(start_time, end_time, self.coast_samples + 2)[1:]
+        positions, velocities = self.physics.calculate_coast(position, velocity, mass,
+                                                             drag_coefficient, times - start_time)
+        if end_time < max_time:
+            positions[-1] = self.tube_length  # Exact exit despite rounding
+        decay_rate = self.capsule.properties.resistance / self.capsule.inductance
+        currents = start_current * np.exp(-decay_rate * (times - start_time))
+        
+        for time, position, velocity, current in zip(times, positions, velocities, currents):
+            self.time = float(time)
+            self.capsule.update_position(float(position))
+            self.capsule.update_velocity(float(velocity))
+            self.capsule.current = float(current)
+            self.data.record(self.time, self.capsule, self.bank, 0.0)
+            yield
+    
+    @staticmethod
+    def parse_time_step(value: Union[float, str]) -> Union[float, str]:
+        """
+        Validate a time step given as seconds or 'auto'.
+        
+        Also serves as argparse type for the --time-step options.
+        
+        Args:
+            value: Step in seconds (number or numeric string) or 'auto'
+            
+        Returns:
+            Positive float, or 'auto'
+            
+        Raises:
+            ValueError: If the value is neither 'auto' nor a positive number
+        """
+        if isinstance(value, str) and value.strip().lower() == 'auto':
+            return 'auto'
+        dt = float(value)
+        if not dt > 0:
+            raise ValueError(f"Time step must be positive or 'auto', got {value!r}")
+        return dt
+    
+    def select_time_step(self) -> Tuple[float, str]:
+        """
+        Choose a time step that resolves the fastest physical time scale.
+        
+        The step is the shortest of:
+        - each stage's discharge time scale, 1/ω₀ = 1/√(α² + ω_d²) when
+          underdamped, 1/(α + √(α² - ω₀²)) (fast exponential) otherwise,
+          over AUTO_DT_RESOLUTION
+        - the capsule circuit time constant L/R, over AUTO_DT_RESOLUTION
+        - the capsule's transit time through the shortest coil, at the
+          initial speed plus the speed all stored stage energy could add,
+          over AUTO_DT_TRANSIT_RESOLUTION
+        
+        Returns:
+            Tuple of (time step in s, description of the limiting scale)
+        """
+        scales = []
+        
+        bank = self.bank
+        if len(bank):
+            # Underdamped: frequencies = ω_d, overdamped: √(α² - ω₀²)
+            rates = np.where(bank.underdamped,
+                             np.hypot(bank.alphas, bank.frequencies),
+                             bank.alphas + bank.frequencies)
+            fastest = int(np.argmax(rates))
+            if rates[fastest] > 0:
+                stage = self.stages[fastest]
+                kind = 'ringing' if bank.underdamped[fastest] else 'decay'
+                scales.append((1 / rates[fastest] / self.AUTO_DT_RESOLUTION,
+                               f"stage {stage.stage_id} discharge {kind} "
+                               f"(alpha={bank.alphas[fastest]:.3g}/s, "
+                               f"omega={bank.frequencies[fastest]:.3g} rad/s)"))
+                               
+        resistance = self.capsule.properties.resistance
+        if resistance > 0 and self.capsule.inductance > 0:
+            scales.append((self.capsule.inductance / resistance / self.AUTO_DT_RESOLUTION,
+                           "capsule L/R time constant"))
+            
+        if len(bank):
+            stored_energy = float(np.sum(0.5 * bank.capacitances * bank.voltages**2))
+            speed = abs(self.capsule.velocity) + np.sqrt(2 * stored_energy / self.capsule.mass)
+            length = float(np.min(bank.lengths))
+            if speed > 0 and length > 0:
+                scales.append((length / speed / self.AUTO_DT_TRANSIT_RESOLUTION,
+                               f"transit of a {length * 1000:.3g}mm coil at up to {speed:.3g} m/s"))
+                               
+        if not scales:
+            return 1e-5, "no physical time scale (default)"
+            
+        dt, reason = min(scales, key=lambda item: item[0])
+        return float(dt), reason
+    
+    def _compute_interaction_radius(self) -> float:
+        """
+        Capsule-stage interaction radius from the physics engine's far-field cutoff.
+        
+        Uses the largest stage radius and length, so the cutoff is
+        conservative for every stage in a mixed tube.
+        
+        Returns:
+            Radius in meters (inf if the engine has no cutoff)
+        """
+        if not len(self.bank):
+            return np.inf
+        props = self.capsule.properties
+        return self.physics.calculate_interaction_radius(
+            float(self.bank.radii.max()), float(self.bank.lengths.max()),
+            props.diameter / 2, props.length
         )
-        m_minus = self.physics.calculate_mutual_inductance(
-            stage, self.capsule, dist_minus
+    
+    def _stage_mutual_inductance(self, indices: np.ndarray, distance: np.ndarray):
+        """
+        Mutual inductance and dM/dx between the capsule and a set of stages.
+        
+        Args:
+            indices: Stage indices in the bank
+            distance: Stage-capsule distances (m), one per index
+            
+        Returns:
+            Tuple of (mutual inductance in H, dM/dx in H/m) arrays
+        """
+        props = self.capsule.properties
+        return self.physics.calculate_mutual_inductance_and_gradient_batch(
+            self.bank.radii[indices], self.bank.turns[indices], self.bank.lengths[indices],
+            props.diameter / 2, props.turns, props.length, distance
         )
+    
+    def get_stage_current_traces(self, times: Optional[np.ndarray] = None):
+        """
+        Rebuild every stage's current and dI/dt over a time axis.
+        
+        Uses one vectorized evaluation for the whole bank instead of one
+        Python call per stage per sample.
         
-        return (m_plus - m_minus) / dx
+        Args:
+            times: Sample times (s); defaults to the recorded history times
+            
+        Returns:
+            Tuple of (current, current_derivative) arrays of shape
+            (n_stages, n_times)
+        """
+        if times is None:
+            times = self.data.get_time_array()
+        return self.bank.discharge_waveforms(times)
     
     def reset(self) -> None:
         """
@@ -332,10 +1221,11 @@ class SimulationService:
         self.capsule.velocity = self._initial_capsule_state['velocity']
         self.capsule.current = self._initial_capsule_state['current']
         
-        # Reset all stages
-        for stage in self.stages:
-            stage.is_active = False
-            stage.activation_time = None
+        # Reset all stages (keeps the stage bank in sync)
+        self.bank.reset()
+        self._trigger_position = None
+        self._coast_check_time = -np.inf
+        self._coast_blocked = None
         
         # Reset data collection
         self.data.reset()
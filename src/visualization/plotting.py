@@ -163,7 +163,69 @@ class PlottingService:
         ax2.set_ylabel('Force (N)')
         ax2.set_title('Electromagnetic Force Profile')
         ax2.grid(True, alpha=0.3)
-        ax2.legend()
+        ax2.legend(loc='upper left')
+        
+        # Stage currents, each rebuilt over the whole time axis in one call
+        fired = [stage for stage in stages if stage.is_active]
+        if fired:
+            ax_current = ax2.twinx()
+            time_seconds = result.get_time_array()
+            for stage in fired:
+                currents, _ = stage.get_current_waveform(time_seconds)
+                ax_current.plot(times, currents, '--', linewidth=1, alpha=0.7,
+                                label=f'S{stage.stage_id + 1} current')
+            ax_current.set_ylabel('Stage Current (A)')
+            ax_current.legend(loc='upper right', fontsize=8)
+        
+        plt.tight_layout()
+        
+        if save_path:
+            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        if show:
+            plt.show()
+        
+        return fig
+    
+    def plot_mutual_inductance_profile(self, stage, capsule, max_distance=None,
+                                       physics=None, save_path=None, show=True):
+        """
+        Plot stage-capsule mutual inductance M(x) and dM/dx.
+        
+        The whole curve is evaluated with one batched physics call.
+        
+        Args:
+            stage: Acceleration stage (or any coil)
+            capsule: Capsule (or any coil)
+            max_distance: Largest separation to plot in meters
+                (default: four times the longer coil)
+            physics: PhysicsEngine to use (default: a new engine)
+            save_path: Optional path to save plot
+            show: Whether to display plot
+        """
+        from src.physics.physics_engine import PhysicsEngine
+        
+        physics = physics or PhysicsEngine()
+        if max_distance is None:
+            max_distance = 4 * max(stage.properties.length, capsule.properties.length)
+        distances = np.linspace(1e-3, max_distance, 2000)
+        
+        mutual_inductance, gradient = physics.calculate_mutual_inductance_and_gradient_batch(
+            stage.properties.diameter / 2, stage.properties.turns, stage.properties.length,
+            capsule.properties.diameter / 2, capsule.properties.turns, capsule.properties.length,
+            distances
+        )
+        
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
+        
+        ax1.plot(distances * 1000, mutual_inductance * 1e6, 'b-', linewidth=2)
+        ax1.set_ylabel('M (µH)')
+        ax1.set_title('Stage-Capsule Mutual Inductance')
+        ax1.grid(True, alpha=0.3)
+        
+        ax2.plot(distances * 1000, gradient * 1e6, 'r-', linewidth=2)
+        ax2.set_xlabel('Distance (mm)')
+        ax2.set_ylabel('dM/dx (µH/m)')
+        ax2.grid(True, alpha=0.3)
         
         plt.tight_layout()
         
@@ -346,4 +346,13 @@ class TestMatlabBridgePerformance:
         for i in range(1, len(results)):
             assert abs(results[i]['final_velocity'] - results[0]['final_velocity']) < 1e-12
             assert abs(results[i]['final_position'] - results[0]['final_position']) < 1e-12
-            assert results[i]['data_points'] == results[0]['data_points']
\ No newline at end of file
+            assert results[i]['data_points'] == results[0]['data_points']
+    
+    def test_matlab_runner_auto_time_step(self):
+        """Test 10: Automatic time step is chosen and reported"""
+        result = run_simulation_from_params(max_time=0.001, time_step='auto')
+        
+        parameters = result['parameters']
+        assert 0 < parameters['time_step'] < 1e-4
+        assert 'stage' in parameters['time_step_reason']
+        assert result['time'][1] - result['time'][0] == pytest.approx(parameters['time_step'])
@@ -11,7 +11,7 @@ import numpy as np
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from core.acceleration_stage import AccelerationStage
+from core.acceleration_stage import AccelerationStage, rlc_discharge
 
 
 class TestAccelerationStage:
@@ -146,4 +146,110 @@ class TestAccelerationStage:
         str_repr = str(stage)
         assert "AccelerationStage" in str_repr
         assert "0" in str_repr  # stage_id
-        assert "400" in str_repr  # voltage
\ No newline at end of file
+        assert "400" in str_repr  # voltage
+    
+    def test_acceleration_stage_current_waveform_matches_scalar(self):
+        """Test 12: Vectorized waveform equals per-time get_current/get_current_derivative"""
+        stage = AccelerationStage(0, 0.083, 100, 0.09, 0.05, 1000e-6, 400.0)
+        times = np.linspace(0.0, 0.02, 201)
+        
+        # Before activation the whole trace is zero
+        currents, derivatives = stage.get_current_waveform(times)
+        assert not currents.any() and not derivatives.any()
+        
+        stage.activate(0.002)
+        currents, derivatives = stage.get_current_waveform(times)
+        
+        expected_currents = [stage.get_current(t) for t in times]
+        expected_derivatives = [stage.get_current_derivative(t) for t in times]
+        np.testing.assert_allclose(currents, expected_currents, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(derivatives, expected_derivatives, rtol=1e-9, atol=1e-6)
+    
+    def test_rlc_discharge_regime_masks(self):
+        """Test 13: Mixed damping regimes are evaluated in one call"""
+        # Same coil, small and very large capacitor: underdamped and overdamped
+        underdamped = AccelerationStage(0, 0.083, 100, 0.09, 0.05, 1000e-6, 400.0)
+        overdamped = AccelerationStage(1, 0.083, 100, 0.09, 0.05, 1.0, 400.0)
+        underdamped.activate(0.0)
+        overdamped.activate(0.0)
+        
+        elapsed = np.array([0.001, 0.003])
+        currents, derivatives = rlc_discharge(
+            elapsed, 400.0, underdamped.inductance,
+            np.array([1000e-6, 1.0])[:, np.newaxis],
+            underdamped.properties.resistance
+        )
+        
+        assert currents.shape == (2, 2)
+        assert currents[0, 0] == pytest.approx(underdamped.get_current(0.001))
+        assert currents[1, 1] == pytest.approx(overdamped.get_current(0.003))
+        assert derivatives[1, 0] == pytest.approx(overdamped.get_current_derivative(0.001))
+    
+    def test_acceleration_stage_circuit_coefficients_cached(self):
+        """Test 14: Circuit coefficients are compiled once and reused"""
+        stage = AccelerationStage(0, 0.083, 100, 0.09, 0.05, 1000e-6, 400.0)
+        circuit = stage.circuit
+        
+        omega_0 = 1 / np.sqrt(stage.inductance * stage.capacitance)
+        alpha = stage.properties.resistance / (2 * stage.inductance)
+        assert circuit.regime == 'underdamped'
+        assert circuit.alpha == pytest.approx(alpha)
+        assert circuit.frequency == pytest.approx(np.sqrt(omega_0**2 - alpha**2))
+        assert circuit.amplitude == pytest.approx(400.0 / (circuit.frequency * stage.inductance))
+        
+        stage.activate(0.0)
+        stage.get_current(0.001)
+        stage.get_current_derivative(0.001)
+        assert stage.circuit is circuit
+    
+    def test_acceleration_stage_circuit_invalidation(self):
+        """Test 15: Changing voltage, capacitance or properties rebuilds coefficients"""
+        stage = AccelerationStage(0, 0.083, 100, 0.09, 0.05, 1000e-6, 400.0)
+        stage.activate(0.0)
+        current_400v = stage.get_current(0.001)
+        
+        stage.voltage = 800.0
+        assert stage.get_current(0.001) == pytest.approx(2 * current_400v)
+        
+        circuit = stage.circuit
+        stage.capacitance = 2000e-6
+        assert stage.circuit is not circuit
+        assert stage.circuit.frequency < circuit.frequency
+        
+        inductance = stage.inductance
+        stage.properties = AccelerationStage(0, 0.083, 200, 0.09, 0.05, 1000e-6, 400.0).properties
+        assert stage.inductance == pytest.approx(4 * inductance)
+        assert stage.circuit.scale == pytest.approx(800.0 / stage.inductance)
+    
+    def test_acceleration_stage_fused_current_state(self):
+        """Test 16: get_current_state returns (get_current, get_current_derivative)"""
+        stage = AccelerationStage(0, 0.083, 100, 0.09, 0.05, 1000e-6, 400.0)
+        assert stage.get_current_state(0.001) == (0.0, 0.0)
+        
+        stage.activate(0.001)
+        
+        # At the firing instant: no current yet, dI/dt = V/L
+        current, derivative = stage.get_current_state(0.001)
+        assert current == 0.0
+        assert derivative == pytest.approx(400.0 / stage.inductance)
+        
+        for time in [0.0005, 0.0015, 0.003, 0.006, 0.012]:
+            current, derivative = stage.get_current_state(time)
+            assert current == pytest.approx(stage.get_current(time))
+            assert derivative == pytest.approx(stage.get_current_derivative(time))
+    
+    @pytest.mark.parametrize("capacitance", [1000e-6, 1.0])
+    def test_acceleration_stage_quiet_time_bounds_current(self, capacitance):
+        """Test 17: Current never exceeds the threshold after quiet_time"""
+        stage = AccelerationStage(0, 0.083, 100, 0.09, 0.05, capacitance, 400.0)
+        stage.activate(0.0)
+        
+        quiet = stage.circuit.quiet_time(1e-4)
+        assert 0 < quiet < np.inf
+        
+        times = np.linspace(quiet, quiet + 0.2, 20001)
+        current, _ = stage.get_current_waveform(times)
+        assert current.max() <= 1e-4 * (1 + 1e-9)
+        
+        # A threshold above the peak is never exceeded
+        assert stage.circuit.quiet_time(1e6) == 0.0
@@ -0,0 +1,71 @@
+"""
+Unit tests for CoupledSimulationService.
+
+Tests the coupled circuit-mechanics ODE engine against the closed-form
+stepping engine and checks stage firing and tube exit events.
+"""
+
+import pytest
+import numpy as np
+
+from src.core.capsule import Capsule
+from src.core.acceleration_stage import AccelerationStage
+from src.services.simulation_service import SimulationService, SimulationResult
+from src.services.coupled_simulation_service import CoupledSimulationService
+
+
+def build(velocity=0.0, mass=1.0, count=3):
+    """Fresh capsule and stages for one run."""
+    capsule = Capsule(mass=mass, diameter=0.083, length=0.02)
+    capsule.update_position(0.02)
+    capsule.update_velocity(velocity)
+    stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+              for i in range(count)]
+    return capsule, stages
+
+
+class TestCoupledSimulationService:
+    """Test suite for CoupledSimulationService."""
+    
+    def test_matches_closed_form_engine_for_weak_coupling(self):
+        """Test 1: Within the first half-cycle the coupled run follows the closed-form engine."""
+        capsule, stages = build()
+        reference = SimulationService(capsule, stages, tube_length=0.5, dt=1e-6).run(max_time=0.003)
+        
+        capsule, stages = build()
+        service = CoupledSimulationService(capsule, stages, tube_length=0.5)
+        result = service.run(max_time=0.003)
+        
+        assert isinstance(result, SimulationResult)
+        assert result.final_velocity == pytest.approx(reference.final_velocity, rel=1e-2)
+        assert result.total_time == pytest.approx(0.003)
+        
+        # A stiff solver needs far fewer right-hand side evaluations than fixed steps
+        assert 0 < service.evaluations < len(reference.history) / 10
+    
+    def test_stages_fire_at_trigger_and_exit_is_exact(self):
+        """Test 2: Stages fire at their trigger points and the run ends exactly at the exit."""
+        capsule, stages = build(velocity=5.0, mass=0.05, count=2)
+        service = CoupledSimulationService(capsule, stages, tube_length=0.3)
+        result = service.run(max_time=1.0)
+        
+        assert stages[0].activation_time == 0.0  # Capsule starts inside the first window
+        assert stages[1].activation_time == pytest.approx((0.08 - 0.02) / 5.0, rel=1e-2)
+        assert result.final_position == 0.3
+        assert np.all(np.diff(result.get_time_array()) > 0)
+        assert result.history[-1]['active_stages'] == 2
+    
+    def test_reset_and_configuration(self):
+        """Test 3: Reset restores the initial state; unknown solvers are rejected."""
+        capsule, stages = build()
+        service = CoupledSimulationService(capsule, stages, tube_length=0.5, method='Radau')
+        first = service.run(max_time=0.002)
+        service.reset()
+        assert capsule.position == 0.02 and capsule.current == 0.0
+        assert not any(stage.is_active for stage in stages)
+        
+        second = service.run(max_time=0.002)
+        assert second.final_velocity == pytest.approx(first.final_velocity)
+        
+        with pytest.raises(ValueError):
+            CoupledSimulationService(capsule, stages, tube_length=0.5, method='Euler')
@@ -0,0 +1,271 @@
+"""
+Unit tests for DataService.
+
+Tests the columnar history storage, its list-of-dicts view, the
+zero-copy array accessors, the recording policies, streaming the
+history to disk and the running summary statistics.
+"""
+
+import pytest
+import numpy as np
+
+from src.core.capsule import Capsule
+from src.core.acceleration_stage import AccelerationStage
+from src.services.data_service import DataService, HistoryBuffer, HistoryView
+from src.services.disk_history import DiskHistoryBuffer
+from src.services.recording import (RecordingPolicy, EveryKSteps, FixedInterval, Adaptive,
+                                    parse_recording_policy)
+from src.services.simulation_service import SimulationService, SimulationResult
+
+
+def record_steps(data, count):
+    """Record count steps of a capsule moving at 2 m/s."""
+    capsule = Capsule(mass=2.0, diameter=0.083, length=0.02)
+    for step in range(count):
+        capsule.update_position(0.001 * step)
+        capsule.update_velocity(2.0)
+        data.record(1e-5 * step, capsule, [], force=float(step))
+
+
+class TestDataService:
+    """Test suite for DataService."""
+    
+    def test_buffer_grows_geometrically(self):
+        """Test 1: Appending past the capacity doubles it and keeps every record."""
+        buffer = HistoryBuffer(capacity=4)
+        for step in range(9):
+            buffer.append([float(step)] * len(HistoryBuffer.FIELDS))
+            
+        assert len(buffer) == 9
+        assert buffer.capacity == 16
+        np.testing.assert_array_equal(buffer.column('force'), np.arange(9.0))
+    
+    def test_history_view_behaves_like_record_list(self):
+        """Test 2: history yields dictionaries of Python numbers and supports len and indexing."""
+        data = DataService()
+        record_steps(data, 5)
+        history = data.history
+        
+        assert isinstance(history, HistoryView)
+        assert len(history) == 5
+        assert history[-1] == history[4]
+        assert set(history[0]) == set(HistoryBuffer.FIELDS)
+        assert isinstance(history[2]['time'], float)
+        assert isinstance(history[2]['active_stages'], int)
+        assert history[3]['kinetic_energy'] == pytest.approx(4.0)
+        assert [record['force'] for record in history[1:3]] == [1.0, 2.0]
+        with pytest.raises(IndexError):
+            history[5]
+    
+    def test_results_share_buffer_and_survive_reset(self):
+        """Test 3: Result arrays are views into the buffer and stay valid after reset."""
+        data = DataService()
+        record_steps(data, 2000)
+        result = data.get_results()
+        forces = result.get_force_array()
+        
+        assert np.shares_memory(forces, data.buffer._data)
+        assert not forces.flags.writeable
+        assert result.max_force == 1999.0
+        
+        record_steps(data, 10)
+        data.reset()
+        assert len(data.history) == 0
+        assert len(result.history) == 2000
+        assert result.get_time_array()[-1] == pytest.approx(1999e-5)
+
+
+def six_stage_gun():
+    """Capsule entering six stages at 10 m/s."""
+    capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+    capsule.update_position(0.02)
+    capsule.update_velocity(10.0)
+    stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+              for i in range(6)]
+    return capsule, stages
+
+
+def run_recorded(recording, max_time=0.02, history_directory=None):
+    """Six-stage gun run at 10 m/s entry speed with a recording policy."""
+    capsule, stages = six_stage_gun()
+    return SimulationService(capsule, stages, tube_length=0.5, recording=recording,
+                             history_directory=history_directory).run(max_time)
+
+
+class TestRecordingPolicies:
+    """Test suite for DataService recording policies."""
+    
+    def test_decimation_keeps_events_peak_and_final_state(self):
+        """Test 4: Every k-th step recording keeps firings, the force maximum and the end."""
+        full = run_recorded(None)
+        sparse = run_recorded(EveryKSteps(100))
+        
+        assert len(sparse.history) < len(full.history) / 20
+        assert sparse.max_force == full.max_force
+        assert sparse.final_velocity == full.final_velocity
+        assert sparse.history[-1] == full.history[-1]
+        
+        # Steps in which a stage fired
+        stages = full.history.column('active_stages')
+        firings = full.get_time_array()[1:][np.diff(stages) > 0]
+        assert firings.size > 0
+        assert np.isin(firings, sparse.get_time_array()).all()
+        assert np.all(np.diff(sparse.get_time_array()) > 0)
+    
+    def test_interval_and_adaptive_policies(self):
+        """Test 5: Interval recording samples the time grid, adaptive recording tracks changes."""
+        gridded = run_recorded(FixedInterval(1e-3))
+        times = gridded.get_time_array()
+        grid = np.arange(0, 0.02, 1e-3)
+        assert np.isin(np.searchsorted(times, grid - 1e-12), np.arange(times.size)).all()
+        assert len(gridded.history) < 60
+        
+        full = run_recorded(None)
+        adaptive = run_recorded(Adaptive(rtol=0.05, atol=(1e-2, 1e-4, 1e-2)))
+        assert len(adaptive.history) < len(full.history)
+        assert adaptive.max_force == full.max_force
+        sampled = np.interp(full.get_time_array(), adaptive.get_time_array(),
+                            adaptive.get_velocity_array())
+        assert np.abs(sampled - full.get_velocity_array()).max() < 2e-4
+    
+    def test_policy_specifications(self):
+        """Test 6: Command-line specifications build policies and reject bad input."""
+        assert isinstance(parse_recording_policy('all'), RecordingPolicy)
+        assert parse_recording_policy('every:50').k == 50
+        assert parse_recording_policy('interval:1e-4').interval == 1e-4
+        assert parse_recording_policy('adaptive').rtol == 0.01
+        for spec in ('every:0', 'interval:-1', 'sometimes', 'every:x'):
+            with pytest.raises(ValueError):
+                parse_recording_policy(spec)
+
+
+class TestDiskHistoryBuffer:
+    """Test suite for streaming the history to disk."""
+    
+    def test_streamed_run_matches_in_memory_run(self, tmp_path):
+        """Test 7: A run streamed to disk reads back through memory maps unchanged."""
+        memory = run_recorded(None)
+        disk = run_recorded(None, history_directory=str(tmp_path))
+        
+        forces = disk.get_force_array()
+        assert isinstance(forces, np.memmap)
+        np.testing.assert_array_equal(forces, memory.get_force_array())
+        np.testing.assert_array_equal(disk.get_time_array(), memory.get_time_array())
+        assert disk.history[-1] == memory.history[-1]
+        assert disk.max_force == memory.max_force
+        
+        reopened = HistoryView(DiskHistoryBuffer.open(str(tmp_path)))
+        assert len(reopened) == len(memory.history)
+        np.testing.assert_array_equal(reopened.column('velocity'), memory.get_velocity_array())
+    
+    def test_memory_bounded_by_chunk(self, tmp_path):
+        """Test 8: Only one chunk stays in memory and earlier histories survive a reset."""
+        data = DataService(buffer=DiskHistoryBuffer(str(tmp_path), chunk_size=64))
+        record_steps(data, 1000)
+        assert data.buffer._data.shape == (len(HistoryBuffer.FIELDS), 64)
+        assert (tmp_path / 'run-0' / 'force.f64').stat().st_size == 8 * 960
+        
+        result = data.get_results()
+        assert (tmp_path / 'run-0' / 'force.f64').stat().st_size == 8 * 1000
+        
+        # A reset closes the old run, deletes it and records into a new one
+        first = data.buffer
+        data.reset()
+        assert first._files == [] and first.readonly
+        record_steps(data, 10)
+        data.get_results()
+        assert DiskHistoryBuffer.runs(str(tmp_path)) == [1]
+        assert result.max_force == 999.0
+        np.testing.assert_array_equal(result.get_force_array(), np.arange(1000.0))
+        assert len(HistoryView(DiskHistoryBuffer.open(str(tmp_path)))) == 10
+        with pytest.raises(ValueError):
+            DiskHistoryBuffer.open(str(tmp_path)).append([0.0] * len(HistoryBuffer.FIELDS))
+    
+    def test_undeletable_run_is_kept_and_logged(self, tmp_path, monkeypatch, caplog):
+        """Test 11: A run that cannot be deleted (mapped, on Windows) is logged and kept."""
+        data = DataService(buffer=DiskHistoryBuffer(str(tmp_path), chunk_size=64))
+        record_steps(data, 100)
+        result = data.get_results()
+        
+        def refuse(path):
+            raise PermissionError(path)
+            
+        monkeypatch.setattr('src.services.disk_history.shutil.rmtree', refuse)
+        data.reset()
+        record_steps(data, 10)
+        assert DiskHistoryBuffer.runs(str(tmp_path)) == [0, 1]
+        assert 'run-0' in caplog.text
+        assert len(data.get_results().history) == 10
+        np.testing.assert_array_equal(result.get_force_array(), np.arange(100.0))
+        assert len(HistoryView(DiskHistoryBuffer.open(str(tmp_path), run=0))) == 100
+    
+    def test_concurrent_buffers_share_a_directory(self, tmp_path):
+        """Test 12: Services recording into one directory at the same time keep separate runs."""
+        first = SimulationService(*six_stage_gun(), tube_length=0.5,
+                                  history_directory=str(tmp_path))
+        second = SimulationService(*six_stage_gun(), tube_length=0.5,
+                                   history_directory=str(tmp_path))
+        memory = SimulationService(*six_stage_gun(), tube_length=0.5).run(0.001)
+        
+        results = [first.run(0.001), second.run(0.001), first.run(0.002)]
+        for result, max_time in zip(results, (0.001, 0.001, 0.002)):
+            assert result.get_time_array()[-1] == pytest.approx(max_time - 1e-5)
+        np.testing.assert_array_equal(results[1].get_force_array(), memory.get_force_array())
+        
+        runs = DiskHistoryBuffer.runs(str(tmp_path))
+        assert len(runs) == 2
+        lengths = {len(HistoryView(DiskHistoryBuffer.open(str(tmp_path), run))) for run in runs}
+        assert lengths == {len(memory.history), len(results[2].history)}
+
+
+class TestRunStatistics:
+    """Test suite for the running aggregates kept by DataService."""
+    
+    def test_aggregates_match_history(self):
+        """Test 9: Running aggregates equal a scan of the full history, also when decimated."""
+        full = run_recorded(None, max_time=0.05)
+        sparse = run_recorded(EveryKSteps(1000), max_time=0.05)
+        forces = full.get_force_array()
+        acceleration = full.history.column('acceleration')
+        current = full.history.column('capsule_current')
+        
+        for result in (full, sparse):
+            assert result.max_force == forces.max()
+            assert result.min_force == forces.min()
+            assert result.max_force_time == full.get_time_array()[forces.argmax()]
+            assert result.peak_acceleration == np.abs(acceleration).max()
+            assert result.peak_capsule_current == np.abs(current).max()
+            
+        firing = full.stage_firing_times
+        assert firing.shape == (6,)
+        assert np.all(np.diff(firing[:3]) > 0)
+        np.testing.assert_array_equal(sparse.stage_firing_times, firing)
+        
+        exit_index = np.argmax(full.get_position_array() >= 0.5)
+        assert full.exit_time == full.get_time_array()[exit_index]
+        assert sparse.exit_time == full.exit_time
+        
+        ledger = full.energy_ledger
+        assert ledger['kinetic_energy_gain'] == pytest.approx(
+            full.final_kinetic_energy - full.history[0]['kinetic_energy'])
+        assert ledger['capsule_resistive_loss'] > 0
+        assert ledger['remainder'] == pytest.approx(ledger['initial_energy']
+                                                    - ledger['kinetic_energy_gain']
+                                                    - ledger['capsule_resistive_loss'])
+    
+    def test_statistics_from_record_list(self):
+        """Test 10: Results built from plain record lists derive their aggregates once."""
+        history = [
+            {'time': 0.0, 'force': 2.0, 'kinetic_energy': 0.0},
+            {'time': 0.1, 'force': -3.0, 'kinetic_energy': 0.5},
+            {'time': 0.2, 'force': 5.0, 'kinetic_energy': 1.0},
+        ]
+        result = SimulationResult(final_velocity=1.0, final_position=0.1, total_time=0.2,
+                                  initial_energy=10.0, history=history)
+                                  
+        assert result.max_force == 5.0
+        assert result.min_force == -3.0
+        assert result.max_force_time == 0.2
+        assert result.exit_time is None
+        assert result.statistics is result.statistics
+        assert result.energy_ledger['kinetic_energy_gain'] == 1.0
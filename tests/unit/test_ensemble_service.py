@@ -0,0 +1,92 @@
+"""
+Unit tests for EnsembleSimulator.
+
+Tests the vectorized sweep against one SimulationService run per variant,
+masking of finished variants and parameter validation.
+"""
+
+import pytest
+import numpy as np
+
+from src.core.capsule import Capsule
+from src.core.acceleration_stage import (AccelerationStage, discharge_coefficients,
+                                         evaluate_discharge)
+from src.services.simulation_service import SimulationService
+from src.services.ensemble_service import (EnsembleSimulator, EnsembleResult,
+                                           discharge_transition)
+
+
+def run_single(voltage, capacitance, turns, mass, spacing, max_time):
+    """Reference SimulationService run of one variant."""
+    capsule = Capsule(mass=mass, diameter=0.083, length=0.02)
+    capsule.update_position(0.02)
+    stages = [AccelerationStage(i, 0.05 + i * spacing, turns, 0.09, 0.05, capacitance, voltage)
+              for i in range(6)]
+    return SimulationService(capsule, stages, tube_length=0.5, dt=1e-5).run(max_time=max_time)
+
+
+class TestEnsembleSimulator:
+    """Test suite for EnsembleSimulator."""
+    
+    def test_matches_simulation_service_per_variant(self):
+        """Test 1: Every variant reproduces its own SimulationService run."""
+        variants = [(400.0, 1000e-6, 100, 1.0, 0.08),
+                    (1500.0, 500e-6, 60, 0.2, 0.10),
+                    (800.0, 2000e-6, 150, 0.5, 0.07)]
+        voltage, capacitance, turns, mass, spacing = (np.array(column) for column in zip(*variants))
+        
+        ensemble = EnsembleSimulator(stage_voltage=voltage, stage_capacitance=capacitance,
+                                     stage_turns=turns, capsule_mass=mass, stage_spacing=spacing)
+        result = ensemble.run(max_time=0.02)
+        
+        assert isinstance(result, EnsembleResult)
+        assert len(result) == 3
+        for index, variant in enumerate(variants):
+            reference = run_single(*variant, max_time=0.02)
+            assert result.final_velocity[index] == pytest.approx(reference.final_velocity, rel=1e-9)
+            assert result.final_position[index] == pytest.approx(reference.final_position, rel=1e-9)
+            assert result.max_force[index] == pytest.approx(reference.max_force, rel=1e-9)
+            assert result.energy_efficiency[index] == pytest.approx(reference.energy_efficiency,
+                                                                    rel=1e-9)
+    
+    def test_finished_variants_are_masked_out(self):
+        """Test 2: Exited variants stop early and their history is NaN afterwards."""
+        ensemble = EnsembleSimulator(capsule_mass=np.array([1.0, 0.05]), initial_velocity=10.0)
+        result = ensemble.run(max_time=0.1, history=True)
+        
+        assert result.exited.all()
+        assert np.all(result.final_position >= 0.5)
+        assert result.total_time[0] < result.total_time[1]
+        
+        positions = result.history['position']
+        assert positions.shape == result.history['time'].shape == (positions.shape[0], 2)
+        finished = np.isnan(positions[:, 0])
+        assert finished.any() and finished[-1]
+        assert not np.isnan(positions[:, 1]).any()
+        assert result.best() == 0
+    
+    def test_invalid_parameters_rejected(self):
+        """Test 3: Non-positive swept parameters raise ValueError."""
+        with pytest.raises(ValueError):
+            EnsembleSimulator(stage_capacitance=np.array([1000e-6, -1.0]))
+        with pytest.raises(ValueError):
+            EnsembleSimulator(capsule_mass=0.0)
+    
+    def test_discharge_transition_matches_closed_form(self):
+        """Test 4: The one-step transition matrix reproduces the closed-form discharge."""
+        # Underdamped, critically damped and overdamped circuits
+        alpha, frequency, scale, underdamped, critical = discharge_coefficients(
+            np.array([400.0, 400.0, 400.0]), np.array([1e-3, 1e-3, 1e-3]),
+            np.array([1000e-6, 40e-3, 100e-3]), np.array([0.1, 2 * np.sqrt(1e-3 / 40e-3), 2.0]))
+        assert underdamped[0] and critical[1] and not (underdamped[2] or critical[2])
+        
+        dt = 1e-5
+        phi = discharge_transition(dt, alpha, frequency, underdamped, critical)
+        current, rate = np.zeros(3), scale.copy()
+        for _ in range(2000):
+            current, rate = phi[0] * current + phi[1] * rate, phi[2] * current + phi[3] * rate
+            
+        expected_current, expected_rate = evaluate_discharge(2000 * dt, alpha, frequency, scale,
+                                                             underdamped, critical)
+        assert np.maximum(current, 0.0) == pytest.approx(expected_current, rel=1e-9, abs=1e-9)
+        assert rate == pytest.approx(expected_rate, rel=1e-9)
@@ -0,0 +1,50 @@
+"""
+Test module for time integrators.
+
+Tests the embedded Runge-Kutta pair used for adaptive stepping.
+"""
+
+import pytest
+import numpy as np
+
+from src.physics.integrators import DormandPrince45
+
+
+class TestDormandPrince45:
+    """Test cases for DormandPrince45."""
+    
+    def test_step_is_fifth_order_accurate(self):
+        """Test 1: One step on y' = -y matches exp(-h) to fifth order."""
+        solver = DormandPrince45()
+        
+        def decay(t, y):
+            return -y
+            
+        errors = []
+        for h in (0.1, 0.05):
+            y_new, rate, _ = solver.step(decay, 0.0, np.array([1.0]), h)
+            errors.append(abs(y_new[0] - np.exp(-h)))
+            assert rate[0] == pytest.approx(-y_new[0])  # FSAL value at the new point
+        
+        # Local error scales as h^6
+        assert errors[0] / errors[1] == pytest.approx(64, rel=0.2)
+    
+    def test_error_control(self):
+        """Test 2: Error norm drives acceptance and step-size proposals."""
+        solver = DormandPrince45(rtol=1e-8, atol=1e-12)
+        
+        def oscillator(t, y):
+            return np.array([y[1], -100.0 * y[0]])
+            
+        y = np.array([1.0, 0.0])
+        
+        _, _, coarse = solver.step(oscillator, 0.0, y, 0.1)
+        _, _, fine = solver.step(oscillator, 0.0, y, 0.001)
+        assert coarse > 1 > fine
+        
+        assert solver.next_step_size(0.1, coarse) < 0.1
+        assert solver.next_step_size(0.001, fine) > 0.001
+        assert solver.next_step_size(0.001, 0.0) == pytest.approx(0.005)
+        
+        with pytest.raises(ValueError):
+            DormandPrince45(rtol=0.0)
@@ -192,4 +192,233 @@ class TestPhysicsEngine:
         
         # Test with negative distance (should handle gracefully)
         with pytest.raises(ValueError):
-            physics_engine.calculate_mutual_inductance(capsule, stage, -0.01)
\ No newline at end of file
+            physics_engine.calculate_mutual_inductance(capsule, stage, -0.01)
+    
+    @pytest.mark.parametrize("distance", [0.005, 0.02, 0.045, 0.06, 0.1, 0.3])
+    def test_mutual_inductance_analytic_gradient(self, physics_engine, capsule, stage, distance):
+        """Test 13: Analytic dM/dx matches central differences away from the branch switch"""
+        mutual_inductance, gradient = physics_engine.calculate_mutual_inductance_and_gradient(
+            capsule, stage, distance)
+        
+        h = 1e-6
+        above = physics_engine.calculate_mutual_inductance(capsule, stage, distance + h)
+        below = physics_engine.calculate_mutual_inductance(capsule, stage, distance - h)
+        numerical = (above - below) / (2 * h)
+        
+        assert mutual_inductance == pytest.approx(
+            physics_engine.calculate_mutual_inductance(capsule, stage, distance))
+        assert gradient == pytest.approx(numerical, rel=1e-4)
+        assert gradient < 0  # Coupling weakens with separation
+    
+    def test_mutual_inductance_gradient_errors_and_force(self, physics_engine, capsule, stage):
+        """Test 14: Gradient rejects negative distance and drives calculate_force"""
+        with pytest.raises(ValueError):
+            physics_engine.calculate_mutual_inductance_and_gradient(capsule, stage, -0.01)
+        
+        _, gradient = physics_engine.calculate_mutual_inductance_and_gradient(capsule, stage, 0.03)
+        force = physics_engine.calculate_force(capsule, stage, 0.03, 100.0, 50.0)
+        assert force == pytest.approx(-100.0 * 50.0 * gradient)
+    
+    def test_mutual_inductance_batch_matches_scalar(self, physics_engine, capsule, stage):
+        """Test 15: Batch M over a distance array matches the scalar branches"""
+        distances = np.array([0.0, 0.01, 0.049, 0.05, 0.08, 0.5])
+        
+        batch = physics_engine.calculate_mutual_inductance_batch(
+            capsule.properties.diameter / 2, capsule.properties.turns, capsule.properties.length,
+            stage.properties.diameter / 2, stage.properties.turns, stage.properties.length,
+            distances)
+        
+        assert isinstance(batch, np.ndarray)
+        assert batch.shape == distances.shape
+        expected = [physics_engine.calculate_mutual_inductance(capsule, stage, d)
+                    for d in distances]
+        np.testing.assert_allclose(batch, expected, rtol=1e-12)
+        
+        with pytest.raises(ValueError):
+            physics_engine.calculate_mutual_inductance_batch(
+                0.04, 1, 0.02, 0.045, 100, 0.05, np.array([0.01, -0.01]))
+    
+    def test_mutual_inductance_batch_over_coil_pairs(self, physics_engine, capsule):
+        """Test 16: Batch API broadcasts over arrays of coil geometries"""
+        stages = [AccelerationStage(i, 0.1, 50 + 50 * i, 0.06 + 0.02 * i, 0.03 + 0.02 * i,
+                                    1000e-6, 400) for i in range(3)]
+        distances = np.array([0.02, 0.04, 0.2])
+        
+        mutual_inductance, gradient = physics_engine.calculate_mutual_inductance_and_gradient_batch(
+            capsule.properties.diameter / 2, capsule.properties.turns, capsule.properties.length,
+            np.array([s.properties.diameter / 2 for s in stages]),
+            np.array([s.properties.turns for s in stages]),
+            np.array([s.properties.length for s in stages]),
+            distances)
+        
+        for index, (s, d) in enumerate(zip(stages, distances)):
+            expected = physics_engine.calculate_mutual_inductance_and_gradient(capsule, s, d)
+            assert mutual_inductance[index] == pytest.approx(expected[0], rel=1e-12)
+            assert gradient[index] == pytest.approx(expected[1], rel=1e-12)
+    
+    @pytest.mark.parametrize("interpolation, tolerance", [('cubic', 1e-6), ('linear', 1e-3)])
+    def test_lookup_table_matches_model(self, capsule, stage, interpolation, tolerance):
+        """Test 17: Tabulated M(x) and dM/dx agree with the model on both branches"""
+        exact = PhysicsEngine()
+        tabulated = PhysicsEngine(lookup_tables=True, interpolation=interpolation)
+        
+        for distance in [0.0, 0.0123, 0.0499, 0.05, 0.0731, 0.4, 2.5]:
+            expected = exact.calculate_mutual_inductance_and_gradient(capsule, stage, distance)
+            result = tabulated.calculate_mutual_inductance_and_gradient(capsule, stage, distance)
+            assert result[0] == pytest.approx(expected[0], rel=tolerance)
+            assert result[1] == pytest.approx(expected[1], rel=10 * tolerance)
+            assert tabulated.calculate_mutual_inductance(capsule, stage, distance) == \
+                pytest.approx(expected[0], rel=tolerance)
+    
+    def test_lookup_tables_shared_by_geometry(self, capsule):
+        """Test 18: Identical stage geometries share one cached table"""
+        physics = PhysicsEngine(lookup_tables=True)
+        props = capsule.properties
+        distances = np.array([0.01, 0.03, 0.08, 0.2])
+        
+        physics.calculate_mutual_inductance_and_gradient_batch(
+            np.full(4, 0.045), np.full(4, 100.0), np.full(4, 0.05),
+            props.diameter / 2, props.turns, props.length, distances)
+        assert len(physics._tables) == 1
+        
+        # Mixed geometries are grouped, one table per unique pair
+        mutual_inductance, gradient = physics.calculate_mutual_inductance_and_gradient_batch(
+            np.array([0.045, 0.03, 0.045, 0.03]), 100.0, np.array([0.05, 0.04, 0.05, 0.04]),
+            props.diameter / 2, props.turns, props.length, distances)
+        assert len(physics._tables) == 2
+        
+        expected = PhysicsEngine().calculate_mutual_inductance_and_gradient_batch(
+            np.array([0.045, 0.03, 0.045, 0.03]), 100.0, np.array([0.05, 0.04, 0.05, 0.04]),
+            props.diameter / 2, props.turns, props.length, distances)
+        np.testing.assert_allclose(mutual_inductance, expected[0], rtol=1e-6)
+        np.testing.assert_allclose(gradient, expected[1], rtol=1e-5)
+        
+        with pytest.raises(ValueError):
+            PhysicsEngine(lookup_tables=True, interpolation='quintic')
+    
+    def test_filament_model_loop_limits(self):
+        """Test 19: Elliptic-integral loop formula has the right gradient and dipole limit"""
+        from physics.filament_model import filament_mutual_inductance, MU_0
+        
+        a, b = 0.045, 0.0415
+        for z in [-0.02, 0.0, 0.01, 0.2]:
+            m, g = filament_mutual_inductance(a, b, z)
+            h = 1e-7
+            numerical = (filament_mutual_inductance(a, b, z + h)[0] -
+                         filament_mutual_inductance(a, b, z - h)[0]) / (2 * h)
+            assert g == pytest.approx(numerical, rel=1e-6, abs=1e-15)
+        
+        # Far apart, two loops couple like magnetic dipoles
+        z = 5.0
+        dipole = MU_0 * np.pi * a**2 * b**2 / (2 * z**3)
+        assert filament_mutual_inductance(a, b, z)[0] == pytest.approx(dipole, rel=1e-2)
+    
+    def test_filament_model_selectable_and_tabulated(self, capsule, stage):
+        """Test 20: Filament engine is smooth at the old branch switch and matches direct sums"""
+        from physics.filament_model import coaxial_coil_mutual_inductance
+        
+        physics = PhysicsEngine(inductance_model='filament')
+        assert physics.lookup_tables
+        
+        distances = np.array([0.0, 0.02, 0.0499, 0.0501, 0.12, 0.5])
+        props = capsule.properties
+        mutual_inductance, gradient = physics.calculate_mutual_inductance_and_gradient_batch(
+            props.diameter / 2, props.turns, props.length,
+            stage.properties.diameter / 2, stage.properties.turns, stage.properties.length,
+            distances)
+        expected, expected_gradient = coaxial_coil_mutual_inductance(
+            props.diameter / 2, props.turns, props.length,
+            stage.properties.diameter / 2, stage.properties.turns, stage.properties.length,
+            distances)
+        
+        np.testing.assert_allclose(mutual_inductance, expected, rtol=1e-6)
+        np.testing.assert_allclose(gradient, expected_gradient, rtol=1e-4, atol=1e-12)
+        assert mutual_inductance[2] == pytest.approx(mutual_inductance[3], rel=1e-2)
+        assert physics.calculate_mutual_inductance(capsule, stage, 0.02) == \
+            pytest.approx(expected[1], rel=1e-6)
+        
+        with pytest.raises(ValueError):
+            PhysicsEngine(inductance_model='exact')
+    
+    def test_coast_closed_form(self, physics_engine):
+        """Test 21: Coast motion under linear drag matches small-step integration"""
+        position, velocity, mass, drag = 0.1, 2.0, 0.5, 0.2
+        
+        x, v = physics_engine.calculate_coast(position, velocity, mass, drag, 0.3)
+        x_step, v_step, dt = position, velocity, 1e-5
+        for _ in range(30000):
+            a = -drag * v_step / mass
+            x_step += v_step * dt + 0.5 * a * dt**2
+            v_step += a * dt
+        assert x == pytest.approx(x_step, rel=1e-5)
+        assert v == pytest.approx(v_step, rel=1e-5)
+        
+        exit_time = physics_engine.calculate_coast_time(position, velocity, mass, drag, 0.5)
+        assert physics_engine.calculate_coast(position, velocity, mass, drag, exit_time)[0] == \
+            pytest.approx(0.5)
+        assert physics_engine.calculate_coast_time(position, velocity, mass, 0.0, 0.5) == \
+            pytest.approx(0.2)
+        
+        # Drag stops the capsule after v0*m/c = 5 m
+        assert physics_engine.calculate_coast_time(position, velocity, mass, drag, 6.0) == np.inf
+        assert physics_engine.calculate_coast_time(position, -1.0, mass, drag, 0.5) == np.inf
+    
+    def test_interaction_radius(self, physics_engine, capsule, stage):
+        """Test 22: Coupling beyond the interaction radius is below the far-field tolerance"""
+        r1, l1 = stage.properties.diameter / 2, stage.properties.length
+        r2, l2 = capsule.properties.diameter / 2, capsule.properties.length
+        
+        # The cutoff is opt-in
+        assert physics_engine.far_field_tolerance is None
+        assert physics_engine.calculate_interaction_radius(r1, l1, r2, l2) == np.inf
+        
+        windowed = PhysicsEngine(far_field_tolerance=1e-3)
+        radius = windowed.calculate_interaction_radius(r1, l1, r2, l2)
+        assert radius >= max(l1, l2)
+        
+        peak = windowed.calculate_mutual_inductance(stage, capsule, 0.0)
+        far = windowed.calculate_mutual_inductance(stage, capsule, radius * 1.01)
+        assert abs(far) < windowed.far_field_tolerance * peak
+    
+    def test_circuit_current_exponential_update(self, physics_engine):
+        """Test 23: L-R current update is exact for constant EMF and stable for large dt"""
+        current, emf, inductance, resistance = 2.0, 1e-3, 1e-6, 1e-3
+        tau = inductance / resistance
+        
+        # Many small steps compose to one large step
+        stepped = current
+        for _ in range(100):
+            stepped = physics_engine.update_circuit_current(stepped, emf, inductance, resistance,
+                                                            tau / 100)
+        single = physics_engine.update_circuit_current(current, emf, inductance, resistance, tau)
+        exact = 1.0 + (current - 1.0) * np.exp(-1)
+        assert stepped == pytest.approx(exact, rel=1e-12)
+        assert single == pytest.approx(exact, rel=1e-12)
+        
+        # dt >> L/R settles at EMF/R instead of overshooting
+        assert physics_engine.update_circuit_current(current, emf, inductance, resistance,
+                                                     1000 * tau) == pytest.approx(1.0)
+        
+        # Superconducting loop integrates the EMF
+        assert physics_engine.update_circuit_current(current, emf, inductance, 0.0, 1e-3) == \
+            pytest.approx(3.0)
+    
+    @pytest.mark.parametrize("kinematics,order", [('euler', 1), ('verlet', 2), ('rk4', 4)])
+    def test_kinematics_integrator_order(self, kinematics, order):
+        """Test 24: Kinematics integrators converge at their order on a position-dependent force"""
+        engine = PhysicsEngine(kinematics=kinematics)
+        
+        def final_error(dt):
+            # Unit-mass oscillator, F = -x; x(t) = cos(t)
+            capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+            capsule.update_position(1.0)
+            for _ in range(int(round(1.0 / dt))):
+                engine.update_kinematics(capsule, -capsule.position, dt,
+                                         force_at=lambda offset, x, v: -x)
+            return abs(capsule.position - np.cos(1.0)) + abs(capsule.velocity + np.sin(1.0))
+            
+        ratio = final_error(0.02) / final_error(0.01)
+        assert ratio == pytest.approx(2**order, rel=0.2)
+        
+        with pytest.raises(ValueError):
+            PhysicsEngine(kinematics='leapfrog')
@@ -13,6 +13,7 @@ from src.core.capsule import Capsule
 from src.core.acceleration_stage import AccelerationStage
 from src.services.simulation_service import SimulationService, SimulationResult
 from src.physics.physics_engine import PhysicsEngine
+from src.physics.integrators import DormandPrince45
 
 
 class TestSimulationService:
@@ -124,7 +125,7 @@ class TestSimulationService:
         # Should have non-zero force from electromagnetic interaction
         assert total_force != 0.0
         assert isinstance(total_force, float)
-
+    
     def test_simulation_max_force_nonzero(self):
         """Test: Simulation max force should be greater than zero for typical parameters."""
         result = self.service.run(max_time=0.01)
@@ -246,6 +247,391 @@ class TestSimulationService:
         
         # Allow some tolerance for termination conditions
         assert 0.8 * expected_steps <= actual_steps <= 1.2 * expected_steps
+    
+    def test_stages_evaluated_once_per_step(self):
+        """Test 13: Stage currents are computed once per step and shared."""
+        self.stages[0].activate(0.0)
+        self.service.time = 0.0005
+        
+        with patch.object(self.service, '_discharge_state',
+                          wraps=self.service._discharge_state) as discharge:
+            self.service._step()
+        
+        assert discharge.call_count == 1
+        
+        # Recorder reuses the step evaluation
+        record = self.service.data.history[-1]
+        assert record['active_stages'] == 1
+        assert record['total_stage_current'] == pytest.approx(self.stages[0].get_current(0.0005))
+    
+    def _coasting_service(self, **kwargs):
+        """Light capsule entering the stages at constant speed."""
+        capsule = Capsule(mass=0.05, diameter=0.083, length=0.02)
+        capsule.update_velocity(20.0)
+        stages = [AccelerationStage(i, 0.1 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                  for i in range(3)]
+        return SimulationService(capsule, stages, tube_length=0.5, **kwargs)
+    
+    @pytest.mark.parametrize("kwargs", [{'dt': 1e-4}, {'dt': 1e-5}, {'integrator': 'rk45'}])
+    def test_stage_fires_at_exact_crossing_time(self, kwargs):
+        """Test 16: Activation time is the trigger crossing time, independent of dt."""
+        service = self._coasting_service(**kwargs)
+        service.run(max_time=0.003)
+        
+        # Trigger point 0.1 - 0.05 m reached at 20 m/s after 2.5 ms
+        assert service.stages[0].activation_time == pytest.approx(0.0025, rel=1e-9)
+    
+    def test_forward_motion_skips_activation_scan(self):
+        """Test 17: Moving forward, only the first step scans all stages."""
+        service = self._coasting_service(dt=1e-5)
+        
+        with patch.object(service.bank, 'check_activations',
+                          wraps=service.bank.check_activations) as scan:
+            service.run(max_time=0.005)
+        
+        assert scan.call_count == 1
+        assert service.stages[0].is_active
+    
+    def test_coast_phase_fast_forward(self):
+        """Test 18: Coast after the last discharge is integrated in closed form."""
+        def run(**kwargs):
+            capsule = Capsule(mass=0.05, diameter=0.083, length=0.02)
+            capsule.update_velocity(5.0)
+            stages = [AccelerationStage(i, 0.1 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(2)]
+            service = SimulationService(capsule, stages, tube_length=3.0, dt=1e-5, **kwargs)
+            return service.run(max_time=1.0)
+        
+        stepped = run(fast_forward=False)
+        fast = run(coast_samples=10)
+        
+        assert fast.final_position == 3.0
+        assert fast.final_velocity == pytest.approx(stepped.final_velocity, rel=1e-12)
+        assert fast.total_time == pytest.approx(stepped.total_time, abs=1e-5)
+        assert len(fast.history) < len(stepped.history) / 2
+        assert fast.max_force == pytest.approx(stepped.max_force)
+        
+        # Synthetic coast points follow the last stepped record
+        assert np.all(np.diff(fast.get_time_array()) > 0)
+        assert fast.history[-1]['force'] == 0.0
+    
+    def test_retired_stages_not_evaluated(self):
+        """Test 19: Stages drop out of the per-step evaluation after their pulse."""
+        service = self._coasting_service(dt=1e-5, single_pulse=True, fast_forward=False)
+        service.run(max_time=0.012)
+        
+        first = service.stages[0]
+        assert first.is_active and first.is_retired
+        assert first.retirement_time == pytest.approx(
+            first.activation_time + first.circuit.pulse_end)
+        assert 0 not in service.bank.active_indices
+        
+        # Records still count every fired stage
+        last = service.data.history[-1]
+        assert last['active_stages'] == service.bank.fired_count
+    
+    def test_long_tube_evaluates_nearby_stages_only(self):
+        """Test 20: The opt-in far-field cutoff skips distant stages within its tolerance."""
+        def run(far_field_tolerance):
+            capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            capsule.update_velocity(50.0)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(40)]
+            physics = PhysicsEngine(far_field_tolerance=far_field_tolerance)
+            service = SimulationService(capsule, stages, tube_length=3.25, dt=1e-5, physics=physics)
+            return service, service.run(max_time=0.1)
+            
+        windowed, result = run(1e-3)
+        full, reference = run(None)
+        
+        assert full._interaction_radius == np.inf
+        assert windowed._interaction_radius < 1.0
+        
+        # Distant stages keep their drag term; only couplings below the
+        # 1e-3 tolerance are dropped, moving the exit velocity by < 1e-4
+        assert reference.final_position >= 3.25
+        assert result.final_velocity == pytest.approx(reference.final_velocity, rel=1e-4)
+        assert result.total_time == pytest.approx(reference.total_time, rel=1e-3)
+    
+    def test_capsule_current_independent_of_time_step(self):
+        """Test 21: The capsule L-R circuit gives consistent results when dt grows tenfold."""
+        def run(dt):
+            capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(3)]
+            return SimulationService(capsule, stages, tube_length=0.5, dt=dt).run(max_time=0.02)
+            
+        fine, coarse = run(1e-6), run(1e-5)
+        assert coarse.final_velocity == pytest.approx(fine.final_velocity, rel=1e-2)
+        assert coarse.max_force == pytest.approx(fine.max_force, rel=1e-2)
+    
+    def test_auto_time_step_selection(self):
+        """Test 22: dt='auto' resolves the fastest circuit or transit time scale."""
+        service = SimulationService(self.capsule, self.stages, tube_length=0.5, dt='auto')
+        circuit = self.stages[0].circuit
+        
+        # Default stages ring much faster than the capsule L/R or coil transit
+        assert service.auto_dt
+        assert service.dt == pytest.approx(1 / (np.hypot(circuit.alpha, circuit.frequency) *
+                                                SimulationService.AUTO_DT_RESOLUTION))
+        assert 'discharge' in service.dt_reason
+        
+        # A fast capsule is limited by its transit through a coil
+        self.capsule.update_velocity(1e4)
+        dt, reason = service.select_time_step()
+        assert dt < service.dt and 'transit' in reason
+        
+        assert SimulationService.parse_time_step('AUTO') == 'auto'
+        assert SimulationService.parse_time_step('2e-5') == 2e-5
+        with pytest.raises(ValueError):
+            SimulationService(self.capsule, self.stages, tube_length=0.5, dt=0.0)
+    
+    @pytest.mark.parametrize("kinematics", ['verlet', 'rk4'])
+    def test_kinematics_integrator_plugs_in(self, kinematics):
+        """Test 23: Higher-order kinematics agree with the default and keep the result format."""
+        def run(kinematics):
+            capsule = Capsule(mass=0.05, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            capsule.update_velocity(5.0)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(3)]
+            physics = PhysicsEngine(kinematics=kinematics)
+            return SimulationService(capsule, stages, tube_length=0.5, dt=1e-5,
+                                     physics=physics).run(max_time=0.01)
+            
+        default, result = run('euler'), run(kinematics)
+        assert result.final_velocity == pytest.approx(default.final_velocity, rel=1e-3)
+        assert len(result.history) == len(default.history)
+        assert result.history[-1].keys() == default.history[-1].keys()
+    
+    def test_multi_rate_substeps(self):
+        """Test 24: Multi-rate stepping records per macro step and matches fine stepping."""
+        def run(substeps):
+            capsule = Capsule(mass=0.05, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            capsule.update_velocity(5.0)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(3)]
+            service = SimulationService(capsule, stages, tube_length=0.5, dt=1e-5,
+                                        substeps=substeps)
+            return stages, service.run(max_time=0.02)
+            
+        fine_stages, fine = run(1)
+        stages, result = run(10)
+        
+        assert result.final_velocity == pytest.approx(fine.final_velocity, rel=1e-3)
+        assert len(result.history) == pytest.approx(len(fine.history) / 10, abs=2)
+        assert np.diff(result.get_time_array())[0] == pytest.approx(1e-4)
+        
+        # Stages still fire at their exact trigger crossing inside a macro step
+        assert stages[1].activation_time == pytest.approx(fine_stages[1].activation_time, rel=1e-4)
+        
+        with pytest.raises(ValueError):
+            SimulationService(self.capsule, self.stages, tube_length=0.5, substeps=0)
+    
+    def test_last_macro_step_stops_at_max_time(self):
+        """Test 30: The last macro step is cut to the time left before max_time."""
+        capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+        capsule.update_position(0.02)
+        stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                  for i in range(3)]
+        service = SimulationService(capsule, stages, tube_length=0.5, dt=1e-5, substeps=10)
+        result = service.run(max_time=1.23e-3)
+        
+        # 12 full macro steps and one of 3 substeps, ending where dt stepping ends
+        assert service.time == pytest.approx(1.23e-3, abs=1e-12)
+        assert len(result.history) == 13
+        assert result.get_time_array()[-1] == pytest.approx(1.2e-3)
+    
+    @pytest.mark.parametrize("fast_forward", [True, False])
+    def test_adaptive_run_ends_at_tube_exit(self, fast_forward):
+        """Test 31: rk45 cuts the last step at the tube exit instead of overshooting it."""
+        capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+        capsule.update_position(0.02)
+        capsule.update_velocity(10.0)
+        stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                  for i in range(3)]
+        service = SimulationService(capsule, stages, tube_length=0.29, integrator='rk45',
+                                    fast_forward=fast_forward)
+        result = service.run(max_time=1.0)
+        
+        assert result.final_position >= 0.29
+        assert result.final_position == pytest.approx(0.29, abs=1e-6)
+        assert all(stage.is_active for stage in service.stages)
+    
+    def test_auto_time_step_matches_default_accuracy(self):
+        """Test 32: dt='auto' on a light capsule is as accurate as the default step, not finer."""
+        def run(dt):
+            capsule = Capsule(mass=0.02, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            capsule.update_velocity(5.0)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(6)]
+            service = SimulationService(capsule, stages, tube_length=0.53, dt=dt)
+            return service, service.run(max_time=0.1)
+            
+        _, reference = run(2e-6)
+        _, default = run(1e-5)
+        service, auto = run('auto')
+        
+        def error(result):
+            return abs(result.max_force / reference.max_force - 1)
+            
+        # Transit-limited, but within a factor two of the default step
+        assert 'transit' in service.dt_reason
+        assert 5e-6 < service.dt < 2e-5
+        assert error(auto) < 1.5 * error(default) + 1e-4
+        assert auto.final_velocity == pytest.approx(reference.final_velocity, rel=2e-3)
+    
+    @pytest.mark.parametrize("integrator", ['fixed', 'rk45'])
+    def test_iter_steps_follows_run(self, integrator):
+        """Test 25: iter_steps yields every k-th step and the last, matching run()."""
+        def service():
+            capsule = Capsule(mass=0.05, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            capsule.update_velocity(5.0)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(3)]
+            return SimulationService(capsule, stages, tube_length=0.5, dt=1e-5,
+                                     integrator=integrator)
+                                     
+        reference = service().run(max_time=0.05)
+        stepping = service()
+        snapshots = list(stepping.iter_steps(max_time=0.05, every=7))
+        
+        last = len(reference.history) - 1
+        expected = list(range(0, last + 1, 7)) + ([last] if last % 7 else [])
+        assert [s.step for s in snapshots] == expected
+        assert snapshots[3].time == reference.history[21]['time']
+        assert snapshots[-1].velocity == reference.final_velocity
+        assert snapshots[-1].position == reference.final_position
+        assert stepping.data.get_results().max_force == reference.max_force
+        
+        with pytest.raises(ValueError):
+            service().iter_steps(every=0)
+    
+    def test_run_callback_can_stop_early(self):
+        """Test 26: run() pushes snapshots to a callback and stops when it returns False."""
+        seen = []
+        
+        def stop_after_first_stage(snapshot):
+            seen.append(snapshot)
+            return snapshot.position < 0.1
+            
+        self.capsule.update_position(0.02)
+        self.capsule.update_velocity(5.0)
+        service = SimulationService(self.capsule, self.stages, tube_length=0.5, dt=1e-5)
+        result = service.run(max_time=0.05, callback=stop_after_first_stage, every=10)
+        
+        assert seen[-1].position >= 0.1
+        assert all(s.position < 0.1 for s in seen[:-1])
+        assert np.diff([s.step for s in seen]).tolist() == [10] * (len(seen) - 1)
+        assert result.final_position == seen[-1].position
+        assert len(result.history) == seen[-1].step + 1
+    
+    def test_records_count_every_fired_stage(self):
+        """Test 27: Recorded stage count and current are not limited to the interaction window."""
+        capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+        capsule.update_position(0.02)
+        capsule.update_velocity(50.0)
+        stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                  for i in range(20)]
+        service = SimulationService(capsule, stages, tube_length=1.7, dt=1e-5)
+        result = service.run(max_time=0.05)
+        
+        # Fired stages keep counting after they leave the window or retire
+        counts = result.history.column('active_stages')
+        assert service.bank.fired_count == 20
+        assert counts.max() == counts[-1] == 20
+        assert np.all(np.diff(counts) >= 0)
+        assert set(np.diff(counts).tolist()) == {0.0, 1.0}
+        
+        # Current summed over every live stage, not only the nearby ones
+        last = result.history[-1]
+        expected = sum(stage.get_current_state(last['time'])[0] for stage in stages
+                       if stage.is_active and not stage.is_retired)
+        assert last['total_stage_current'] == pytest.approx(expected, rel=1e-9, abs=1e-12)
+    
+    def test_scalar_and_array_stage_paths_agree(self):
+        """Test 28: Few-stage steps evaluated with floats match the NumPy path."""
+        def run(limit):
+            capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+            capsule.update_position(0.02)
+            capsule.update_velocity(10.0)
+            stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                      for i in range(6)]
+            service = SimulationService(capsule, stages, tube_length=0.5, dt=1e-5)
+            service.SCALAR_STAGE_LIMIT = limit
+            return service.run(max_time=0.02)
+            
+        scalar, array = run(SimulationService.SCALAR_STAGE_LIMIT), run(0)
+        assert scalar.final_velocity == pytest.approx(array.final_velocity, rel=1e-12)
+        assert scalar.final_position == pytest.approx(array.final_position, rel=1e-12)
+        assert scalar.max_force == pytest.approx(array.max_force, rel=1e-12)
+        np.testing.assert_allclose(scalar.history.column('capsule_current'),
+                                   array.history.column('capsule_current'), rtol=1e-9, atol=1e-12)
+    
+    def _adaptive_service(self, **kwargs):
+        """Fresh service over fresh stages with the adaptive integrator."""
+        capsule = Capsule(mass=1.0, diameter=0.083, length=0.02)
+        capsule.update_position(0.02)
+        stages = [AccelerationStage(i, 0.05 + i * 0.08, 100, 0.09, 0.05, 1000e-6, 400.0)
+                  for i in range(3)]
+        return SimulationService(capsule, stages, tube_length=0.5, dt=1e-5,
+                                 integrator='rk45', **kwargs)
+    
+    def test_adaptive_integrator_converges_with_fewer_steps(self):
+        """Test 14: RK45 results are tolerance-converged and need far fewer steps."""
+        result = self._adaptive_service(rtol=1e-6).run(max_time=0.02)
+        reference = self._adaptive_service(rtol=1e-9).run(max_time=0.02)
+        
+        assert result.total_time == pytest.approx(0.02)
+        assert result.final_velocity == pytest.approx(reference.final_velocity, rel=1e-4)
+        assert result.final_position == pytest.approx(reference.final_position, rel=1e-6)
+        
+        # 0.02 s at the fixed dt of 1e-5 would be 2000 steps
+        assert len(result.history) < 400
+        times = result.get_time_array()
+        assert np.all(np.diff(times) > 0)
+        assert np.diff(times).max() > 5 * self.dt
+    
+    def test_adaptive_step_sizes_follow_accepted_error(self):
+        """Test 29: Steps cut back to a trigger are error-checked and size the next step."""
+        events = []
+        step, next_step_size = DormandPrince45.step, DormandPrince45.next_step_size
+        
+        def record_step(solver, f, t, y, h, rate=None):
+            result = step(solver, f, t, y, h, rate)
+            events.append(('step', h, result[2]))
+            return result
+            
+        def record_size(solver, h, error_norm):
+            events.append(('size', h, error_norm))
+            return next_step_size(solver, h, error_norm)
+            
+        service = self._adaptive_service()
+        service.capsule.update_velocity(5.0)
+        with patch.object(DormandPrince45, 'step', record_step), \
+                patch.object(DormandPrince45, 'next_step_size', record_size):
+            result = service.run(max_time=0.02)
+            
+        assert np.isfinite(result.stage_firing_times).sum() >= 2
+        
+        # Every step size comes from the error of the attempt just made
+        sizes = [index for index, event in enumerate(events) if event[0] == 'size']
+        assert sizes
+        for index in sizes:
+            assert events[index - 1] == ('step',) + events[index][1:]
+    
+    def test_adaptive_integrator_configuration(self):
+        """Test 15: Integrator choice and max_step are validated and honoured."""
+        with pytest.raises(ValueError):
+            SimulationService(self.capsule, self.stages, self.tube_length, integrator='rk4')
+        
+        result = self._adaptive_service(max_step=1e-4).run(max_time=0.005)
+        assert np.diff(np.concatenate([[0.0], result.get_time_array()])).max() <= 1e-4 + 1e-15
 
 
 class TestSimulationResult:
@@ -0,0 +1,192 @@
+"""
+Test module for StageBank.
+
+Tests the structure-of-arrays view over acceleration stages used by the
+vectorized simulation step.
+"""
+
+import pytest
+import numpy as np
+
+from src.core.acceleration_stage import AccelerationStage
+from src.core.stage_bank import StageBank
+
+
+class TestStageBank:
+    """Test cases for StageBank."""
+    
+    def setup_method(self):
+        """Set up test fixtures before each test method."""
+        self.stages = [
+            AccelerationStage(
+                stage_id=i,
+                position=0.05 + i * 0.08,
+                turns=100,
+                diameter=0.09,
+                length=0.05,
+                capacitance=1000e-6,
+                voltage=400.0
+            )
+            for i in range(4)
+        ]
+        self.bank = StageBank(self.stages)
+    
+    def test_bank_packs_stage_parameters(self):
+        """Test 1: Stage parameters are stored as contiguous arrays."""
+        assert len(self.bank) == 4
+        np.testing.assert_allclose(self.bank.positions, [0.05, 0.13, 0.21, 0.29])
+        np.testing.assert_allclose(self.bank.radii, 0.045)
+        np.testing.assert_allclose(self.bank.inductances, self.stages[0].inductance)
+        np.testing.assert_allclose(self.bank.resistances, self.stages[0].properties.resistance)
+        assert np.all(np.isnan(self.bank.activation_times))
+        assert self.bank.active_count == 0
+    
+    def test_stage_activation_writes_through(self):
+        """Test 2: Activating or resetting a stage updates the bank."""
+        self.stages[2].activate(0.003)
+        
+        assert self.bank.active_count == 1
+        assert list(self.bank.active_indices) == [2]
+        assert self.bank.activation_times[2] == 0.003
+        
+        self.stages[2].reset()
+        assert self.bank.active_count == 0
+        assert np.isnan(self.bank.activation_times[2])
+    
+    def test_check_activations(self):
+        """Test 3: Only idle stages within firing distance are activated."""
+        fired = self.bank.check_activations(position=0.10, time=0.001)
+        
+        assert list(fired) == [0, 1]
+        assert self.stages[0].is_active and self.stages[1].is_active
+        assert not self.stages[2].is_active
+        
+        # Already-active stages are not re-fired
+        fired_again = self.bank.check_activations(position=0.10, time=0.002)
+        assert fired_again.size == 0
+        assert self.stages[0].activation_time == 0.001
+    
+    @pytest.mark.parametrize("time", [0.0005, 0.001, 0.0013, 0.004, 0.012])
+    def test_discharge_matches_scalar_evaluation(self, time):
+        """Test 4: Array evaluation matches per-stage get_current/get_current_derivative."""
+        for index, stage in enumerate(self.stages):
+            stage.activate(0.001 * index)
+            
+        current, derivative = self.bank.discharge_state(time)
+        
+        expected_current = [stage.get_current(time) for stage in self.stages]
+        expected_derivative = [stage.get_current_derivative(time) for stage in self.stages]
+        np.testing.assert_allclose(current, expected_current, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(derivative, expected_derivative, rtol=1e-9, atol=1e-6)
+    
+    def test_discharge_overdamped_stage(self):
+        """Test 5: Overdamped circuits are evaluated alongside underdamped ones."""
+        overdamped = AccelerationStage(4, 0.37, 100, 0.09, 0.05, 1.0, 400.0)
+        bank = StageBank([self.stages[0], overdamped])
+        assert not bank.underdamped[1]
+        
+        self.stages[0].activate(0.0)
+        overdamped.activate(0.0)
+        current, derivative = bank.discharge_state(0.002)
+        
+        assert current[0] == pytest.approx(self.stages[0].get_current(0.002))
+        assert current[1] == pytest.approx(overdamped.get_current(0.002))
+        assert derivative[1] == pytest.approx(overdamped.get_current_derivative(0.002))
+    
+    def test_total_current_and_reset(self):
+        """Test 6: Total current sums active stages; reset idles the whole bank."""
+        assert self.bank.total_current(0.001) == 0.0
+        
+        self.stages[0].activate(0.0)
+        self.stages[1].activate(0.0)
+        expected = self.stages[0].get_current(0.001) + self.stages[1].get_current(0.001)
+        assert self.bank.total_current(0.001) == pytest.approx(expected)
+        
+        self.bank.reset()
+        assert self.bank.active_count == 0
+        assert not any(stage.is_active for stage in self.stages)
+    
+    def test_discharge_waveforms_over_time_axis(self):
+        """Test 7: Whole-bank traces match per-stage waveforms."""
+        self.stages[0].activate(0.0)
+        self.stages[2].activate(0.002)
+        times = np.linspace(0.0, 0.01, 51)
+        
+        currents, derivatives = self.bank.discharge_waveforms(times)
+        
+        assert currents.shape == (4, 51)
+        assert not currents[1].any() and not currents[3].any()
+        expected, expected_derivative = self.stages[2].get_current_waveform(times)
+        np.testing.assert_allclose(currents[2], expected)
+        np.testing.assert_allclose(derivatives[2], expected_derivative)
+    
+    def test_parameter_change_refreshes_bank(self):
+        """Test 8: Changing a stage's voltage updates the bank coefficients."""
+        self.stages[1].activate(0.0)
+        before, _ = self.bank.discharge_state(0.001)
+        
+        self.stages[1].voltage = 200.0
+        after, _ = self.bank.discharge_state(0.001)
+        
+        assert self.bank.voltages[1] == 200.0
+        assert after[0] == pytest.approx(before[0] / 2)
+    
+    def test_trigger_pointer(self):
+        """Test 9: Trigger points are taken in order and skip already-fired stages."""
+        np.testing.assert_allclose(self.bank.trigger_positions, self.bank.positions - 0.05)
+        assert self.bank.next_trigger_position == pytest.approx(0.0)
+        
+        self.bank.seek_trigger(0.05)
+        assert self.bank.next_trigger_position == pytest.approx(0.08)
+        
+        self.stages[2].activate(0.0)
+        crossed = self.bank.take_crossed(0.20)
+        assert list(crossed) == [1]
+        assert self.bank.next_trigger_position == pytest.approx(0.24)
+        assert self.bank.take_crossed(0.20).size == 0
+        
+        self.bank.reset()
+        assert self.bank.next_trigger_position == pytest.approx(0.0)
+    
+    def test_retire_finished_stages(self):
+        """Test 10: Finished discharges leave the active set but stay fired."""
+        self.stages[0].activate(0.0)
+        self.stages[1].activate(0.001)
+        circuit = self.stages[0].circuit
+        
+        assert self.bank.retire_finished(0.01, 1e-4).size == 0
+        
+        # Single-pulse mode ends each discharge at its first zero crossing
+        pulse_end = circuit.pulse_end
+        retired = self.bank.retire_finished(pulse_end + 1e-6, 1e-4, single_pulse=True)
+        assert list(retired) == [0]
+        assert self.stages[0].retirement_time == pytest.approx(pulse_end)
+        assert list(self.bank.active_indices) == [1]
+        assert self.bank.active_count == 1 and self.bank.fired_count == 2
+        
+        # Retired stages carry no current but are not fired again
+        assert self.stages[0].get_current(pulse_end + 0.005) == 0.0
+        assert self.bank.check_activations(position=0.05, time=0.02).size == 0
+        currents, _ = self.bank.discharge_waveforms(np.array([pulse_end / 2, pulse_end + 0.005]))
+        assert currents[0, 0] > 0 and currents[0, 1] == 0.0
+        
+        # Envelope retirement once the current can no longer reach the threshold
+        quiet = self.stages[1].circuit.quiet_time(1e-4)
+        assert list(self.bank.retire_finished(0.001 + quiet, 1e-4)) == [1]
+        assert self.bank.active_count == 0
+        
+        self.bank.reset()
+        assert not self.bank.retired.any() and self.stages[0].retirement_time is None
+    
+    def test_spatial_index_window(self):
+        """Test 11: Position window queries return only nearby stages."""
+        assert list(self.bank.stages_within(0.13, 0.05)) == [1]
+        assert list(self.bank.stages_within(0.13, 0.09)) == [0, 1, 2]
+        assert self.bank.stages_within(5.0, 0.1).size == 0
+        
+        # Window covering the whole tube defers to the cached active view
+        self.stages[0].activate(0.0)
+        self.stages[2].activate(0.0)
+        assert self.bank.active_within(0.13, 10.0) is None
+        assert list(self.bank.active_within(0.21, 0.05)) == [2]
+        assert self.bank.active_within(0.13, 0.05).size == 0